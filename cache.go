@@ -0,0 +1,188 @@
+package main
+
+// Result cache and request coalescing in front of the metric computation.
+//
+// Results are keyed by (subset, hash of the normalized text), kept in an
+// LRU of bounded size and dropped after a TTL. Concurrent requests for a key
+// that is being computed wait for that computation instead of starting
+// another Python process. Errors are returned to every waiting request but
+// never cached.
+//
+// The computation runs on its own context, cancelled only when every
+// request waiting for it has given up (e.g. its client disconnected).
+//
+// Configuration (environment):
+//   NILC_CACHE_SIZE  maximum number of cached results (default 512; 0
+//                    disables caching, coalescing stays on)
+//   NILC_CACHE_TTL   how long a result stays valid (default 1h)
+
+import (
+	"container/list"
+	"context"
+	"crypto/sha256"
+	"encoding/hex"
+	"log"
+	"os"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+type metrixResult struct {
+	plain string
+	list  []MetrixResultItem
+}
+
+type cacheEntry struct {
+	key     string
+	result  metrixResult
+	expires time.Time
+}
+
+type inflightCall struct {
+	done    chan struct{}
+	result  metrixResult
+	err     error
+	waiters int
+	cancel  context.CancelFunc
+}
+
+type resultCache struct {
+	mu         sync.Mutex
+	maxEntries int
+	ttl        time.Duration
+	lru        *list.List // of *cacheEntry, most recent first
+	entries    map[string]*list.Element
+	inflight   map[string]*inflightCall
+}
+
+func newResultCache(maxEntries int, ttl time.Duration) *resultCache {
+	return &resultCache{
+		maxEntries: maxEntries,
+		ttl:        ttl,
+		lru:        list.New(),
+		entries:    map[string]*list.Element{},
+		inflight:   map[string]*inflightCall{},
+	}
+}
+
+// normalizeText removes differences that do not change any metric.
+func normalizeText(text string) string {
+	text = strings.Replace(text, "\r\n", "\n", -1)
+	return strings.TrimSpace(text)
+}
+
+func resultKey(subset string, text string) string {
+	sum := sha256.Sum256([]byte(subset + "\x00" + normalizeText(text)))
+	return hex.EncodeToString(sum[:])
+}
+
+// copyResult gives each caller its own slice, as the handlers sort and
+// number the items in place.
+func copyResult(r metrixResult) metrixResult {
+	items := make([]MetrixResultItem, len(r.list))
+	copy(items, r.list)
+	return metrixResult{r.plain, items}
+}
+
+// get returns the result for (subset, text), computing it at most once
+// for concurrent callers. It returns ctx.Err() as soon as ctx is done.
+func (c *resultCache) get(ctx context.Context, subset string, text string, compute func(context.Context) (metrixResult, error)) (metrixResult, error) {
+	key := resultKey(subset, text)
+
+	c.mu.Lock()
+	if el, found := c.entries[key]; found {
+		entry := el.Value.(*cacheEntry)
+		if time.Now().Before(entry.expires) {
+			c.lru.MoveToFront(el)
+			c.mu.Unlock()
+			resultCacheEvents.Inc("hit")
+			return copyResult(entry.result), nil
+		}
+		c.lru.Remove(el)
+		delete(c.entries, key)
+	}
+	call, found := c.inflight[key]
+	if found {
+		call.waiters++
+		c.mu.Unlock()
+		resultCacheEvents.Inc("coalesced")
+	} else {
+		callCtx, cancel := context.WithCancel(context.Background())
+		call = &inflightCall{done: make(chan struct{}), waiters: 1, cancel: cancel}
+		c.inflight[key] = call
+		c.mu.Unlock()
+		resultCacheEvents.Inc("miss")
+		go c.run(callCtx, key, call, compute)
+	}
+
+	select {
+	case <-call.done:
+		return copyResult(call.result), call.err
+	case <-ctx.Done():
+		c.mu.Lock()
+		call.waiters--
+		if call.waiters == 0 {
+			// Nobody wants the result any more; later requests for the key
+			// start over.
+			call.cancel()
+			if c.inflight[key] == call {
+				delete(c.inflight, key)
+			}
+		}
+		c.mu.Unlock()
+		return metrixResult{}, ctx.Err()
+	}
+}
+
+func (c *resultCache) run(ctx context.Context, key string, call *inflightCall, compute func(context.Context) (metrixResult, error)) {
+	defer call.cancel()
+	call.result, call.err = compute(ctx)
+
+	c.mu.Lock()
+	if c.inflight[key] == call {
+		delete(c.inflight, key)
+	}
+	if call.err == nil && c.maxEntries > 0 {
+		c.add(key, call.result)
+	}
+	c.mu.Unlock()
+	close(call.done)
+}
+
+// add stores a result; c.mu must be held.
+func (c *resultCache) add(key string, result metrixResult) {
+	entry := &cacheEntry{key, result, time.Now().Add(c.ttl)}
+	c.entries[key] = c.lru.PushFront(entry)
+	for c.lru.Len() > c.maxEntries {
+		oldest := c.lru.Back()
+		c.lru.Remove(oldest)
+		delete(c.entries, oldest.Value.(*cacheEntry).key)
+	}
+	resultCacheEntries.Set(float64(c.lru.Len()))
+}
+
+func envInt(name string, def int) int {
+	if v := os.Getenv(name); v != "" {
+		n, err := strconv.Atoi(v)
+		if err == nil {
+			return n
+		}
+		log.Printf("Invalid %s=%q, using %d.\n", name, v, def)
+	}
+	return def
+}
+
+func envDuration(name string, def time.Duration) time.Duration {
+	if v := os.Getenv(name); v != "" {
+		d, err := time.ParseDuration(v)
+		if err == nil {
+			return d
+		}
+		log.Printf("Invalid %s=%q, using %v.\n", name, v, def)
+	}
+	return def
+}
+
+var metrixCache = newResultCache(envInt("NILC_CACHE_SIZE", 512), envDuration("NILC_CACHE_TTL", time.Hour))
@@ -44,6 +44,18 @@ SIMPLE_WORDS = DIR + 'listas/list_biderman.txt'
 FREQUENCIES_BRWAC = DIR + 'listas/lista_brWaC_geral_v3_nlpnet.tsv'
 FREQUENCIES_BRASILEIRO = DIR + 'listas/wl_cb_full_1gram_sketchengine.txt'
 
+# Recorded tool outputs replayed by text_metrics.replay.ReplayResourcePool.
+REPLAY_FIXTURES = BASE_DIR + '/tests/fixtures/replay'
+
+# Optional; built by text_metrics/scripts/build_syllable_lexicon.py.
+SYLLABLE_LEXICON = DIR + 'listas/syllables_brwac.tsv'
+
+# Sentence-level parse cache (text_metrics.tools.parse.cache): parses kept in
+# memory per parser, and an optional SQLite file shared by runs (None to
+# keep them in memory only; NILC_PARSE_CACHE overrides it).
+PARSE_CACHE_SIZE = 10000
+PARSE_CACHE = None
+
 DISCOURSE_MARKERS = DIR + 'listas/Marcadores.txt'
 
 AMBIGUOUS_DISCOURSE_MARKERS = DIR + 'listas/Ambiguos.txt'
@@ -2,15 +2,20 @@ package main
 
 import (
 	"bytes"
+	"context"
 	"encoding/json"
 	"fmt"
 	"io/ioutil"
 	"log"
+	"math"
 	"net/http"
 	"net/url"
+	"os"
 	"os/exec"
 	"sort"
+	"strconv"
 	"strings"
+	"sync"
 	"text/template"
 	"time"
 
@@ -286,6 +291,7 @@ func Router() *mux.Router {
 	r.HandleFunc("/api/v1/metrix/{subset}/{key}", metricsHandler).Methods("POST")
 	r.HandleFunc("/api/v1/palavras/{retType}/{key}", palavrasHandler)
 	r.HandleFunc("/ws/metrix", wsMetrixHandler)
+	r.HandleFunc("/metrics", telemetryHandler)
 
 	return r
 }
@@ -315,9 +321,11 @@ type WSRequest struct {
 }
 
 type WSResponse struct {
-	Status  string             `json:"status"` // "processing", "success", "error"
-	Message string             `json:"message"`
-	Results []MetrixResultItem `json:"results,omitempty"`
+	Status   string             `json:"status"` // "queued", "processing", "partial", "success", "error"
+	Message  string             `json:"message"`
+	Position int                `json:"position,omitempty"` // "queued" only
+	Category string             `json:"category,omitempty"` // "partial" only
+	Results  []MetrixResultItem `json:"results,omitempty"`
 }
 
 func wsMetrixHandler(w http.ResponseWriter, r *http.Request) {
@@ -354,6 +362,28 @@ func wsMetrixHandler(w http.ResponseWriter, r *http.Request) {
 	// 3. Notify the frontend that processing has started
 	conn.WriteJSON(WSResponse{Status: "processing", Message: "Analisando o texto, por favor aguarde... (Processing, wait...)"})
 
+	// Queue positions are sent from the computation's goroutine, so writes
+	// are serialized from here on.
+	var writeMu sync.Mutex
+	send := func(resp WSResponse) {
+		writeMu.Lock()
+		defer writeMu.Unlock()
+		conn.WriteJSON(resp)
+	}
+
+	// The job is cancelled as soon as the client goes away; reading also
+	// processes the pongs and the close message.
+	ctx, cancel := context.WithCancel(r.Context())
+	defer cancel()
+	go func() {
+		for {
+			if _, _, err := conn.ReadMessage(); err != nil {
+				cancel()
+				return
+			}
+		}
+	}()
+
 	//Keep alive
 	// Create a channel to signal when the processing is done
 	done := make(chan bool)
@@ -379,10 +409,32 @@ func wsMetrixHandler(w http.ResponseWriter, r *http.Request) {
 	}()
 
 	// 4. Run the long Python process
-	_, list, err := callMetrix("_all", req.Text)
+	// Partial results are numbered in arrival order; the final list
+	// replaces them.
+	partials := 0
+	_, list, err := callMetrix(ctx, "_all", req.Text, &metrixProgress{
+		queued: func(position int) {
+			send(WSResponse{Status: "queued", Position: position,
+				Message: fmt.Sprintf("Aguardando na fila, posição %d... (Queued, position %d...)", position, position)})
+		},
+		category: func(name string, items []MetrixResultItem) {
+			for i := range items {
+				partials++
+				items[i].Index = partials
+			}
+			send(WSResponse{Status: "partial", Category: name, Results: items})
+		},
+	})
+	close(done)
+	if err == errQueueFull {
+		send(WSResponse{Status: "error", Message: "Servidor ocupado, tente novamente mais tarde. (Server busy, try again later.)"})
+		return
+	}
 	if err != nil {
 		log.Println(err)
-		conn.WriteJSON(WSResponse{Status: "error", Message: "Error processando texto: " + err.Error()})
+		if ctx.Err() == nil {
+			send(WSResponse{Status: "error", Message: "Error processando texto: " + err.Error()})
+		}
 		return
 	}
 
@@ -392,7 +444,7 @@ func wsMetrixHandler(w http.ResponseWriter, r *http.Request) {
 		list[i].Index = i + 1
 	}
 
-	conn.WriteJSON(WSResponse{Status: "success", Results: list})
+	send(WSResponse{Status: "success", Results: list})
 }
 
 func main() {
@@ -451,11 +503,9 @@ func cohMetrixPortHandler(w http.ResponseWriter, r *http.Request) {
 
 		} else {
 
-			_, list, err := callMetrix("port", text)
+			_, list, err := callMetrix(r.Context(), "port", text, nil)
 			if err != nil {
-				log.Println(err)
-				w.WriteHeader(http.StatusInternalServerError)
-				fmt.Fprint(w, "Error "+err.Error())
+				writeMetrixError(w, "", err)
 				return
 			}
 
@@ -564,11 +614,9 @@ func nilcMetrixCallOld(w http.ResponseWriter, r *http.Request, lang string) {
 				pInfo.ShowMessage = true
 			} else {
 
-				_, list, err := callMetrix("_all", text)
+				_, list, err := callMetrix(r.Context(), "_all", text, nil)
 				if err != nil {
-					log.Println(err)
-					w.WriteHeader(http.StatusInternalServerError)
-					fmt.Fprint(w, "Error "+err.Error())
+					writeMetrixError(w, "", err)
 					return
 				}
 
@@ -649,12 +697,9 @@ func metricsHandler(w http.ResponseWriter, r *http.Request) {
 	// 	return
 	// }
 
-	plain, list, err := callMetrix(subset, text)
+	plain, list, err := callMetrix(r.Context(), subset, text, nil)
 	if err != nil {
-		ret += "Error " + err.Error()
-		log.Println(ret)
-		w.WriteHeader(http.StatusInternalServerError)
-		fmt.Fprint(w, ret)
+		writeMetrixError(w, ret, err)
 		return
 	}
 
@@ -671,35 +716,76 @@ func metricsHandler(w http.ResponseWriter, r *http.Request) {
 func metrixResultToJSON(list []MetrixResultItem) string {
 	ret := "{"
 	for _, item := range list {
-		ret += "\"" + item.Metric + "\":" + item.Value + ","
+		key, _ := json.Marshal(item.Metric)
+		value := item.Value
+		if v, err := strconv.ParseFloat(value, 64); err != nil || math.IsNaN(v) || math.IsInf(v, 0) {
+			value = "null"
+		}
+		ret += string(key) + ":" + value + ","
 	}
 	ret = strings.TrimSuffix(ret, ",")
 	ret += "}"
 	return ret
 }
 
-func callMetrix(subset string, text string) (string, []MetrixResultItem, error) {
-	shellOut, err := execShellMetrix(subset, text)
+// callMetrix returns the metrics of a text. Computations wait for a slot in
+// the job queue. progress, if not nil, is told the queue position while
+// waiting and the results of each category as they are done; requests
+// answered from the cache or joining a running computation get neither.
+// It fails with errQueueFull if the queue is full and with ctx.Err() once
+// ctx is done.
+func callMetrix(ctx context.Context, subset string, text string, progress *metrixProgress) (string, []MetrixResultItem, error) {
+	start := time.Now()
+	result, err := metrixCache.get(ctx, subset, text, func(ctx context.Context) (metrixResult, error) {
+		release, err := jobs.acquire(ctx, progress.onQueued())
+		if err != nil {
+			return metrixResult{}, err
+		}
+		defer release()
+		return computeMetrix(ctx, subset, text, progress.onCategory())
+	})
+	requestDuration.Observe(time.Since(start).Seconds(), subset)
 	if err != nil {
+		requestsTotal.Inc(subset, requestStatus(err))
 		return "", []MetrixResultItem{}, err
 	}
+	requestsTotal.Inc(subset, "ok")
+
+	return result.plain, result.list, nil
+}
+
+func requestStatus(err error) string {
+	switch err {
+	case errQueueFull:
+		return "rejected"
+	case context.Canceled, context.DeadlineExceeded:
+		return "cancelled"
+	}
+	return "error"
+}
 
-	list := shellOutToList(shellOut)
+// writeMetrixError answers a request whose callMetrix failed.
+func writeMetrixError(w http.ResponseWriter, ret string, err error) {
+	log.Println(ret + "Error " + err.Error())
+	if err == errQueueFull {
+		w.Header().Set("Retry-After", "30")
+		w.WriteHeader(http.StatusTooManyRequests)
+	} else {
+		w.WriteHeader(http.StatusInternalServerError)
+	}
+	fmt.Fprint(w, ret+"Error "+err.Error())
+}
 
-	return shellOut, list, nil
+func computeMetrix(ctx context.Context, subset string, text string, onFrame func(responseFrame)) (metrixResult, error) {
+	return execMetrix(ctx, subset, cleanText(text), onFrame)
 }
 
-func preProc(text string) string {
-	text = strings.Replace(text, "\"", "{{quotes}}", -1)
-	text = strings.Replace(text, "“", "{{quotes}}", -1)
-	text = strings.Replace(text, "”", "{{quotes}}", -1)
-	text = strings.Replace(text, "\r\n", "{{enter}}", -1)
-	text = strings.Replace(text, "\n", "{{enter}}", -1)
-	text = strings.Replace(text, "!", "{{exclamation}}", -1)
-	text = strings.Replace(text, "#", "{{sharp}}", -1)
-	text = strings.Replace(text, "&", "{{ampersand}}", -1)
-	text = strings.Replace(text, "%", "{{percent}}", -1)
-	text = strings.Replace(text, "$", "{{dollar}}", -1)
+// cleanText applies the substitutions the metric scripts have always been
+// given the text with: straight quotes, LF line breaks and a few accents.
+func cleanText(text string) string {
+	text = strings.Replace(text, "“", "\"", -1)
+	text = strings.Replace(text, "”", "\"", -1)
+	text = strings.Replace(text, "\r\n", "\n", -1)
 	text = strings.Replace(text, "è", "e", -1)
 	text = strings.Replace(text, "ì", "i", -1)
 	text = strings.Replace(text, "ò", "o", -1)
@@ -713,41 +799,63 @@ func preProc(text string) string {
 	return text
 }
 
-func execShellMetrix(subset string, text string) (string, error) {
-	log.Println("/bin/bash", "-c", "python3 /opt/text_metrics/run"+subset+".py \""+text+"\"")
-
-	text = preProc(text)
+// execMetrix runs a metric script, sending the text on its stdin and
+// reading the results from its stdout (see protocol.go). If onFrame is not
+// nil the script streams each category and onFrame receives it as soon as
+// it is done.
+func execMetrix(ctx context.Context, subset string, text string, onFrame func(responseFrame)) (metrixResult, error) {
+	script := "/opt/text_metrics/run" + subset + ".py"
+	log.Printf("python3 %s --stdin (%d bytes)\n", script, len(text))
 
-	cmd := exec.Command("/bin/bash", "-c", "python3 /opt/text_metrics/run"+subset+".py \""+text+"\"")
-	out, err := cmd.CombinedOutput()
+	request, err := encodeFrame(metrixRequest{Text: text, Stream: onFrame != nil})
 	if err != nil {
-		return "", fmt.Errorf("cmd.Run() failed with %v", err.Error())
+		return metrixResult{}, err
 	}
-	fmt.Printf("combined out:\n%s\n", string(out))
-	return string(out), nil
-}
 
-func shellOutToList(shellOut string) []MetrixResultItem {
-	list := []MetrixResultItem{}
+	// The process is killed if every request waiting for it goes away.
+	cmd := exec.CommandContext(ctx, "python3", script, "--stdin")
+	cmd.Stdin = bytes.NewReader(request)
+	output := &frameWriter{onFrame: onFrame}
+	cmd.Stdout = output
+	var stderr bytes.Buffer
+	cmd.Stderr = &stderr
 
-	out := strings.Split(shellOut, "++")
-	if len(out) < 2 {
-		return list
+	// Have text_metrics.profiling write its per-text record, with the
+	// category timings and cache counts, for /metrics.
+	profile, err := ioutil.TempFile("", "nilc-profile-*.jsonl")
+	if err == nil {
+		profile.Close()
+		defer os.Remove(profile.Name())
+		cmd.Env = append(os.Environ(), "NILC_PROFILE_OUT="+profile.Name())
 	}
-	feats := strings.Split(strings.TrimSpace(out[1]), ",")
 
-	for i, feat := range feats {
-		kv := strings.Split(feat, ":")
-		if len(kv) > 1 {
-			metricName := strings.TrimSpace(kv[0])
-			if metric, found := metricMap[metricName]; found {
-				list = append(list, MetrixResultItem{i, metric.Key, metric.Class, metric.Source, metric.Level, kv[1], metric.Desc})
-			} else {
-				list = append(list, MetrixResultItem{i, metricName, "", "", "", kv[1], ""})
-			}
-		}
+	pythonProcesses.Add(1)
+	err = cmd.Run()
+	pythonProcesses.Add(-1)
+	if profile != nil {
+		observePythonProfile(profile.Name())
+	}
+	if ctx.Err() != nil {
+		return metrixResult{}, ctx.Err()
+	}
+	result, resultErr := output.Result()
+	if resultErr != nil || err != nil {
+		fmt.Printf("stderr:\n%s\n", stderr.String())
+	}
+	if resultErr != nil {
+		return metrixResult{}, resultErr
+	}
+	if err != nil {
+		return metrixResult{}, fmt.Errorf("cmd.Run() failed with %v", err.Error())
+	}
+	return result, nil
+}
+
+func newResultItem(index int, metricName string, value string) MetrixResultItem {
+	if metric, found := metricMap[metricName]; found {
+		return MetrixResultItem{index, metric.Key, metric.Class, metric.Source, metric.Level, value, metric.Desc}
 	}
-	return list
+	return MetrixResultItem{index, metricName, "", "", "", value, ""}
 }
 
 func palavrasHandler(w http.ResponseWriter, r *http.Request) {
@@ -0,0 +1,184 @@
+package main
+
+// The protocol between the server and the run_*.py scripts (see
+// text_metrics/protocol.py). A script called with --stdin reads one request
+// frame from stdin and writes response frames to stdout; a frame is a
+// 4-byte big-endian length followed by that many bytes of JSON. With
+// "stream" set, one "category" frame is written as each category is done,
+// before the final "result" frame. A script with its own output for the
+// plain API format sends it in the "plain" field of the result.
+
+import (
+	"encoding/binary"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"math"
+	"sort"
+	"strconv"
+	"strings"
+	"sync"
+)
+
+const maxFrameSize = 64 << 20
+
+type metrixRequest struct {
+	Text   string `json:"text"`
+	Stream bool   `json:"stream"`
+}
+
+// metricPair is a [name, value] pair; the value is null when it is not a
+// finite number.
+type metricPair struct {
+	Name  string
+	Value *float64
+}
+
+func (p *metricPair) UnmarshalJSON(data []byte) error {
+	var pair []json.RawMessage
+	if err := json.Unmarshal(data, &pair); err != nil {
+		return err
+	}
+	if len(pair) != 2 {
+		return fmt.Errorf("invalid metric %s", data)
+	}
+	if err := json.Unmarshal(pair[0], &p.Name); err != nil {
+		return err
+	}
+	return json.Unmarshal(pair[1], &p.Value)
+}
+
+type responseFrame struct {
+	Type     string       `json:"type"` // "category", "result" or "error"
+	Category string       `json:"category"`
+	Metrics  []metricPair `json:"metrics"`
+	Plain    *string      `json:"plain"`
+	Message  string       `json:"message"`
+}
+
+func encodeFrame(v interface{}) ([]byte, error) {
+	data, err := json.Marshal(v)
+	if err != nil {
+		return nil, err
+	}
+	frame := make([]byte, 4, 4+len(data))
+	binary.BigEndian.PutUint32(frame, uint32(len(data)))
+	return append(frame, data...), nil
+}
+
+// formatValue formats a metric value for display; undefined values are
+// shown as "nan", as the scripts always printed them.
+func formatValue(v *float64) string {
+	if v == nil || math.IsNaN(*v) || math.IsInf(*v, 0) {
+		return "nan"
+	}
+	return strconv.FormatFloat(*v, 'f', -1, 64)
+}
+
+func pairsToList(pairs []metricPair) []MetrixResultItem {
+	list := make([]MetrixResultItem, 0, len(pairs))
+	for i, pair := range pairs {
+		list = append(list, newResultItem(i, pair.Name, formatValue(pair.Value)))
+	}
+	return list
+}
+
+// pairsToPlain gives the "++ name:value,... ++" summary the scripts used to
+// print, for the plain API format of the scripts that do not send their own.
+func pairsToPlain(pairs []metricPair) string {
+	var b strings.Builder
+	b.WriteString("++ ")
+	for _, pair := range pairs {
+		b.WriteString(pair.Name + ":" + formatValue(pair.Value) + ",")
+	}
+	b.WriteString(" ++\n")
+	return b.String()
+}
+
+// metrixProgress receives updates on a running computation; nil fields are
+// skipped.
+type metrixProgress struct {
+	queued   func(position int)
+	category func(name string, items []MetrixResultItem)
+}
+
+func (p *metrixProgress) onQueued() func(int) {
+	if p == nil {
+		return nil
+	}
+	return p.queued
+}
+
+func (p *metrixProgress) onCategory() func(responseFrame) {
+	if p == nil || p.category == nil {
+		return nil
+	}
+	return func(frame responseFrame) {
+		list := pairsToList(frame.Metrics)
+		sort.Sort(MetrixResultOrder(list))
+		p.category(frame.Category, list)
+	}
+}
+
+// frameWriter takes the stdout of a metric process, passing "category"
+// frames to onFrame as they arrive and keeping the last "result" or
+// "error" frame.
+type frameWriter struct {
+	mu      sync.Mutex
+	buf     []byte
+	err     error
+	result  *responseFrame
+	onFrame func(responseFrame)
+}
+
+func (w *frameWriter) Write(p []byte) (int, error) {
+	w.mu.Lock()
+	defer w.mu.Unlock()
+	if w.err != nil {
+		return len(p), nil
+	}
+	w.buf = append(w.buf, p...)
+	for len(w.buf) >= 4 {
+		size := binary.BigEndian.Uint32(w.buf)
+		if size > maxFrameSize {
+			w.err = fmt.Errorf("frame of %d bytes", size)
+			return len(p), nil
+		}
+		if len(w.buf) < 4+int(size) {
+			break
+		}
+		var frame responseFrame
+		if err := json.Unmarshal(w.buf[4:4+size], &frame); err != nil {
+			w.err = fmt.Errorf("invalid frame: %v", err)
+			return len(p), nil
+		}
+		w.buf = w.buf[4+size:]
+		if frame.Type == "category" {
+			if w.onFrame != nil {
+				w.onFrame(frame)
+			}
+		} else {
+			w.result = &frame
+		}
+	}
+	return len(p), nil
+}
+
+// Result returns the result of the computation.
+func (w *frameWriter) Result() (metrixResult, error) {
+	w.mu.Lock()
+	defer w.mu.Unlock()
+	switch {
+	case w.err != nil:
+		return metrixResult{}, w.err
+	case w.result == nil:
+		return metrixResult{}, errors.New("no result from the metric process")
+	case w.result.Type == "error":
+		return metrixResult{}, errors.New(w.result.Message)
+	}
+	plain := pairsToPlain(w.result.Metrics)
+	if w.result.Plain != nil {
+		plain = *w.result.Plain
+	}
+	return metrixResult{plain, pairsToList(w.result.Metrics)}, nil
+}
@@ -0,0 +1,157 @@
+package main
+
+// Admission control for the Python metric processes.
+//
+// At most NILC_MAX_JOBS computations run at once (default: half the CPUs,
+// at least one); up to NILC_MAX_QUEUE more wait in FIFO order (default 50)
+// and anything beyond that is rejected with errQueueFull, which the HTTP
+// handlers turn into 429 Too Many Requests. A waiting job can follow its
+// position in the queue and leaves it as soon as its context is cancelled.
+
+import (
+	"container/list"
+	"context"
+	"errors"
+	"runtime"
+	"sync"
+	"time"
+)
+
+var errQueueFull = errors.New("server busy, try again later")
+
+type queuedJob struct {
+	ready   chan struct{} // closed when the job is given a slot
+	moved   chan struct{} // signalled when the job's position changes
+	granted bool
+}
+
+type jobQueue struct {
+	mu         sync.Mutex
+	maxRunning int
+	maxWaiting int
+	running    int
+	waiting    *list.List // of *queuedJob
+}
+
+func newJobQueue(maxRunning int, maxWaiting int) *jobQueue {
+	if maxRunning < 1 {
+		maxRunning = 1
+	}
+	jobsCapacity.Set(float64(maxRunning))
+	return &jobQueue{
+		maxRunning: maxRunning,
+		maxWaiting: maxWaiting,
+		waiting:    list.New(),
+	}
+}
+
+// acquire waits for a free slot. onPosition, if not nil, is called with the
+// job's 1-based position whenever it changes while waiting. The returned
+// function must be called to give the slot back.
+func (q *jobQueue) acquire(ctx context.Context, onPosition func(int)) (func(), error) {
+	q.mu.Lock()
+	if q.running < q.maxRunning && q.waiting.Len() == 0 {
+		q.running++
+		q.updateGauges()
+		q.mu.Unlock()
+		return q.release, nil
+	}
+	if q.waiting.Len() >= q.maxWaiting {
+		q.mu.Unlock()
+		jobsRejected.Inc()
+		return nil, errQueueFull
+	}
+	job := &queuedJob{ready: make(chan struct{}), moved: make(chan struct{}, 1)}
+	el := q.waiting.PushBack(job)
+	position := q.waiting.Len()
+	q.updateGauges()
+	q.mu.Unlock()
+
+	start := time.Now()
+	if onPosition != nil {
+		onPosition(position)
+	}
+	for {
+		select {
+		case <-job.ready:
+			queueWait.Observe(time.Since(start).Seconds())
+			return q.release, nil
+		case <-job.moved:
+			q.mu.Lock()
+			position = q.position(el)
+			q.mu.Unlock()
+			if position > 0 && onPosition != nil {
+				onPosition(position)
+			}
+		case <-ctx.Done():
+			q.mu.Lock()
+			if job.granted {
+				// The slot arrived together with the cancellation.
+				q.mu.Unlock()
+				q.release()
+			} else {
+				q.waiting.Remove(el)
+				q.notifyMoved()
+				q.updateGauges()
+				q.mu.Unlock()
+			}
+			jobsCancelled.Inc()
+			return nil, ctx.Err()
+		}
+	}
+}
+
+// release hands the slot to the first waiting job, or frees it.
+func (q *jobQueue) release() {
+	q.mu.Lock()
+	defer q.mu.Unlock()
+	if front := q.waiting.Front(); front != nil {
+		job := q.waiting.Remove(front).(*queuedJob)
+		job.granted = true
+		close(job.ready)
+		q.notifyMoved()
+	} else {
+		q.running--
+	}
+	q.updateGauges()
+}
+
+// position returns the 1-based position of a waiting job, or 0 if it is no
+// longer waiting; q.mu must be held.
+func (q *jobQueue) position(el *list.Element) int {
+	i := 1
+	for e := q.waiting.Front(); e != nil; e = e.Next() {
+		if e == el {
+			return i
+		}
+		i++
+	}
+	return 0
+}
+
+// notifyMoved tells every waiting job that its position changed; q.mu must
+// be held.
+func (q *jobQueue) notifyMoved() {
+	for e := q.waiting.Front(); e != nil; e = e.Next() {
+		select {
+		case e.Value.(*queuedJob).moved <- struct{}{}:
+		default:
+		}
+	}
+}
+
+// updateGauges exports the queue state; q.mu must be held.
+func (q *jobQueue) updateGauges() {
+	jobsRunning.Set(float64(q.running))
+	jobsWaiting.Set(float64(q.waiting.Len()))
+}
+
+func defaultMaxJobs() int {
+	n := runtime.NumCPU() / 2
+	if n < 1 {
+		n = 1
+	}
+	return n
+}
+
+var jobs = newJobQueue(envInt("NILC_MAX_JOBS", defaultMaxJobs()), envInt("NILC_MAX_QUEUE", 50))
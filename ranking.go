@@ -2,7 +2,6 @@ package main
 
 import (
 	"bytes"
-	"fmt"
 	"io/ioutil"
 	"log"
 	"net/http"
@@ -51,11 +50,9 @@ func simpligoRankingHandler(w http.ResponseWriter, r *http.Request) {
 			parsed := senter.ParseText(text)
 			for _, p := range parsed.Paragraphs {
 				for _, s := range p.Sentences {
-					_, list, err := callMetrix("_all", s.Text)
+					_, list, err := callMetrix(r.Context(), "_all", s.Text, nil)
 					if err != nil {
-						log.Println(err)
-						w.WriteHeader(http.StatusInternalServerError)
-						fmt.Fprint(w, "Error "+err.Error())
+						writeMetrixError(w, "", err)
 						return
 					}
 					jsonFeatsList += metrixResultToJSON(list) + ","
@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 import text_metrics
+from text_metrics.protocol import serve
 import sys
 import time
 import os
 import json
 from datetime import datetime
 
+# Called by the server: the text comes on stdin (text_metrics/protocol.py).
+if sys.argv[1:] == ['--stdin']:
+    sys.exit(serve(text_metrics.nilc_metrics))
+
 text = sys.argv[1]
 use_json = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2].lower() in ['true', '1', 'yes'] else False
 raw = text.replace('{{quotes}}', '"')
@@ -7,6 +7,13 @@ on the @timed / timed_block instrumentation declared in
 text_metrics/profiling.py. At process exit a per-bucket report is printed
 to stderr covering DB methods, JVM calls, ResourcePool cache misses, and
 per-metric wall time.
+
+Set NILC_PROFILE_OUT=profile.jsonl to also get the per-text record (timing
+buckets, cache hit/miss counts, text size, peak RSS growth) as JSON, and
+NILC_PROFILE_SAMPLE=5 to sample stacks every 5ms into flamegraph-ready
+collapsed stacks per metric, or NILC_PROFILE_MEMORY=1 for tracemalloc
+peak/retained memory per metric and resource (see
+text_metrics/profiling.py).
 """
 
 import os
@@ -14,6 +21,8 @@ os.environ.setdefault("NILC_PROFILE", "1")
 
 import sys
 import text_metrics
+from text_metrics.profiling import profiler
+from text_metrics.resource_pool import rp
 
 
 def normalize_text(text):
@@ -30,4 +39,6 @@ def normalize_text(text):
 if __name__ == "__main__":
     raw = normalize_text(sys.argv[1])
     t = text_metrics.Text(raw)
-    text_metrics.nilc_metrics.values_for_text(t)
+    profiler.start_text("text")
+    text_metrics.nilc_metrics.values_for_text(t, rp)
+    profiler.end_text("text", text=t, rp=rp)
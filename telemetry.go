@@ -0,0 +1,262 @@
+package main
+
+// Service metrics in the Prometheus text exposition format, served at
+// /metrics. The handful of counters, gauges and histograms needed here are
+// implemented directly instead of pulling in the client library.
+
+import (
+	"encoding/json"
+	"fmt"
+	"io"
+	"io/ioutil"
+	"log"
+	"math"
+	"net/http"
+	"sort"
+	"strings"
+	"sync"
+)
+
+type metricVec struct {
+	mu     sync.Mutex
+	name   string
+	help   string
+	kind   string
+	labels []string
+	values map[string]float64
+	// histograms only
+	buckets []float64
+	counts  map[string][]uint64
+	sums    map[string]float64
+}
+
+var telemetryRegistry []*metricVec
+
+func newMetricVec(kind, name, help string, labels []string) *metricVec {
+	m := &metricVec{
+		name:   name,
+		help:   help,
+		kind:   kind,
+		labels: labels,
+		values: map[string]float64{},
+		counts: map[string][]uint64{},
+		sums:   map[string]float64{},
+	}
+	telemetryRegistry = append(telemetryRegistry, m)
+	return m
+}
+
+func newCounterVec(name, help string, labels ...string) *metricVec {
+	return newMetricVec("counter", name, help, labels)
+}
+
+func newGaugeVec(name, help string, labels ...string) *metricVec {
+	return newMetricVec("gauge", name, help, labels)
+}
+
+func newHistogramVec(name, help string, buckets []float64, labels ...string) *metricVec {
+	m := newMetricVec("histogram", name, help, labels)
+	m.buckets = buckets
+	return m
+}
+
+func (m *metricVec) key(labelValues []string) string {
+	if len(labelValues) != len(m.labels) {
+		panic(fmt.Sprintf("%s: got %d label values, want %d", m.name, len(labelValues), len(m.labels)))
+	}
+	return strings.Join(labelValues, "\xff")
+}
+
+// Add adds v to a counter or gauge.
+func (m *metricVec) Add(v float64, labelValues ...string) {
+	k := m.key(labelValues)
+	m.mu.Lock()
+	m.values[k] += v
+	m.mu.Unlock()
+}
+
+// Inc adds one to a counter or gauge.
+func (m *metricVec) Inc(labelValues ...string) {
+	m.Add(1, labelValues...)
+}
+
+// Set sets a gauge.
+func (m *metricVec) Set(v float64, labelValues ...string) {
+	k := m.key(labelValues)
+	m.mu.Lock()
+	m.values[k] = v
+	m.mu.Unlock()
+}
+
+// Observe records one value in a histogram.
+func (m *metricVec) Observe(v float64, labelValues ...string) {
+	k := m.key(labelValues)
+	m.mu.Lock()
+	counts, found := m.counts[k]
+	if !found {
+		counts = make([]uint64, len(m.buckets)+1)
+		m.counts[k] = counts
+	}
+	i := sort.SearchFloat64s(m.buckets, v)
+	counts[i]++
+	m.sums[k] += v
+	m.mu.Unlock()
+}
+
+func escapeLabelValue(v string) string {
+	v = strings.Replace(v, `\`, `\\`, -1)
+	v = strings.Replace(v, "\n", `\n`, -1)
+	return strings.Replace(v, `"`, `\"`, -1)
+}
+
+func (m *metricVec) labelString(k string, extra ...string) string {
+	pairs := []string{}
+	if len(m.labels) > 0 {
+		for i, v := range strings.Split(k, "\xff") {
+			pairs = append(pairs, m.labels[i]+`="`+escapeLabelValue(v)+`"`)
+		}
+	}
+	for i := 0; i+1 < len(extra); i += 2 {
+		pairs = append(pairs, extra[i]+`="`+extra[i+1]+`"`)
+	}
+	if len(pairs) == 0 {
+		return ""
+	}
+	return "{" + strings.Join(pairs, ",") + "}"
+}
+
+func formatFloat(v float64) string {
+	if math.IsInf(v, 1) {
+		return "+Inf"
+	}
+	return fmt.Sprintf("%g", v)
+}
+
+func (m *metricVec) write(w io.Writer) {
+	m.mu.Lock()
+	defer m.mu.Unlock()
+
+	fmt.Fprintf(w, "# HELP %s %s\n# TYPE %s %s\n", m.name, m.help, m.name, m.kind)
+	if m.kind != "histogram" {
+		keys := make([]string, 0, len(m.values))
+		for k := range m.values {
+			keys = append(keys, k)
+		}
+		sort.Strings(keys)
+		for _, k := range keys {
+			fmt.Fprintf(w, "%s%s %s\n", m.name, m.labelString(k), formatFloat(m.values[k]))
+		}
+		return
+	}
+
+	keys := make([]string, 0, len(m.counts))
+	for k := range m.counts {
+		keys = append(keys, k)
+	}
+	sort.Strings(keys)
+	for _, k := range keys {
+		var cumulative uint64
+		for i, count := range m.counts[k] {
+			cumulative += count
+			le := math.Inf(1)
+			if i < len(m.buckets) {
+				le = m.buckets[i]
+			}
+			fmt.Fprintf(w, "%s_bucket%s %d\n", m.name, m.labelString(k, "le", formatFloat(le)), cumulative)
+		}
+		fmt.Fprintf(w, "%s_sum%s %s\n", m.name, m.labelString(k), formatFloat(m.sums[k]))
+		fmt.Fprintf(w, "%s_count%s %d\n", m.name, m.labelString(k), cumulative)
+	}
+}
+
+var (
+	durationBuckets = []float64{0.1, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 900}
+
+	requestsTotal = newCounterVec("nilcmetrix_requests_total",
+		"Metric computations, by subset and status (ok, error, rejected, cancelled).", "subset", "status")
+	requestDuration = newHistogramVec("nilcmetrix_request_duration_seconds",
+		"Wall time of a metric computation, by subset.", durationBuckets, "subset")
+	pythonProcesses = newGaugeVec("nilcmetrix_python_processes",
+		"Python metric processes currently running.")
+	categoryDuration = newHistogramVec("nilcmetrix_category_duration_seconds",
+		"Python-side wall time of each metric category, from text_metrics.profiling.",
+		durationBuckets, "category")
+	pythonCacheEvents = newCounterVec("nilcmetrix_python_cache_events_total",
+		"Python-side cache lookups (resource pool, stemmer), by cache and result (hit, miss).",
+		"cache", "result")
+	resultCacheEvents = newCounterVec("nilcmetrix_result_cache_events_total",
+		"Result cache lookups, by result (hit, miss, coalesced with a running computation).",
+		"result")
+	resultCacheEntries = newGaugeVec("nilcmetrix_result_cache_entries",
+		"Results currently cached.")
+	jobsCapacity = newGaugeVec("nilcmetrix_jobs_capacity",
+		"Maximum number of metric computations running at once (NILC_MAX_JOBS).")
+	jobsRunning = newGaugeVec("nilcmetrix_jobs_running",
+		"Metric computations holding a job slot.")
+	jobsWaiting = newGaugeVec("nilcmetrix_jobs_waiting",
+		"Metric computations waiting in the job queue.")
+	jobsRejected = newCounterVec("nilcmetrix_jobs_rejected_total",
+		"Metric computations rejected because the job queue was full.")
+	jobsCancelled = newCounterVec("nilcmetrix_jobs_cancelled_total",
+		"Metric computations cancelled while waiting in the job queue.")
+	queueWait = newHistogramVec("nilcmetrix_queue_wait_seconds",
+		"Time spent waiting in the job queue.", durationBuckets)
+)
+
+func init() {
+	pythonProcesses.Set(0)
+	resultCacheEntries.Set(0)
+	jobsRunning.Set(0)
+	jobsWaiting.Set(0)
+	jobsRejected.Add(0)
+	jobsCancelled.Add(0)
+}
+
+func telemetryHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "text/plain; version=0.0.4")
+	for _, m := range telemetryRegistry {
+		m.write(w)
+	}
+}
+
+// pythonProfile is the per-text record written by text_metrics.profiling
+// to the file named by NILC_PROFILE_OUT.
+type pythonProfile struct {
+	Seconds float64 `json:"seconds"`
+	Buckets map[string]struct {
+		Calls   int     `json:"calls"`
+		Seconds float64 `json:"seconds"`
+	} `json:"buckets"`
+	Caches map[string]struct {
+		Hits   int `json:"hits"`
+		Misses int `json:"misses"`
+	} `json:"caches"`
+}
+
+// observePythonProfile forwards the records in a NILC_PROFILE_OUT file.
+func observePythonProfile(path string) {
+	data, err := ioutil.ReadFile(path)
+	if err != nil {
+		log.Println("Reading python profile:", err)
+		return
+	}
+	for _, line := range strings.Split(string(data), "\n") {
+		if strings.TrimSpace(line) == "" {
+			continue
+		}
+		var profile pythonProfile
+		if err := json.Unmarshal([]byte(line), &profile); err != nil {
+			log.Println("Parsing python profile:", err)
+			continue
+		}
+		for bucket, b := range profile.Buckets {
+			if strings.HasPrefix(bucket, "category.") {
+				categoryDuration.Observe(b.Seconds, strings.TrimPrefix(bucket, "category."))
+			}
+		}
+		for cache, c := range profile.Caches {
+			pythonCacheEvents.Add(float64(c.Hits), cache, "hit")
+			pythonCacheEvents.Add(float64(c.Misses), cache, "miss")
+		}
+	}
+}
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the metric categories over tests/inputs at several text sizes.
+
+Usage:
+    python tests/benchmark.py                  # run and compare to baseline
+    python tests/benchmark.py --save-baseline  # run and store the baseline
+    python tests/benchmark.py --scales 1 4 -- cartomante_enredo pau_brasil
+
+Each input text is also concatenated with itself 4x, 16x and 64x (by
+default), so the table printed at the end shows how every category scales
+with text length; the "slope" column is the log-log growth between the
+smallest and largest scale (1.0 is linear, 2.0 quadratic).
+
+For each category and scale the wall time is summed over the inputs and the
+peak traced Python memory (tracemalloc) is the largest over them; time
+spent in each ResourcePool resource (the rp.* profiling buckets) is
+recorded as well. Categories run in a fixed order over one resource pool,
+so a per-text resource (tagging, parsing) is charged to the first category
+that needs it.
+
+The run is compared against the baseline JSON (tests/benchmark_baseline.json
+by default): the exit status is 1 if any category got slower, or used more
+memory, than the baseline by more than --threshold (relative) and
+--min-seconds / --min-kb (absolute, to ignore noise on tiny numbers).
+
+--pool MODULE:CALLABLE selects the factory of the ResourcePool used for the
+run, so external tools (JVM parsers, Palavras, Postgres) can be swapped for
+stand-ins that need none of them.
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+# Turn on the rp.* timing buckets before text_metrics is imported.
+os.environ.setdefault("NILC_PROFILE", "1")
+
+# Allow running as a plain script from the repo root.
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from tests.conftest import INPUTS_DIR, read_text  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+DEFAULT_POOL = "text_metrics.resource_pool:DefaultResourcePool"
+DEFAULT_SCALES = (1, 4, 16, 64)
+
+
+def load_callable(spec):
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def scale_text(raw, scale):
+    """Concatenate a text with itself, one copy per paragraph block."""
+    return "\n\n".join([raw.strip()] * scale)
+
+
+def _resolve_inputs(stems):
+    if not stems:
+        return sorted(INPUTS_DIR.glob("*.txt"))
+    paths = [INPUTS_DIR / (stem + ".txt") for stem in stems]
+    missing = [p.stem for p in paths if not p.exists()]
+    if missing:
+        sys.stderr.write("Missing input file(s): {}\n".format(", ".join(missing)))
+        sys.exit(1)
+    return paths
+
+
+def _rp_buckets(profiler):
+    return dict((k, tuple(v)) for k, v in profiler._buckets.items()
+                if k.startswith("rp."))
+
+
+def measure_text(metrics_set, text, rp, profiler, trace_memory=True):
+    """Run every category of `metrics_set` over `text`.
+
+    :returns: ({category: {"seconds", "peak_kb"}},
+               {resource: {"calls", "seconds"}})
+    """
+    categories = {}
+    before = _rp_buckets(profiler)
+    for cat in metrics_set.categories:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        cat.values_for_text(text, rp)
+        elapsed = time.perf_counter() - start
+        peak_kb = None
+        if trace_memory:
+            peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        categories[cat.name] = {"seconds": elapsed, "peak_kb": peak_kb}
+
+    resources = {}
+    for bucket, (calls, seconds) in _rp_buckets(profiler).items():
+        calls0, seconds0 = before.get(bucket, (0, 0.0))
+        if calls > calls0:
+            resources[bucket[len("rp."):]] = {"calls": calls - calls0,
+                                              "seconds": seconds - seconds0}
+    return categories, resources
+
+
+def run(paths, scales, metrics_set, pool_factory, trace_memory=True,
+        warmup=True):
+    """Benchmark every input at every scale.
+
+    :returns: {"categories": {name: {scale: {"seconds", "peak_kb"}}},
+               "resources": {name: {scale: {"calls", "seconds"}}}}
+    with times and calls summed, and peaks maxed, over the inputs.
+    """
+    import text_metrics
+    from text_metrics.profiling import profiler
+
+    rp = pool_factory()
+    texts = [(p.stem, read_text(p)) for p in paths]
+
+    if warmup and texts:
+        # Load models, word lists and database connections once, outside
+        # the measurements.
+        shortest = min(texts, key=lambda t: len(t[1]))[1]
+        metrics_set.values_for_text(text_metrics.Text(shortest), rp)
+
+    categories = defaultdict(lambda: defaultdict(
+        lambda: {"seconds": 0.0, "peak_kb": 0}))
+    resources = defaultdict(lambda: defaultdict(
+        lambda: {"calls": 0, "seconds": 0.0}))
+
+    for scale in scales:
+        for stem, raw in texts:
+            print("  {} x{}".format(stem, scale), file=sys.stderr)
+            text = text_metrics.Text(scale_text(raw, scale))
+            cats, res = measure_text(metrics_set, text, rp, profiler,
+                                     trace_memory)
+            for name, m in cats.items():
+                total = categories[name][str(scale)]
+                total["seconds"] += m["seconds"]
+                if m["peak_kb"] is not None:
+                    total["peak_kb"] = max(total["peak_kb"], m["peak_kb"])
+            for name, m in res.items():
+                total = resources[name][str(scale)]
+                total["calls"] += m["calls"]
+                total["seconds"] += m["seconds"]
+
+    return {
+        "categories": dict((k, dict(v)) for k, v in categories.items()),
+        "resources": dict((k, dict(v)) for k, v in resources.items()),
+    }
+
+
+def slope(by_scale):
+    """Log-log growth of the time between the smallest and largest scale."""
+    scales = sorted(int(s) for s in by_scale)
+    if len(scales) < 2:
+        return None
+    lo, hi = by_scale[str(scales[0])], by_scale[str(scales[-1])]
+    if lo["seconds"] <= 0 or hi["seconds"] <= 0:
+        return None
+    return (math.log(hi["seconds"] / lo["seconds"]) /
+            math.log(scales[-1] / scales[0]))
+
+
+def print_table(title, rows, scales, out=sys.stdout):
+    print("\n[{}]".format(title), file=out)
+    header = "  {:<32}".format("name") + "".join(
+        "{:>12}".format("x{} s".format(s)) for s in scales) + "{:>8}".format("slope")
+    print(header, file=out)
+    for name, by_scale in sorted(rows.items()):
+        cells = "".join("{:>12.3f}".format(by_scale[str(s)]["seconds"])
+                        if str(s) in by_scale else "{:>12}".format("-")
+                        for s in scales)
+        k = slope(by_scale)
+        print("  {:<32}{}{:>8}".format(name, cells,
+                                      "-" if k is None else "%.2f" % k),
+              file=out)
+
+
+def compare(results, baseline, threshold, min_seconds, min_kb):
+    """Return one line per category and scale that regressed."""
+    regressions = []
+    for name, by_scale in sorted(results["categories"].items()):
+        for scale, m in sorted(by_scale.items(), key=lambda i: int(i[0])):
+            base = baseline.get("categories", {}).get(name, {}).get(scale)
+            if base is None:
+                continue
+            dt = m["seconds"] - base["seconds"]
+            if dt > min_seconds and dt > threshold * base["seconds"]:
+                regressions.append(
+                    "{} x{}: {:.3f}s -> {:.3f}s (+{:.0%})".format(
+                        name, scale, base["seconds"], m["seconds"],
+                        dt / base["seconds"] if base["seconds"] else float("inf")))
+            if m.get("peak_kb") and base.get("peak_kb"):
+                dm = m["peak_kb"] - base["peak_kb"]
+                if dm > min_kb and dm > threshold * base["peak_kb"]:
+                    regressions.append(
+                        "{} x{}: peak {}KB -> {}KB (+{:.0%})".format(
+                            name, scale, base["peak_kb"], m["peak_kb"],
+                            dm / base["peak_kb"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the metric categories over tests/inputs.")
+    parser.add_argument("stems", nargs="*",
+                        help="input stems to run (default: all)")
+    parser.add_argument("--scales", type=int, nargs="+",
+                        default=list(DEFAULT_SCALES),
+                        help="length multipliers (default: 1 4 16 64)")
+    parser.add_argument("-m", "--metrics", default="no_palavras_metrics",
+                        help="metrics set defined in text_metrics "
+                             "(default: no_palavras_metrics)")
+    parser.add_argument("--pool", default=DEFAULT_POOL,
+                        help="MODULE:CALLABLE returning the ResourcePool "
+                             "(default: %s)" % DEFAULT_POOL)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="baseline JSON (default: %s)" % DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results as the new baseline")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="also write the results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative regression allowed (default: 0.25)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="absolute slowdown ignored (default: 0.05)")
+    parser.add_argument("--min-kb", type=int, default=1024,
+                        help="absolute memory growth ignored (default: 1024)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="do not trace memory (faster, timing only)")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="do not run an untimed warm-up pass")
+    args = parser.parse_args(argv)
+
+    import text_metrics
+    from text_metrics.profiling import profiler
+    import atexit
+    atexit.unregister(profiler.report)
+
+    paths = _resolve_inputs(args.stems)
+    scales = sorted(set(args.scales))
+    results = run(paths, scales, getattr(text_metrics, args.metrics),
+                  load_callable(args.pool), trace_memory=not args.no_memory,
+                  warmup=not args.no_warmup)
+    results["config"] = {"metrics": args.metrics, "pool": args.pool,
+                         "inputs": [p.stem for p in paths], "scales": scales}
+
+    print_table("categories", results["categories"], scales)
+    print_table("resources", results["resources"], scales)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print("\nwrote baseline {}".format(args.baseline))
+        return 0
+
+    if not args.baseline.exists():
+        print("\nno baseline at {}; run with --save-baseline first"
+              .format(args.baseline))
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config", {}).get("inputs") != results["config"]["inputs"]:
+        print("\nwarning: baseline was recorded over other inputs",
+              file=sys.stderr)
+    regressions = compare(results, baseline, args.threshold,
+                          args.min_seconds, args.min_kb)
+    if regressions:
+        print("\nREGRESSIONS (threshold {:.0%}):".format(args.threshold))
+        for line in regressions:
+            print("  " + line)
+        return 1
+    print("\nno regressions against {}".format(args.baseline))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
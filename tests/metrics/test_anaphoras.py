@@ -12,7 +12,8 @@ candidate counts small enough to state by hand.
 import pytest
 
 import text_metrics
-from text_metrics.metrics.anaphoras import AdjacentAnaphoricReferences
+from text_metrics.metrics.anaphoras import AdjacentAnaphoricReferences, \
+    compile_referents
 
 
 def adjacent_refs(text):
@@ -48,3 +49,16 @@ class TestAdjacentAnaphoricReferences:
         assert adjacent_refs(
             "As meninas e as professoras chegaram. Elas sorriram. O sino tocou."
         ) == pytest.approx(2.0)
+
+
+class TestCompileReferents:
+
+    def test_the_first_matching_referent_gives_the_category(self):
+        pattern, categories = compile_referents({
+            r'^el[ae]s$': 'ap',
+            r'^elas$': 'fp',
+            r'^ela$': 'fs',
+        })
+        assert categories[pattern.match('elas').lastgroup] == 'ap'
+        assert categories[pattern.match('ela').lastgroup] == 'fs'
+        assert pattern.match('eu') is None
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 """Behavioral tests for metrics in text_metrics/metrics/guten.py."""
 
+import numpy as np
 import pytest
 
 import text_metrics
+from text_metrics.resource_pool import DefaultResourcePool, PosSentenceMatrix
 from text_metrics.metrics.guten import (
     GunningFog,
     PunctuationRatio,
@@ -153,3 +155,40 @@ class TestAdverbsPerSentence:
         assert adverbs_min(self._TEXT) == pytest.approx(1 / 3)
         assert adverbs_max(self._TEXT) == pytest.approx(1 / 3)
         assert adverbs_std(self._TEXT) == pytest.approx(0.0)
+
+
+# ---------------------------------------------------------------------------
+# pos_sentence_matrix — the per-sentence POS counts behind the *_min / _max /
+# _standard_deviation and *_diversity metrics, built in a single pass.
+# ---------------------------------------------------------------------------
+
+class TestPosSentenceMatrix:
+
+    _TEXT = ("O menino comeu a maçã vermelha rapidamente. Ele também "
+             "tinha corrido muito, e estava cansado!")
+
+    def test_counts_match_the_tagged_sentences(self):
+        rp = DefaultResourcePool()
+        text = text_metrics.Text(self._TEXT)
+        tagset = rp.pos_tagger().tagset
+        matrix = rp.pos_sentence_matrix(text)
+
+        sents = rp.tagged_sentences(text)
+        words = [[tok for tok in sent if not tagset.is_punctuation(tok)]
+                 for sent in sents]
+        assert matrix.column('tokens').tolist() == [len(s) for s in sents]
+        assert matrix.column('words').tolist() == [len(s) for s in words]
+        assert matrix.column('nouns').tolist() == \
+            [sum(map(tagset.is_noun, s)) for s in words]
+        assert matrix.words['pronouns'] == \
+            [tok[0].lower() for s in words for tok in s
+             if tagset.is_pronoun(tok)]
+
+    def test_sentence_without_words_raises_zero_division(self):
+        matrix = PosSentenceMatrix(
+            np.array([[2, 2, 1, 1, 1, 0, 0, 0, 0, 0],
+                      [1, 0, 0, 0, 0, 0, 0, 0, 0, 0]]), {})
+        assert matrix.ratios('content_words', per='tokens').tolist() == \
+            [0.5, 0.0]
+        with pytest.raises(ZeroDivisionError):
+            matrix.ratios('nouns')
@@ -2,12 +2,14 @@
 # Regression test harness entry point.
 #
 # Usage:
-#   tests/run_tests.sh [test|update] [--pgs-container NAME] [-- ...extra args]
+#   tests/run_tests.sh [test|update|bench] [--pgs-container NAME] [-- ...extra args]
 #
 # Subcommands:
 #   test     Run pytest against tests/ (default).
 #   update   Regenerate goldens. Extra args after `--` are passed as stems
 #            to update_goldens.py; with none, all goldens are regenerated.
+#   bench    Run the benchmark suite (benchmark.py) and compare it with the
+#            saved baseline. Extra args after `--` are passed to benchmark.py.
 #
 # Flags:
 #   --pgs-container NAME  Docker container exposing the cohmetrix Postgres
@@ -55,9 +57,12 @@ case "$SUBCOMMAND" in
     update)
         INNER="cd /opt/text_metrics && python3 tests/update_goldens.py ${EXTRA_ARGS[*]:-}"
         ;;
+    bench)
+        INNER="cd /opt/text_metrics && python3 tests/benchmark.py ${EXTRA_ARGS[*]:-}"
+        ;;
     *)
         echo "Unknown subcommand: $SUBCOMMAND" >&2
-        echo "Usage: $0 [test|update] [--pgs-container NAME] [-- ...extra args]" >&2
+        echo "Usage: $0 [test|update|bench] [--pgs-container NAME] [-- ...extra args]" >&2
         exit 2
         ;;
 esac
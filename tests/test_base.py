@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for ResultSet / ResultMatrix in text_metrics/base.py."""
+
+import io
+
+import numpy as np
+import pytest
+
+import text_metrics
+from text_metrics.base import Category, Metric, MetricsSet, ResultMatrix
+
+
+class _Length(Metric):
+    name = 'length'
+
+    def value_for_text(self, t, rp=None):
+        return len(t.raw_content)
+
+
+class _Constant(Metric):
+    name = 'constant'
+
+    def value_for_text(self, t, rp=None):
+        return 2.5
+
+
+@pytest.fixture
+def metrics_set():
+    return MetricsSet([Category([_Length(), _Constant()], name='first'),
+                       Category([_Constant()], name='second')])
+
+
+@pytest.fixture
+def texts():
+    return [text_metrics.Text('abc'), text_metrics.Text('abcdef')]
+
+
+class TestResultSet:
+
+    def test_lookup_by_table_and_column_name(self, metrics_set, texts):
+        result = metrics_set.values_for_text(texts[0])
+        assert result['first']['length'] == 3
+        assert result['second']['constant'] == 2.5
+        with pytest.raises(KeyError):
+            result['third']
+
+    def test_lookup_by_name_follows_pop_and_clear(self, metrics_set, texts):
+        result = metrics_set.values_for_text(texts[0])
+        first = result['first']
+        assert first['constant'] == 2.5
+        first.pop(metrics_set.categories[0].metrics[1])
+        with pytest.raises(KeyError) as error:
+            first['constant']
+        assert error.value.args == ('constant',)
+        assert result['second']['constant'] == 2.5
+        result.clear()
+        with pytest.raises(KeyError, match='second'):
+            result['second']
+        assert result.as_matrix().values.shape == (0, 0)
+
+    def test_callback_gets_each_category_when_done(self, metrics_set, texts):
+        done = []
+        result = metrics_set.values_for_text(
+            texts[0], callback=lambda cat, values: done.append(
+                (cat.name, sorted(m.name for m in values))))
+        assert done == [('first', ['constant', 'length']),
+                        ('second', ['constant'])]
+        assert len(result) == 2
+
+    def test_as_array_keeps_every_metric(self, metrics_set, texts):
+        result = metrics_set.values_for_texts(texts)
+        assert result.as_array().tolist() == [[3, 2.5, 2.5], [6, 2.5, 2.5]]
+
+
+class TestResultMatrix:
+
+    def test_matches_the_result_sets(self, metrics_set, texts):
+        matrix = metrics_set.matrix_for_texts(texts)
+        assert matrix.values.shape == (2, 3)
+        assert matrix.values.flags['C_CONTIGUOUS']
+        for i, text in enumerate(texts):
+            flat = metrics_set.values_for_text(text).as_flat_dict()
+            assert matrix.as_flat_dict(i) == flat
+
+    def test_columns_and_rows_are_views(self, metrics_set, texts):
+        matrix = metrics_set.matrix_for_texts(texts)
+        assert matrix['length'].tolist() == [3, 6]
+        assert np.shares_memory(matrix['length'], matrix.as_array())
+        assert np.shares_memory(matrix[1], matrix.as_array())
+
+    def test_write_csv(self, metrics_set, texts):
+        out = io.StringIO()
+        metrics_set.matrix_for_texts(texts).write_csv(out, ids=['a', 'b'])
+        assert out.getvalue().splitlines() == [
+            'id,length,constant,constant', 'a,3,2.5,2.5', 'b,6,2.5,2.5']
+
+    def test_vstack_requires_the_same_columns(self):
+        a = ResultMatrix(['x', 'y'], [[1, 2]])
+        b = ResultMatrix(['x', 'y'], [[3, 4]])
+        assert ResultMatrix.vstack([a, b]).values.tolist() == [[1, 2], [3, 4]]
+        with pytest.raises(ValueError):
+            ResultMatrix.vstack([a, ResultMatrix(['y', 'x'], [[4, 3]])])
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Tests for the input/checkpoint handling of text_metrics/batch.py."""
+
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from text_metrics.batch import (
+    JsonLinesWriter,
+    WorkerPool,
+    iter_inputs,
+    read_manifest,
+    read_output_ids,
+)
+
+
+class TestIterInputs:
+
+    def test_directory_yields_txt_files_in_order(self, tmp_path):
+        (tmp_path / "b.txt").write_text("B", encoding="utf-8")
+        (tmp_path / "a.txt").write_text("A", encoding="utf-8")
+        (tmp_path / "notes.md").write_text("-", encoding="utf-8")
+        ids = [text_id for text_id, _, _ in iter_inputs(str(tmp_path))]
+        assert ids == [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+
+    def test_jsonl_fields_become_metadata(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        path.write_text(json.dumps({"id": 7, "text": "Olá.", "grade": "5"})
+                        + "\n\n", encoding="utf-8")
+        assert list(iter_inputs(str(path))) == [("7", "Olá.", {"grade": "5"})]
+
+
+def test_read_manifest(tmp_path):
+    path = tmp_path / "out.jsonl.done"
+    assert read_manifest(str(path)) == set()
+    path.write_text("a.txt\nb.txt\n", encoding="utf-8")
+    assert read_manifest(str(path)) == {"a.txt", "b.txt"}
+
+
+class TestJsonLinesWriter:
+
+    def test_undefined_values_are_null(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        writer = JsonLinesWriter(str(path))
+        assert writer.write("a", {"x": float("nan"), "y": 1.5, "z": None},
+                            {}) == ["a"]
+        writer.close()
+        record = json.loads(path.read_text(encoding="utf-8"))
+        assert record["metrics"] == {"x": None, "y": 1.5, "z": None}
+
+    def test_resume_drops_an_incomplete_last_line(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_text('{"id": "a"}\n{"id": "b", "me', encoding="utf-8")
+        assert read_output_ids(str(path)) == {"a"}
+        writer = JsonLinesWriter(str(path))
+        writer.write("b", {}, {})
+        writer.close()
+        assert read_output_ids(str(path)) == {"a", "b"}
+
+
+def _stubborn_job(job):
+    """Start a process and a temporary file, like the parsers do, then
+    swallow every exception, like the bare excepts in the metrics."""
+    seconds, report = job
+    child = subprocess.Popen(['sleep', '60'])
+    _, tmp = tempfile.mkstemp()
+    with open(report, 'w') as f:
+        json.dump({'pid': child.pid, 'tmp': tmp}, f)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            time.sleep(0.05)
+        except:  # noqa: E722
+            pass
+    return seconds
+
+
+def _gone(pid):
+    for _ in range(100):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_timeout_kills_the_worker_and_what_it_started(tmp_path):
+    slow, fast = str(tmp_path / "slow.json"), str(tmp_path / "fast.json")
+    pool = WorkerPool(1, _stubborn_job, timeout=0.5)
+    results = list(pool.imap_unordered([(60, slow), (0, fast)]))
+
+    assert results == [((60, slow), None, "timeout after 0.5s"),
+                       ((0, fast), 0, None)]
+    with open(slow) as f:
+        started = json.load(f)
+    assert not os.path.exists(started["tmp"])
+    assert _gone(started["pid"])
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/encoded.py."""
+
+from text_metrics.encoded import EncodedText
+from text_metrics.tools.tag.macmorpho import MacMorphoTagSet
+
+TAGSET = MacMorphoTagSet()
+
+SENTS = [
+    [('O', 'ART'), ('gato', 'N'), ('dormiu', 'V'), ('.', 'PU')],
+    [('Ele', 'PROPESS'), ('também', 'PDEN'), ('dormiu', 'V'), ('!', 'PU')],
+    [],
+    [('Gato', 'N')],
+]
+
+
+def test_tokens_are_coded_against_the_text_vocabulary():
+    encoded = EncodedText(SENTS, TAGSET)
+    assert encoded.vocab == ['O', 'gato', 'dormiu', '.', 'Ele', 'também',
+                             '!', 'Gato']
+    assert encoded.token_ids.tolist() == [0, 1, 2, 3, 4, 5, 2, 6, 7]
+    assert encoded.tag_ids.dtype.name == 'int32'
+    assert encoded.offsets.tolist() == [0, 4, 8, 8, 9]
+    assert encoded.tagged() == [token for sent in SENTS for token in sent]
+
+
+def test_masks_follow_the_tagset_predicates():
+    encoded = EncodedText(SENTS, TAGSET)
+    tokens = [token for sent in SENTS for token in sent]
+    for name in ('noun', 'verb', 'content_word', 'function_word',
+                 'punctuation'):
+        predicate = getattr(TAGSET, 'is_' + name)
+        assert encoded.mask(name).tolist() == [predicate(t) for t in tokens]
+    assert encoded.counts(encoded.mask('noun', 'pronoun')).tolist() == \
+        [1, 1, 0, 1]
+
+
+def test_per_sentence_keeps_empty_sentences():
+    encoded = EncodedText(SENTS, TAGSET)
+    mask = encoded.words_mask
+    assert encoded.per_sentence(encoded.tokens(mask), mask) == [
+        ['O', 'gato', 'dormiu'], ['Ele', 'também', 'dormiu'], [], ['Gato']]
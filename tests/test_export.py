@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Tests for the streaming columnar writers in text_metrics/export.py."""
+
+import json
+
+import pytest
+
+from text_metrics.base import ResultMatrix
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from text_metrics.export import ArrowStreamWriter, ParquetWriter  # noqa: E402
+
+
+class TestArrowStreamWriter:
+
+    def test_ids_are_durable_once_their_batch_is_flushed(self, tmp_path):
+        path = str(tmp_path / "out.arrow")
+        writer = ArrowStreamWriter(path, row_group_size=2)
+        assert writer.write("a", {"x": 1.0}) == []
+        assert writer.write("b", {"x": 2.0}) == ["a", "b"]
+        assert writer.write("c", {"y": 3.0}) == []
+        assert writer.close() == ["c"]
+
+        rows = pa.ipc.open_stream(path).read_all().to_pylist()
+        assert [(r["id"], r["x"]) for r in rows] == [
+            ("a", 1.0), ("b", 2.0), ("c", None)]
+
+
+class TestParquetWriter:
+
+    def test_one_row_group_per_flush(self, tmp_path):
+        path = str(tmp_path / "out.parquet")
+        writer = ParquetWriter(path, row_group_size=1)
+        assert writer.write("a", {"x": 1.0, "y": 2.0}, {"grade": "5"}) == []
+        matrix = ResultMatrix(["x", "y"], [[3, 4], [5, 6]])
+        assert writer.write_matrix(matrix, ids=["b", "c"]) == []
+        # The file only exists, complete, after close.
+        assert not (tmp_path / "out.parquet").exists()
+        assert writer.close() == ["a", "b", "c"]
+
+        parquet = pq.ParquetFile(path)
+        assert parquet.num_row_groups == 2
+        rows = parquet.read().to_pylist()
+        assert [r["id"] for r in rows] == ["a", "b", "c"]
+        assert json.loads(rows[0]["meta"]) == {"grade": "5"}
+        assert [r["y"] for r in rows] == [2.0, 4.0, 6.0]
+
+    def test_closed_files_are_durable(self, tmp_path):
+        path = str(tmp_path / "out.parquet")
+        writer = ParquetWriter(path, row_group_size=2, rows_per_file=2)
+        assert writer.write("a", {"x": 1.0}) == []
+        assert writer.write("b", {"x": 2.0}) == ["a", "b"]
+        assert writer.write("c", {"x": 3.0}) == []
+        # Interrupted here, "a" and "b" are readable.
+        assert pq.read_table(str(tmp_path / "out-00000.parquet")) \
+            .column("id").to_pylist() == ["a", "b"]
+        assert writer.close() == ["c"]
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "out-00000.parquet", "out-00001.parquet"]
+
+    def test_matrix_columns_must_match(self, tmp_path):
+        writer = ParquetWriter(str(tmp_path / "out.parquet"), columns=["x"])
+        with pytest.raises(ValueError):
+            writer.write_matrix(ResultMatrix(["y"], [[1]]))
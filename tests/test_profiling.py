@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/profiling.py."""
+
+import json
+import time
+import tracemalloc
+
+from text_metrics.profiling import _Profiler
+
+
+class _Text(object):
+    raw_content = 'Uma frase. Outra frase.'
+
+
+class _Pool(object):
+    def __init__(self, cached):
+        self._cached = cached
+
+    def peek(self, suffix, *args):
+        return self._cached.get(suffix)
+
+
+def test_text_record_holds_only_the_text_buckets():
+    profiler = _Profiler()
+    profiler.record('rp.tokens', 0.5)
+
+    profiler.start_text('a')
+    profiler.record('rp.tokens', 0.25)
+    profiler.record('rp.tokens', 0.25)
+    profiler.cache_event('rp.tokens', True)
+    profiler.cache_event('rp.tokens', False)
+    profiler.cache_event('rp.tokens', True)
+    profiler.end_text('a')
+
+    profile = profiler.last_text_profile()
+    assert profile['label'] == 'a'
+    assert profile['buckets'] == {'rp.tokens': {'calls': 2, 'seconds': 0.5}}
+    assert profile['caches'] == {'rp.tokens': {'hits': 2, 'misses': 1}}
+
+    # Events outside a text only reach the run totals.
+    profiler.cache_event('rp.tokens', True)
+    assert profiler._caches['rp.tokens'] == [3, 1]
+    assert profiler._buckets['rp.tokens'] == [3, 1.0]
+
+
+def test_text_size_uses_only_cached_resources():
+    profiler = _Profiler()
+    pool = _Pool({'sentences': ['Uma frase.', 'Outra frase.'],
+                  'all_tokens': ['Uma', 'frase', '.', 'Outra', 'frase', '.']})
+
+    profiler.start_text('a')
+    profiler.end_text('a', text=_Text(), rp=pool)
+    assert profiler.last_text_profile()['size'] == \
+        {'chars': 23, 'sentences': 2, 'tokens': 6}
+
+    profiler.start_text('b')
+    profiler.end_text('b', text=_Text(), rp=_Pool({}))
+    assert profiler.last_text_profile()['size'] == {'chars': 23}
+
+
+def test_records_are_appended_as_json_lines(tmp_path):
+    out = tmp_path / 'profile.jsonl'
+    profiler = _Profiler()
+    profiler.set_output(str(out))
+
+    for label in ('a', 'b'):
+        profiler.start_text(label)
+        profiler.record('metric.x', 0.1)
+        profiler.end_text(label)
+
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r['label'] for r in records] == ['a', 'b']
+    assert all('peak_rss_delta_kb' in r for r in records)
+    assert records[1]['buckets']['metric.x']['calls'] == 1
+
+
+def test_sampler_writes_collapsed_stacks_per_bucket(tmp_path):
+    profiler = _Profiler()
+    profiler.start_sampling(0.001)
+
+    def hot_loop():
+        deadline = time.perf_counter() + 0.2
+        while time.perf_counter() < deadline:
+            pass
+
+    profiler.enter('metric.yngve')
+    profiler.enter('rp.parse_trees')
+    hot_loop()
+    profiler.leave()
+    profiler.leave()
+    profiler.write_stacks(str(tmp_path))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == \
+        ['all.folded', 'metric.yngve.folded']
+    lines = [line for line in
+             (tmp_path / 'metric.yngve.folded').read_text().splitlines()
+             if 'hot_loop (' in line]
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('metric.yngve;rp.parse_trees;')
+        assert int(count) > 0
+
+
+def test_memory_tracing_per_bucket():
+    profiler = _Profiler()
+    profiler.start_memory_tracing()
+    kept = []
+    try:
+        profiler.start_text('a')
+        profiler.enter('metric.x')
+        profiler.enter('rp.tagged_words')
+        kept.append([('palavra%d' % i, 'N') for i in range(20000)])
+        profiler.leave()
+        scratch = [str(i) for i in range(50000)]
+        del scratch
+        profiler.leave()
+        profiler.end_text('a')
+    finally:
+        tracemalloc.stop()
+
+    memory = profiler.last_text_profile()['memory']
+    resource, metric = memory['rp.tagged_words'], memory['metric.x']
+    assert resource['retained_kb'] > 500
+    # The metric retains what its resource cached, but peaks higher.
+    assert metric['retained_kb'] >= resource['retained_kb']
+    assert metric['peak_kb'] > resource['peak_kb']
+    sites = profiler._memory.sites['rp.tagged_words']
+    assert any('test_profiling.py:' in site for site in sites)
+
+
+def test_text_scope_opens_a_record_only_when_none_is_open():
+    profiler = _Profiler()
+    with profiler.text_scope('inner'):
+        profiler.record('category.basic', 0.5)
+    assert profiler.last_text_profile()['label'] == 'inner'
+
+    profiler.start_text('outer')
+    with profiler.text_scope('inner'):
+        profiler.record('category.basic', 0.5)
+    profiler.end_text('outer')
+    assert profiler.last_text_profile()['label'] == 'outer'
+    assert len(profiler._texts) == 2
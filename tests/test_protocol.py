@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/protocol.py."""
+
+import io
+import struct
+
+import pytest
+
+from text_metrics.base import Category, Metric, MetricsSet
+from text_metrics.protocol import (
+    ProtocolError,
+    metric_pairs,
+    read_frame,
+    serve,
+    write_frame,
+)
+
+
+class _Length(Metric):
+    name = 'length'
+
+    def value_for_text(self, t, rp=None):
+        return len(t.raw_content)
+
+
+class _Undefined(Metric):
+    name = 'undefined'
+
+    def value_for_text(self, t, rp=None):
+        return float('nan')
+
+
+def _frames(data):
+    stream = io.BytesIO(data)
+    frames = []
+    while stream.tell() < len(data):
+        frames.append(read_frame(stream))
+    return frames
+
+
+def test_frames_round_trip_any_text():
+    text = 'Aspas "duplas", vírgulas, ++ e\nquebras! $HOME `cmd` 100%'
+    stream = io.BytesIO()
+    write_frame(stream, {'text': text})
+    data = stream.getvalue()
+    assert struct.unpack('>I', data[:4])[0] == len(data) - 4
+    assert read_frame(io.BytesIO(data)) == {'text': text}
+
+    with pytest.raises(ProtocolError):
+        read_frame(io.BytesIO(data[:-1]))
+
+
+def test_values_are_numbers_or_null():
+    values = {'a': 3, 'b': 0.123456, 'c': float('inf'), 'd': 'x'}
+    assert metric_pairs(values) == \
+        [['a', 3.0], ['b', 0.123456], ['c', None], ['d', None]]
+    assert metric_pairs(values, columns=['b', 'a'], ndigits=2) == \
+        [['b', 0.12], ['a', 3.0]]
+
+
+def test_selected_columns_are_renamed_and_required():
+    values = {'adjectives max': 2, 'words': 7}
+    assert metric_pairs(values, columns=['words', 'adjectives max']) == \
+        [['words', 7.0], ['adjectives_max', 2.0]]
+    with pytest.raises(KeyError):
+        metric_pairs(values, columns=['words', 'verbs'])
+
+
+def test_serve_streams_each_category_before_the_result():
+    metrics_set = MetricsSet([Category([_Length()], name='first'),
+                              Category([_Undefined()], name='second')])
+    stdin, stdout = io.BytesIO(), io.BytesIO()
+    # Text pads the quotes with spaces: 'abc,  " d " '.
+    write_frame(stdin, {'text': 'abc, "d"', 'stream': True})
+    stdin.seek(0)
+
+    assert serve(metrics_set, stdin=stdin, stdout=stdout) == 0
+    assert _frames(stdout.getvalue()) == [
+        {'type': 'category', 'category': 'first',
+         'metrics': [['length', 12.0]]},
+        {'type': 'category', 'category': 'second',
+         'metrics': [['undefined', None]]},
+        {'type': 'result',
+         'metrics': [['length', 12.0], ['undefined', None]]},
+    ]
+
+
+def test_serve_sends_the_script_plain_output():
+    metrics_set = MetricsSet([Category([_Length()], name='first')])
+    stdin, stdout = io.BytesIO(), io.BytesIO()
+    write_frame(stdin, {'text': 'abc'})
+    stdin.seek(0)
+
+    def plain(text, values):
+        return '%s\nlength:%s\n' % (text, values['length'])
+
+    assert serve(metrics_set, plain=plain, stdin=stdin, stdout=stdout) == 0
+    frame, = _frames(stdout.getvalue())
+    assert frame['plain'] == 'abc\nlength:3\n'
+
+
+def test_serve_reports_errors_as_a_frame():
+    stdout = io.BytesIO()
+    assert serve(MetricsSet([]), stdin=io.BytesIO(b'\x00\x00'),
+                 stdout=stdout) == 1
+    frame, = _frames(stdout.getvalue())
+    assert frame['type'] == 'error'
+    assert 'ProtocolError' in frame['message']
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for the fixture store and adapters in text_metrics/replay.py."""
+
+import pytest
+from nltk.tree import Tree
+
+from text_metrics.replay import (FixtureMissing, FixtureStore, ReplayHelper,
+                                 ReplayParser, ReplayTagger, parse_latency)
+from text_metrics.tools.stemmers import DelafStemmer
+
+
+class _Tagger(object):
+    tagset = None
+
+    def __init__(self):
+        self.calls = []
+
+    def tag_sents(self, sentences):
+        self.calls.append(sentences)
+        return [[(w, 'N') for w in sent] for sent in sentences]
+
+
+class _Parser(object):
+    tagset = None
+
+    def parse_sents(self, sents):
+        return [Tree.fromstring('(ROOT (S (N %s) (PNT .)))' % s.split()[0])
+                for s in sents]
+
+
+class _Column(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class _DelafWord(object):
+    class __table__(object):
+        columns = [_Column('word'), _Column('pos'), _Column('lemma')]
+
+    def __init__(self, word, pos, lemma):
+        self.word, self.pos, self.lemma = word, pos, lemma
+
+
+class _Helper(object):
+    def get_tep_words_count(self, word, pos=None):
+        return len(word)
+
+    def get_delaf_words(self, words):
+        return [_DelafWord(word, 'N', word.rstrip('s'))
+                for word in words if word != 'xyz']
+
+
+def test_records_then_replays_per_sentence(tmp_path):
+    tagger = _Tagger()
+    store = FixtureStore(str(tmp_path), record=True)
+    replay = ReplayTagger(store, 'pos_tagger', tagger)
+    recorded = replay.tag_sents([['a', 'b'], ['c']])
+    # Only the sentence not recorded yet reaches the real tagger.
+    replay.tag_sents([['c'], ['d']])
+    assert tagger.calls == [[['a', 'b'], ['c']], [['d']]]
+    store.save()
+
+    offline = ReplayTagger(FixtureStore(str(tmp_path)), 'pos_tagger', tagger)
+    assert offline.tag_sents([['a', 'b'], ['c']]) == recorded
+    assert offline.tag_sents([['d'], ['a', 'b']]) == \
+        [[('d', 'N')], [('a', 'N'), ('b', 'N')]]
+    with pytest.raises(FixtureMissing):
+        offline.tag_sents([['e']])
+
+
+def test_trees_and_queries_round_trip(tmp_path):
+    store = FixtureStore(str(tmp_path), record=True)
+    trees = ReplayParser(store, _Parser()).parse_sents(['x y', 'z'])
+    count = ReplayHelper(store, _Helper).get_tep_words_count('casa', 'N')
+    store.save()
+
+    store = FixtureStore(str(tmp_path))
+    assert ReplayParser(store, _Parser()).parse_sents(['x y', 'z']) == trees
+    assert [tree.to_tree() for tree in ReplayParser(
+        store, _Parser()).parse_sents_flat(['x y', 'z'])] == trees
+    assert ReplayHelper(store).get_tep_words_count('casa', 'N') == count == 4
+
+
+def test_lemmas_replay_in_any_order(tmp_path):
+    store = FixtureStore(str(tmp_path), record=True)
+    stemmer = DelafStemmer(helper=lambda: ReplayHelper(store, _Helper))
+    stemmer.lemmas(['casas', 'gatos'])
+    # Only 'ratos' and 'xyz' are queried, the other words are known.
+    stemmer.lemmas(['casas', 'ratos', 'xyz'])
+    store.save()
+
+    store = FixtureStore(str(tmp_path))
+    stemmer = DelafStemmer(helper=lambda: ReplayHelper(store))
+    lemmas = stemmer.lemmas(['ratos', 'casas', 'xyz'])
+    assert [lemmas.get(word, 'N') for word in ['ratos', 'casas', 'xyz']] == \
+        ['rato', 'casa', None]
+    assert stemmer.lemmas(['gatos']).get('gatos') == 'gato'
+
+
+def test_short_outputs_are_recorded_for_the_whole_list(tmp_path):
+    def drop_b(values):
+        return [value.upper() for value in values if value != 'b']
+
+    store = FixtureStore(str(tmp_path), record=True)
+    store.get_many('dep_parser', ['a'], drop_b)
+    assert store.get_many('dep_parser', ['a', 'b', 'c'], drop_b) == ['A', 'C']
+    store.save()
+
+    store = FixtureStore(str(tmp_path))
+    assert store.get_many('dep_parser', ['a', 'b', 'c'], None) == ['A', 'C']
+    with pytest.raises(FixtureMissing):
+        store.get_many('dep_parser', ['c'], None)
+
+
+def test_parse_latency():
+    assert parse_latency(None) == {}
+    assert parse_latency('0.5') == {'*': 0.5}
+    assert parse_latency('parser=2,*=0.1') == {'parser': 2.0, '*': 0.1}
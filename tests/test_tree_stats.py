@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/tree_stats.py."""
+
+from nltk.tree import Tree
+import pytest
+
+from text_metrics.tree_stats import TreeStats
+
+# "Os brasileiros esperam resultados concretos." (the example of the Yngve
+# and Frazier metrics).
+TREE = Tree.fromstring(
+    '(ROOT (S (NP (ART Os) (N brasileiros)) (VP (V esperam) (NP (N resultados)'
+    ' (ADJ concretos))) (PNT .)))')
+
+
+class TestTreeStats:
+
+    def test_yngve_depth_of_each_leaf(self):
+        stats = TreeStats(TREE)
+        assert stats.yngve.tolist() == [3, 2, 2, 2, 1, 0]
+        assert stats.yngve_index() == pytest.approx(1.667, abs=1e-3)
+
+    def test_frazier_chains_of_leftmost_children(self):
+        stats = TreeStats(TREE)
+        # Os: ART (1) + NP under S (1.5); esperam: V (1); resultados: N (1).
+        assert stats.frazier.tolist() == [2.5, 0, 1, 1, 0, 0]
+        assert stats.frazier_index() == 3.5
+
+    def test_toplevel_nps_skip_nested_nps_and_punctuation(self):
+        tree = Tree.fromstring(
+            '(S (NP (NP (ART o) (N gato)) (PNT ,) (NP (N Tom))) (VP (V dorme)))')
+        stats = TreeStats(tree)
+        assert stats.nps == [tree[0]]
+        assert stats.np_leaves == [['o', 'gato', 'Tom']]
+        assert stats.np_sizes.tolist() == [3]
+
+    def test_tree_is_not_modified(self):
+        before = str(TREE)
+        TreeStats(TREE)
+        assert str(TREE) == before
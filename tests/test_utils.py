@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for helpers in text_metrics/utils.py."""
+
+import random
+
+import numpy as np
+import pytest
+
+from text_metrics.utils import (
+    adjacent_pairs,
+    all_pairs,
+    mattr,
+    mattr_relative,
+    overlap_ratios,
+)
+
+
+def _brute_force(sentences, pairs):
+    pairs = list(pairs(sentences))
+    matches = sum(w1.lower() == w2.lower()
+                  for s1, s2 in pairs for w1 in s1 for w2 in s2)
+    return matches / len(pairs) if pairs else 0
+
+
+def test_overlap_counts_every_pair_of_equal_words():
+    sentences = [['Casa', 'casa', 'rio'], ['casa', 'Rio'], ['mar'], ['casa']]
+    # Adjacent: 2*1 + 1*1, 0, 0; all pairs add 2*1 (1-4) and 1*1 (2-4).
+    assert overlap_ratios(sentences) == (pytest.approx(3 / 3),
+                                         pytest.approx(6 / 6))
+
+
+def test_no_pairs():
+    assert overlap_ratios([]) == (0, 0)
+    assert overlap_ratios([['casa']]) == (0, 0)
+
+
+def test_matches_the_pairwise_comparison():
+    rng = random.Random(0)
+    vocabulary = ['a', 'A', 'b', 'c', 'D', 'd', 'e']
+    for _ in range(50):
+        sentences = [[rng.choice(vocabulary)
+                      for _ in range(rng.randint(0, 8))]
+                     for _ in range(rng.randint(0, 7))]
+        adjacent, all_ = overlap_ratios(sentences)
+        assert adjacent == pytest.approx(_brute_force(sentences,
+                                                      adjacent_pairs))
+        assert all_ == pytest.approx(_brute_force(sentences, all_pairs))
+
+
+def _windowed(tokens, w, ratio):
+    w = min(w, len(tokens))
+    return np.mean([ratio(tokens[i:i + w]) for i in range(len(tokens) - w + 1)])
+
+
+def test_mattr_matches_the_window_by_window_ratios():
+    rng = random.Random(1)
+    for _ in range(50):
+        tokens = [rng.choice('abcdefg') for _ in range(rng.randint(1, 60))]
+        w = rng.choice([1, 3, 10, 100])
+        assert mattr(tokens, w) == pytest.approx(
+            _windowed(tokens, w, lambda win: len(set(win)) / len(win)))
+        assert mattr_relative(tokens, 'ab', w) == pytest.approx(
+            _windowed(tokens, w, lambda win: sum(t in 'ab' for t in win) /
+                      len(win)))
+
+
+def test_mattr_takes_several_windows_and_token_ids():
+    tokens = ['a', 'b', 'a', 'c', 'a', 'b', 'd']
+    assert mattr(tokens, (2, 3, 50)) == \
+        [mattr(tokens, 2), mattr(tokens, 3), mattr(tokens, 50)]
+    assert mattr(np.array([7, 1, 7, 4, 7, 1, 9]), 3) == mattr(tokens, 3)
+    with pytest.raises(ZeroDivisionError):
+        mattr([])
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/tools/parse/flat.py."""
+
+from nltk.tree import Tree
+import pytest
+
+from text_metrics.tools.parse.flat import FlatTree
+
+BRACKETED = ('(ROOT (S (NP (ART Os) (N brasileiros)) (VP (V esperam)'
+             ' (NP (N resultados) (ADJ concretos))) (PNT .)))')
+
+
+class TestFlatTree:
+
+    def test_nodes_are_kept_in_preorder(self):
+        flat = FlatTree.fromstring('(S (NP (N Ele)) (VP (V dorme)) (PNT .))')
+        assert [flat.label(i) for i in range(len(flat))] == \
+            ['S', 'NP', 'N', None, 'VP', 'V', None, 'PNT', None]
+        assert flat.parent.tolist() == [-1, 0, 1, 2, 0, 4, 5, 0, 7]
+        assert flat.end.tolist() == [9, 4, 4, 4, 7, 7, 7, 9, 9]
+        assert flat.leaves() == ['Ele', 'dorme', '.']
+        assert flat.leaves(4) == ['dorme']
+
+    def test_nltk_view_matches_tree_fromstring(self):
+        flat = FlatTree.fromstring(BRACKETED)
+        tree = Tree.fromstring(BRACKETED)
+        assert flat.to_tree() == tree
+        assert flat.to_tree(7) == tree[0][1]
+        assert FlatTree.from_tree(tree).to_tree() == tree
+
+    @pytest.mark.parametrize('bracketed', [
+        '(S (N a)', '(S a))', 'a', '(S a) (T b)'])
+    def test_malformed_trees_are_rejected(self, bracketed):
+        with pytest.raises(ValueError):
+            FlatTree.fromstring(bracketed)
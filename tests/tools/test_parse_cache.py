@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/tools/parse/cache.py."""
+
+from nltk.parse import DependencyGraph
+from nltk.tree import Tree
+
+from text_metrics.tools.dependency.api import DependencyParser
+from text_metrics.tools.dependency.cache import CachedDependencyParser
+from text_metrics.tools.parse.api import Parser
+from text_metrics.tools.parse.cache import CachedParser, SentenceCache
+
+
+class _Parser(Parser):
+    tagset = None
+
+    def __init__(self, drop=None):
+        self.calls = []
+        self.drop = drop
+
+    def parse_sents(self, sents):
+        self.calls.append(list(sents))
+        return [Tree.fromstring('(ROOT (S (N %s) (PNT .)))' % s.split()[0])
+                for s in sents if s != self.drop]
+
+
+class _DependencyParser(DependencyParser):
+
+    def __init__(self, drop_last=False):
+        self.calls = []
+        self.drop_last = drop_last
+
+    def parse_sents(self, sents):
+        self.calls.append(sents)
+        graphs = []
+        for sent in sents:
+            rows = ['%d\t%s\t%s\tN\tN\t_\t%d\t%s\t_\t_'
+                    % (i, word, word.lower(), 0 if i == 1 else 1,
+                       'null' if i == 1 else 'dep')
+                    for i, word in enumerate(sent, 1)]
+            graphs.append(DependencyGraph('\n'.join(rows),
+                                          top_relation_label='null'))
+        return graphs[:-1] if self.drop_last else graphs
+
+
+def _cached(maxsize=100, path='', drop=None):
+    parser = _Parser(drop)
+    return CachedParser(parser, SentenceCache('parser', maxsize, path)), parser
+
+
+class TestCachedParser:
+
+    def test_only_unseen_sentences_are_parsed(self):
+        cached, parser = _cached()
+        trees = cached.parse_sents(['a b', 'c', 'a b'])
+        assert trees[0] == trees[2] == Tree.fromstring(
+            '(ROOT (S (N a) (PNT .)))')
+        assert cached.parse_sents_flat(['c', 'd'])[1].leaves() == ['d', '.']
+        assert parser.calls == [['a b', 'c'], ['d']]
+        assert cached.cache.cache_info()['size'] == 3
+
+    def test_memory_is_bounded(self):
+        cached, parser = _cached(maxsize=2)
+        cached.parse_sents(['a', 'b', 'c'])
+        cached.parse_sents(['c', 'a'])
+        assert parser.calls == [['a', 'b', 'c'], ['a']]
+        assert cached.cache.cache_info()['size'] == 2
+
+    def test_persistent_store_is_shared(self, tmp_path):
+        path = str(tmp_path / 'parses.sqlite')
+        cached, parser = _cached(path=path)
+        trees = cached.parse_sents(['a', 'b'])
+
+        cached, parser = _cached(path=path)
+        assert cached.parse_sents(['b', 'a', 'c']) == \
+            [trees[1], trees[0], Tree.fromstring('(ROOT (S (N c) (PNT .)))')]
+        assert parser.calls == [['c']]
+
+    def test_outputs_are_not_cached_when_one_is_missing(self, tmp_path):
+        path = str(tmp_path / 'parses.sqlite')
+        cached, parser = _cached(path=path, drop='b')
+        cached.parse_sents(['a'])
+        trees = cached.parse_sents(['a', 'b', 'c'])
+        assert [tree.leaves()[0] for tree in trees] == ['a', 'c']
+        assert parser.calls == [['a'], ['b', 'c'], ['a', 'b', 'c']]
+        assert cached.cache.cache_info()['size'] == 1
+
+        cached, parser = _cached(path=path)
+        assert [tree.leaves()[0] for tree in
+                cached.parse_sents(['b', 'c'])] == ['b', 'c']
+        assert parser.calls == [['b', 'c']]
+
+
+class TestCachedDependencyParser:
+
+    def test_cache_hits_round_trip(self):
+        parser = _DependencyParser()
+        cached = CachedDependencyParser(
+            parser, SentenceCache('dep_parser', 100, ''))
+        sents = [['Ele', 'dorme', '.'], ['Chove', '.']]
+        expected = [graph.to_conll(10)
+                    for graph in _DependencyParser().parse_sents(sents)]
+        cached.parse_sents(sents)
+        graphs = cached.parse_sents(sents)
+        assert [graph.to_conll(10) for graph in graphs] == expected
+        assert graphs[0].nodes[2]['head'] == 1
+        assert parser.calls == [sents]
+
+    def test_a_dropped_graph_is_not_cached(self):
+        parser = _DependencyParser(drop_last=True)
+        cached = CachedDependencyParser(
+            parser, SentenceCache('dep_parser', 100, ''))
+        graphs = cached.parse_sents([['Ele', 'dorme', '.'], ['Chove', '.']])
+        assert [graph.nodes[1]['word'] for graph in graphs] == ['Ele']
+        assert cached.cache.cache_info()['size'] == 0
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/tools/stemmers.py."""
+
+from collections import namedtuple
+
+from text_metrics.tools.stemmers import DelafStemmer
+
+Row = namedtuple('Row', 'word pos lemma')
+
+TABLE = [
+    Row('canto', 'N', 'canto'),
+    Row('canto', 'V', 'cantar'),
+    Row('bonitas', 'A', 'bonito'),
+    Row('casas', 'N', 'casa'),
+]
+
+
+class _Helper(object):
+
+    def __init__(self):
+        self.queries = []
+
+    def get_delaf_words(self, words):
+        self.queries.append(sorted(words))
+        return [row for row in TABLE if row.word in words]
+
+    def get_all_delaf_words(self):
+        self.queries.append('all')
+        return [tuple(row) for row in TABLE]
+
+
+def _stemmer(prewarm=False):
+    helper = _Helper()
+    return DelafStemmer(helper=lambda: helper, prewarm=prewarm), helper
+
+
+class TestDelafStemmer:
+
+    def test_lemmas_of_a_text_take_one_query(self):
+        stemmer, helper = _stemmer()
+        lemmas = stemmer.lemmas(['Canto', 'bonitas', 'casas', 'xyz', 'canto'])
+        assert lemmas.get('canto', 'V') == 'cantar'
+        assert lemmas.get('CANTO') == 'canto'
+        assert lemmas.get('bonitas', 'ADJ') == 'bonito'
+        # No entry with the PoS: the first entry of the word is used.
+        assert lemmas.get('casas', 'V') == 'casa'
+        assert lemmas.get('xyz') is None
+        assert helper.queries == [['bonitas', 'canto', 'casas', 'xyz']]
+
+        # Words not looked up in advance are returned as is, unqueried.
+        assert lemmas.get('Sol', 'N') == 'Sol'
+        assert len(helper.queries) == 1
+
+        # Known words (found or not) are not queried again.
+        assert stemmer.get_lemma('xyz') is None
+        stemmer.lemmas(['casas', 'canto', 'sol'])
+        assert helper.queries[1:] == [['sol']]
+
+    def test_prewarm_loads_the_table_once(self):
+        stemmer, helper = _stemmer(prewarm=True)
+        assert stemmer.get_lemma('canto', 'V') == 'cantar'
+        assert stemmer.lemmas(['casas', 'sol']).get('casas') == 'casa'
+        assert stemmer.get_lemma('sol') is None
+        assert helper.queries == ['all']
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/tools/syllable/cache.py."""
+
+import pytest
+
+from text_metrics.tools.syllable import (
+    CECISyllableSeparator,
+    CachedSyllableSeparator,
+)
+
+
+_WORDS = ["Professores", "estudiosos", "analisam", "estatísticas", "à",
+          "Àquela", "pão", "medicina", "veterinária", "casa"]
+
+
+@pytest.fixture
+def lexicon_path(tmp_path):
+    separator = CECISyllableSeparator()
+    path = tmp_path / "syllables.tsv"
+    path.write_text("".join("%s\t%d\n" % (w.lower(), len(separator.separate(w.lower())))
+                            for w in _WORDS[:5]), encoding="utf-8")
+    return str(path)
+
+
+class TestCachedSyllableSeparator:
+
+    def test_matches_the_wrapped_separator(self):
+        separator = CECISyllableSeparator()
+        cached = CachedSyllableSeparator(separator)
+        for word in _WORDS * 2:
+            assert cached.separate(word) == separator.separate(word)
+            assert cached.count(word) == len(separator.separate(word))
+
+    def test_repeated_words_hit_the_cache(self):
+        cached = CachedSyllableSeparator(CECISyllableSeparator())
+        for word in _WORDS * 3:
+            cached.separate(word)
+        assert cached.cache_info().misses == len(_WORDS)
+
+    def test_lexicon_counts_agree_with_the_separator(self, lexicon_path):
+        separator = CECISyllableSeparator()
+        cached = CachedSyllableSeparator(separator, lexicon_path=lexicon_path)
+        assert len(cached.lexicon) == 5
+        for word in _WORDS:
+            assert cached.count(word) == len(separator.separate(word))
+
+    def test_missing_lexicon_falls_back_to_the_separator(self, tmp_path):
+        cached = CachedSyllableSeparator(
+            CECISyllableSeparator(), lexicon_path=str(tmp_path / "missing.tsv"))
+        assert cached.lexicon is None
+        assert cached.count("casa") == 2
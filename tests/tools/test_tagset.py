@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for TagSet in text_metrics/tools/tag/api.py."""
+
+from text_metrics.tools.tag.macmorpho import MacMorphoTagSet
+
+TAGSET = MacMorphoTagSet()
+
+TAGS = ['N', 'NPROP', 'V', 'VAUX', 'PCP', 'ADJ', 'ADV', 'PREP+ADV', 'PDEN',
+        'PREP+PROPESS', 'PROADJ', 'KC', 'PU', 'UNKNOWN']
+
+
+class TestTagSet:
+
+    def test_predicates_follow_the_tag_lists(self):
+        for tag in TAGS:
+            token = ('palavra', tag)
+            assert TAGSET.is_noun(token) == (tag in TAGSET.noun_tags)
+            assert TAGSET.is_content_word(token) == \
+                (tag in TAGSET.content_word_tags)
+            assert TAGSET.functions_as_adjective(token) == \
+                (tag in TAGSET.functions_as_adjective_tags)
+
+    def test_bits_answer_several_classes_at_once(self):
+        noun_or_pronoun = TAGSET.bits('noun', 'pronoun')
+        assert [tag for tag in TAGS
+                if TAGSET.tag_bits(tag) & noun_or_pronoun] == \
+            ['N', 'NPROP', 'PREP+PROPESS', 'PROADJ']
+        assert TAGSET.tag_bits('UNKNOWN') == 0
+
+    def test_classify_matches_the_predicates(self):
+        masks = TAGSET.classify(TAGS)
+        assert set(masks) == set(TAGSET.classes)
+        for name in ('verb', 'adverb', 'punctuation', 'function_word',
+                     'functions_as_noun'):
+            predicate = getattr(TAGSET, name if name.startswith(
+                'functions_as') else 'is_' + name)
+            assert masks[name].tolist() == \
+                [predicate((None, tag)) for tag in TAGS]
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Behavioral tests for text_metrics/tools/when.py."""
+
+from text_metrics.tools.when import getTemporalExpressions
+
+
+class TestGetTemporalExpressions:
+
+    def test_expressions_inside_longer_ones_are_dropped(self):
+        # "de 1869" is part of "de agosto de 1869", so only the longer one
+        # is reported.
+        assert getTemporalExpressions("Nasceu em 13 de agosto de 1869.") == [
+            ("em 13 de agosto de 1869", 7, 30)]
+
+    def test_repeated_expressions_are_reported_once(self):
+        assert [te for te, _, _ in getTemporalExpressions(
+            "Choveu ontem. Ventou ontem.")] == ["ontem"]
+
+    def test_results_are_sorted_by_position(self):
+        tes = getTemporalExpressions("Ontem saí às 10h e voltei há duas horas.")
+        assert [start for _, start, _ in tes] == sorted(
+            start for _, start, _ in tes)
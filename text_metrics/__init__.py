@@ -23,6 +23,7 @@ from text_metrics.base import (
     Metric,
     MetricsSet,
     ResultSet,
+    ResultMatrix,
 )
 from text_metrics.metrics.extra import EXTRA
 
@@ -210,8 +211,6 @@ no_palavras_metrics = MetricsSet([BasicCounts(),
                           EXTRA(),
                           ])
 
-rp = DefaultResourcePool()
-
 
 __all__ = sorted([m for m in locals().keys()
                   if not m.startswith('_')])
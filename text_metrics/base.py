@@ -18,7 +18,7 @@
 from __future__ import unicode_literals, print_function, division
 from text_metrics.utils import is_valid_id
 from text_metrics.resource_pool import rp as default_rp
-from text_metrics.profiling import timed_block
+from text_metrics.profiling import timed_block, profiler
 import numpy as np
 import codecs
 import collections
@@ -349,7 +349,7 @@ class Category(object):
             try:
                 logger.info('Calculating metric %s.', m.name)
                 with timed_block("metric." + m.column_name):
-                    values.append((m, round(m.value_for_text(text), 5)))
+                    values.append((m, round(m.value_for_text(text, rp), 5)))
             except ZeroDivisionError:
                 values.append((m, 0))
 
@@ -466,6 +466,10 @@ class MetricsSet(object):
                                      _metric.column_name,
                                      _metric.desc))
 
+        self.column_index = {}
+        for i, column_name in enumerate(self.column_names):
+            self.column_index.setdefault(column_name, i)
+
     def _set_categories_from_module(self, module):
         """Set self.categories as the list of Category subclasses
             declared in a module.
@@ -481,12 +485,25 @@ class MetricsSet(object):
                            if inspect.isclass(obj)
                            and issubclass(obj, Category)]
 
-    def values_for_text(self, text, rp=default_rp):
+    def values_for_text(self, text, rp=default_rp, callback=None):
+        """Calculate the value of each metric in a text.
+
+        :text: the Text object.
+        :rp: the resource pool to be used.
+        :callback: an optional function called with (category, values) as
+            soon as each category is done, e.g. to stream partial results.
+        :returns: a ResultSet with the values of each category.
+        """
         values = []
 
-        for cat in self.categories:
-            logger.info('Calculating category %s.', cat.name)
-            values.append((cat, cat.values_for_text(text, rp)))
+        with profiler.text_scope(text.filepath or 'text', text, rp):
+            for cat in self.categories:
+                logger.info('Calculating category %s.', cat.name)
+                with timed_block('category.' + cat.name):
+                    cat_values = cat.values_for_text(text, rp)
+                values.append((cat, cat_values))
+                if callback is not None:
+                    callback(cat, cat_values)
 
         # return ResultSet([(c, c.values_for_text(t)) for c in self.categories])
         return ResultSet(values)
@@ -509,24 +526,84 @@ class MetricsSet(object):
 
         return ResultSet(values)
 
+    def matrix_for_texts(self, texts, rp=default_rp):
+        """Calculate the value of each metric in a set of texts and return them
+        as a ResultMatrix, with one row per text and the columns in the order
+        of self.column_names.
+
+        :texts: a list of Text objects.
+        :rp: the resource pool to be used.
+        :returns: a ResultMatrix.
+        """
+        values = np.empty((len(texts), len(self.column_names)),
+                          dtype=np.float64)
+        ntexts = len(texts)
+        for i, text in enumerate(texts):
+            logger.info('Analyzing text %d/%d: %s.', i + 1, ntexts, text)
+            j = 0
+            for cat in self.categories:
+                cvalues = cat.values_for_text(text, rp)
+                for m in cat.metrics:
+                    values[i, j] = cvalues[m]
+                    j += 1
+
+        return ResultMatrix(self.column_names, values, texts)
+
 
 class ResultSet(collections.OrderedDict):
     """A dictionary structure that represents the values of a set of metrics
     extracted from a text.
     """
 
-    def __getitem__(self, key):
-        # If the key is a string, use table/column name.
-        if isinstance(key, str):
-            for _key, value in self.items():
+    def __init__(self, *args, **kwargs):
+        # Table/column name -> key, built on the first lookup by name.
+        self._names = None
+        super(ResultSet, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        self._names = None
+        super(ResultSet, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._names = None
+        super(ResultSet, self).__delitem__(key)
+
+    # The C OrderedDict does not call __setitem__/__delitem__ from these.
+    def pop(self, *args):
+        self._names = None
+        return super(ResultSet, self).pop(*args)
+
+    def popitem(self, *args, **kwargs):
+        self._names = None
+        return super(ResultSet, self).popitem(*args, **kwargs)
+
+    def clear(self):
+        self._names = None
+        super(ResultSet, self).clear()
+
+    def setdefault(self, *args):
+        self._names = None
+        return super(ResultSet, self).setdefault(*args)
+
+    def move_to_end(self, *args, **kwargs):
+        self._names = None
+        super(ResultSet, self).move_to_end(*args, **kwargs)
+
+    def _key_for_name(self, name):
+        if self._names is None:
+            names = {}
+            for _key in self.keys():
                 if isinstance(_key, Category):
-                    if _key.table_name == key:
-                        return value
+                    names.setdefault(_key.table_name, _key)
                 elif isinstance(_key, Metric):
-                    if _key.column_name == key:
-                        return value
+                    names.setdefault(_key.column_name, _key)
+            self._names = names
+        return self._names[name]
 
-            raise KeyError(key)
+    def __getitem__(self, key):
+        # If the key is a string, use table/column name.
+        if isinstance(key, str):
+            key = self._key_for_name(key)
 
         return super(collections.OrderedDict, self).__getitem__(key)
 
@@ -572,11 +649,35 @@ class ResultSet(collections.OrderedDict):
         """
 
         d = collections.OrderedDict()  # was d = {}
-        for category in self.keys():
-            for metric in self[category].keys():
-                d[metric.column_name] = self[category][metric]
+        for cvalues in self.values():
+            for metric, value in cvalues.items():
+                d[metric.column_name] = value
         return d
 
+    def as_matrix(self):
+        """Return a ResultMatrix with the values of this ResultSet: one row
+        per text (a single row if this is the result of a single text) and
+        one column per metric.
+        """
+        if not self:
+            return ResultMatrix([], np.empty((0, 0), dtype=np.float64), [])
+        if isinstance(next(iter(self.keys())), Text):
+            texts = list(self.keys())
+            results = list(self.values())
+        else:
+            texts = [None]
+            results = [self]
+
+        # Same-named metrics of different categories get one column each.
+        columns = [metric.column_name for cvalues in results[0].values()
+                   for metric in cvalues]
+        values = np.empty((len(results), len(columns)), dtype=np.float64)
+        for i, result in enumerate(results):
+            values[i] = [value for cvalues in result.values()
+                         for value in cvalues.values()]
+
+        return ResultMatrix(columns, values, texts)
+
     def as_table(self):
         """Return a string representation that uses tables to facilitate
         reading.
@@ -728,12 +829,92 @@ class ResultSet(collections.OrderedDict):
         return '\n'.join(lines)
 
     def as_array(self, text_key='title'):
-        """Return a numpy.ndarray representing the data."""
+        """Return a numpy.ndarray representing the data: one row per text,
+        one column per metric."""
 
-        if isinstance(list(self.keys())[0], Text):
-            _, data = self._get_multi_text_arff_data(text_key)
-        else:
-            _, data = self._get_single_text_arff_data(text_key)
+        return self.as_matrix().as_array()
+
+
+class ResultMatrix(object):
+    """The values of a set of metrics for one or more texts, stored as a
+    single float64 matrix with one row per text and one column per metric.
+
+    Columns are metric column names, looked up through a fixed index, so
+    both access by name and export avoid walking the nested ResultSets.
+    """
+
+    def __init__(self, columns, values, texts=None):
+        """Form a result matrix.
+
+        Required arguments:
+        :columns: the column names of the metrics, in order.
+        :values: a 2-D array-like of shape (texts, columns).
 
-        return np.array([[value for _, value in line[1:]] for line in data],
-                        dtype=np.float64)
+        Optional arguments:
+        :texts: the Text objects (or ids) of the rows. (default None)
+        """
+        self.columns = tuple(columns)
+        self.index = {}
+        for i, column in enumerate(self.columns):
+            self.index.setdefault(column, i)
+
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        if self.values.ndim == 1:
+            self.values = self.values.reshape(1, -1)
+        if self.values.shape[1] != len(self.columns):
+            raise ValueError('Expected %d columns, got %d.' %
+                             (len(self.columns), self.values.shape[1]))
+
+        self.texts = list(texts) if texts is not None\
+            else [None] * len(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, key):
+        # A column name returns that metric for every text (a view); an
+        # integer returns the row of one text (also a view).
+        if isinstance(key, str):
+            return self.values[:, self.index[key]]
+        return self.values[key]
+
+    def as_array(self):
+        """Return the underlying numpy.ndarray, without copying it."""
+        return self.values
+
+    def as_flat_dict(self, row=0):
+        """Return the metrics of one text as a flat dictionary, with the
+        column names as keys."""
+        return collections.OrderedDict(zip(self.columns,
+                                           self.values[row].tolist(),
+                                           strict=True))
+
+    def write_csv(self, fileobj, ids=None, delimiter=','):
+        """Write the matrix in CSV format to a file object, in a single
+        vectorized call.
+
+        :ids: optional row labels, written as a first "id" column.
+        """
+        header = delimiter.join(self.columns)
+        cells = np.char.mod('%.10g', self.values)
+        if ids is not None:
+            header = 'id' + delimiter + header
+            cells = np.column_stack([np.asarray([str(i) for i in ids]), cells])
+        np.savetxt(fileobj, cells, delimiter=delimiter, header=header,
+                   comments='', fmt='%s')
+
+    @classmethod
+    def vstack(cls, matrices):
+        """Concatenate matrices with the same columns into one."""
+        matrices = list(matrices)
+        columns = matrices[0].columns
+        for m in matrices[1:]:
+            if m.columns != columns:
+                raise ValueError('Cannot stack matrices with different '
+                                 'columns.')
+        return cls(columns,
+                   np.concatenate([m.values for m in matrices]),
+                   [t for m in matrices for t in m.texts])
+
+    def __repr__(self):
+        return '<ResultMatrix: %d texts x %d metrics>' % self.values.shape
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""Compute metrics for a whole corpus, in parallel and resumably.
+
+Usage:
+
+    python -m text_metrics.batch INPUT -o results.jsonl [options]
+
+INPUT is a directory (every *.txt below it), a glob pattern (quote it) or a
+JSONL file with one {"id": ..., "text": ..., ...} object per line; extra
+JSONL fields become the text's metadata. With --format arrow or parquet the
+output is a directory of columnar part files (see text_metrics.export),
+written every --row-group-size texts; a Parquet file is only readable once
+closed, so Parquet output also starts a new file each time.
+
+Texts are spread over a pool of worker processes. Each worker imports
+text_metrics once and keeps its resource pool (taggers, parsers, database
+session, dictionaries) warm for every text it is given. Results are appended
+to the output as they arrive and each finished id is appended to a manifest
+(OUTPUT.done); running the same command again skips the ids already in the
+manifest (or, for JSONL, already in the output), so an interrupted run picks
+up where it stopped. Texts that fail or time out are logged to
+OUTPUT.errors.jsonl and retried on the next run. A text that runs past the
+timeout has its worker killed, along with any tagger or parser process the
+worker started, and the worker is replaced by a fresh one.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import argparse
+import codecs
+import glob
+import json
+import logging
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def iter_inputs(source, encoding='utf-8'):
+    """Yield (id, content, meta) for each text in a directory, glob pattern
+    or JSONL file. File contents are read by the workers, so for files the
+    content is None and the id is the path."""
+    if os.path.isdir(source):
+        for dirname, _, filenames in sorted(os.walk(source)):
+            for filename in sorted(filenames):
+                if filename.endswith('.txt'):
+                    yield os.path.join(dirname, filename), None, {}
+    elif source.endswith('.jsonl') and os.path.isfile(source):
+        with codecs.open(source, encoding=encoding) as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                text_id = str(record.pop('id', lineno))
+                content = record.pop('text')
+                yield text_id, content, record
+    else:
+        paths = sorted(glob.glob(source, recursive=True))
+        if not paths:
+            raise ValueError('No input texts found for %r.' % source)
+        for path in paths:
+            if os.path.isfile(path):
+                yield path, None, {}
+
+
+def read_manifest(path):
+    """Return the set of ids already completed."""
+    if not os.path.isfile(path):
+        return set()
+    with codecs.open(path, encoding='utf-8') as f:
+        return set(line.rstrip('\n') for line in f if line.strip())
+
+
+def read_output_ids(path):
+    """Return the set of ids in a JSONL output file. A last line left
+    incomplete by an interrupted run is ignored."""
+    if not os.path.isfile(path):
+        return set()
+    ids = set()
+    with codecs.open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.endswith('\n') and line.strip():
+                ids.add(json.loads(line)['id'])
+    return ids
+
+
+class JsonLinesWriter(object):
+
+    """Appends one {"id", "meta", "metrics"} JSON object per line.
+
+    Like the writers in text_metrics.export, `write` and `close` return the
+    ids that are on disk after the call. Values that are not finite numbers
+    are written as null.
+    """
+
+    def __init__(self, path):
+        # Drop a last line left incomplete by an interrupted run.
+        if os.path.isfile(path):
+            with open(path, 'rb+') as f:
+                data = f.read()
+                if data and not data.endswith(b'\n'):
+                    f.truncate(data.rfind(b'\n') + 1)
+        self._f = codecs.open(path, mode='a', encoding='utf-8')
+
+    def write(self, text_id, metrics, meta):
+        metrics = dict((k, v if v is not None and math.isfinite(v) else None)
+                       for k, v in metrics.items())
+        record = {'id': text_id, 'meta': meta, 'metrics': metrics}
+        self._f.write(json.dumps(record, ensure_ascii=False, allow_nan=False)
+                      + '\n')
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return [text_id]
+
+    def close(self):
+        self._f.close()
+        return []
+
+
+FORMATS = ('jsonl', 'arrow', 'parquet')
+
+
+def open_writer(output, output_format='jsonl', row_group_size=200):
+    """Open the writer for a run. JSONL output is a single file appended to
+    by every run; Arrow and Parquet output is a directory that gets new part
+    files in each run, since those files cannot be appended to. Results reach
+    the disk (and the manifest) every `row_group_size` texts, and a new
+    Parquet file is started each time, so an interrupted run loses at most
+    that many texts."""
+    if output_format == 'jsonl':
+        return JsonLinesWriter(output)
+
+    from text_metrics.export import ParquetWriter, WRITERS
+    if not os.path.isdir(output):
+        os.makedirs(output)
+    part = os.path.join(output, 'part-%s-%d.%s' % (
+        time.strftime('%Y%m%d-%H%M%S'), os.getpid(), output_format))
+    if output_format == 'parquet':
+        return ParquetWriter(part, row_group_size=row_group_size,
+                             rows_per_file=row_group_size)
+    return WRITERS[output_format](part, row_group_size=row_group_size)
+
+
+class WorkerPool(object):
+
+    """Worker processes that run `func` on one job at a time each.
+
+    Unlike multiprocessing.Pool, a job that runs past `timeout` seconds is
+    stopped from the parent: its worker is killed along with every process
+    it started (each worker leads its own process group), the temporary
+    directory it was given is removed and a new worker takes its place.
+    Nothing running in the worker can catch or delay this.
+
+    :size: number of worker processes.
+    :func: function called with each job in a worker.
+    :initializer: function called with `initargs` when a worker starts.
+    :timeout: seconds a job may take. (default: no limit)
+    :max_jobs: jobs a worker computes before it is replaced.
+        (default: no limit)
+    """
+
+    def __init__(self, size, func, initializer=None, initargs=(),
+                 timeout=None, max_jobs=None):
+        self._size = size
+        self._func = func
+        self._initializer = initializer
+        self._initargs = initargs
+        self._timeout = timeout
+        self._max_jobs = max_jobs
+
+    def imap_unordered(self, jobs):
+        """Yield (job, result, error) as the jobs finish. When a job times
+        out or its worker dies, result is None and error says why."""
+        jobs = iter(jobs)
+        idle = [self._start() for _ in range(self._size)]
+        busy = {}
+        try:
+            while True:
+                while idle:
+                    job = next(jobs, _NO_JOB)
+                    if job is _NO_JOB:
+                        break
+                    worker = idle.pop()
+                    worker.conn.send(job)
+                    busy[worker.conn] = worker, job, None
+                if not busy:
+                    break
+
+                # A job's time counts from when its worker starts it, not
+                # from when the worker was still loading its resources.
+                deadlines = [deadline for _, _, deadline in busy.values()
+                             if deadline is not None]
+                wait = max(0, min(deadlines) - time.monotonic()) \
+                    if deadlines else None
+                for conn in multiprocessing.connection.wait(list(busy), wait):
+                    worker, job, _ = busy.pop(conn)
+                    try:
+                        message = conn.recv()
+                        if message is None:
+                            deadline = time.monotonic() + self._timeout \
+                                if self._timeout else None
+                            busy[conn] = worker, job, deadline
+                            continue
+                        result, error = message[0], None
+                    except EOFError:
+                        worker.process.join()
+                        result, error = None, 'worker exited with code %s' \
+                            % worker.process.exitcode
+                        self._kill(worker)
+                        worker = self._start()
+                    else:
+                        worker.njobs += 1
+                        if self._max_jobs and worker.njobs >= self._max_jobs:
+                            self._stop(worker)
+                            worker = self._start()
+                    idle.append(worker)
+                    yield job, result, error
+
+                now = time.monotonic()
+                for conn, (worker, job, deadline) in list(busy.items()):
+                    if deadline is not None and deadline <= now:
+                        del busy[conn]
+                        self._kill(worker)
+                        idle.append(self._start())
+                        yield job, None, 'timeout after %ss' % self._timeout
+        finally:
+            for worker, _, _ in busy.values():
+                self._kill(worker)
+            for worker in idle:
+                self._stop(worker)
+
+    def _start(self):
+        worker = _Worker()
+        worker.tmpdir = tempfile.mkdtemp(prefix='text_metrics-')
+        worker.conn, child_conn = multiprocessing.Pipe()
+        worker.process = multiprocessing.Process(
+            target=_worker_loop,
+            args=(child_conn, worker.tmpdir, self._func, self._initializer,
+                  self._initargs))
+        worker.process.daemon = True
+        worker.process.start()
+        child_conn.close()
+        return worker
+
+    def _stop(self, worker):
+        try:
+            worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        worker.process.join(5)
+        self._kill(worker)
+
+    def _kill(self, worker):
+        # Each worker leads its own process group, so this also kills the
+        # taggers and parsers it started. Until the worker has called
+        # setpgrp there is no such group, and it is killed on its own.
+        try:
+            os.killpg(worker.process.pid, signal.SIGKILL)
+        except OSError:
+            if worker.process.exitcode is None:
+                worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        shutil.rmtree(worker.tmpdir, ignore_errors=True)
+
+
+class _Worker(object):
+    process = conn = tmpdir = None
+    njobs = 0
+
+
+_NO_JOB = object()
+
+
+def _worker_loop(conn, tmpdir, func, initializer, initargs):
+    # The parent kills the whole process group on a timeout, and removes
+    # the directory where the taggers' and parsers' input files go.
+    os.setpgrp()
+    tempfile.tempdir = tmpdir
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        # None when the job starts, then the result (in a tuple, since it
+        # may be None too).
+        conn.send(None)
+        conn.send((func(job),))
+
+
+# Worker side. These globals live in each worker process.
+_metrics_set = None
+_encoding = 'utf-8'
+
+
+def _init_worker(metrics_name, encoding, prewarm_lexicon=False):
+    global _metrics_set, _encoding
+
+    # Ctrl-C is handled by the parent, which kills the workers.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    import text_metrics
+    _metrics_set = getattr(text_metrics, metrics_name)
+    if prewarm_lexicon:
+        from text_metrics.resource_pool import rp
+        rp.stemmer().prewarm()
+    _encoding = encoding
+
+
+def _compute(job):
+    """Compute the metrics of one text. Returns (id, metrics, meta, error)."""
+    from text_metrics import Text
+    from text_metrics.profiling import profiler
+    from text_metrics.resource_pool import rp
+
+    text_id, content, meta = job
+    t = None
+    start = time.perf_counter()
+    try:
+        profiler.start_text(text_id)
+        if content is None:
+            t = Text(filepath=text_id, encoding=_encoding, **meta)
+        else:
+            t = Text(content, **meta)
+        values = _metrics_set.values_for_text(t).as_flat_dict()
+        metrics = dict((k, None if v is None else float(v))
+                       for k, v in values.items())
+        error = None
+    except Exception as e:
+        metrics, error = None, '%s: %s' % (type(e).__name__, e)
+    finally:
+        profiler.end_text(text_id, text=t, rp=rp)
+
+    meta = dict(meta, seconds=round(time.perf_counter() - start, 3))
+    return text_id, metrics, meta, error
+
+
+def run(source, output, metrics_name='nilc_metrics', workers=None,
+        timeout=None, encoding='utf-8', output_format='jsonl',
+        max_texts_per_worker=None, prewarm_lexicon=False,
+        row_group_size=200):
+    """Compute the metrics of every pending text in `source` and append them
+    to `output`. Returns (number of texts done, number of failures).
+
+    With prewarm_lexicon, each worker loads the whole DELAF table when it
+    starts, so lemmas are never queried per text."""
+    output = output.rstrip(os.sep) or output
+    manifest_path = output + '.done'
+    errors_path = output + '.errors.jsonl'
+
+    done = read_manifest(manifest_path)
+    # Texts written to the output by a run that stopped before recording
+    # them in the manifest.
+    written = read_output_ids(output) - done \
+        if output_format == 'jsonl' else set()
+    if written:
+        with codecs.open(manifest_path, mode='a', encoding='utf-8') as f:
+            f.writelines(text_id + '\n' for text_id in sorted(written))
+        done |= written
+    jobs = [job for job in iter_inputs(source, encoding)
+            if job[0] not in done]
+    logger.info('%d texts pending (%d already done).', len(jobs), len(done))
+    if not jobs:
+        return 0, 0
+
+    workers = workers or os.cpu_count() or 1
+    ndone = nfailed = 0
+    writer = open_writer(output, output_format, row_group_size)
+    manifest = codecs.open(manifest_path, mode='a', encoding='utf-8')
+    errors = codecs.open(errors_path, mode='a', encoding='utf-8')
+
+    def checkpoint(ids):
+        for text_id in ids:
+            manifest.write(text_id + '\n')
+        manifest.flush()
+
+    pool = WorkerPool(workers, _compute, initializer=_init_worker,
+                      initargs=(metrics_name, encoding, prewarm_lexicon),
+                      timeout=timeout, max_jobs=max_texts_per_worker)
+    results = pool.imap_unordered(jobs)
+    try:
+        for job, result, error in results:
+            if result is not None:
+                text_id, metrics, meta, error = result
+            else:
+                text_id, meta = job[0], job[2]
+            if error is None:
+                checkpoint(writer.write(text_id, metrics, meta))
+                ndone += 1
+            else:
+                errors.write(json.dumps({'id': text_id, 'error': error},
+                                        ensure_ascii=False) + '\n')
+                errors.flush()
+                nfailed += 1
+                logger.warning('%s failed: %s', text_id, error)
+            logger.info('%d/%d texts processed.', ndone + nfailed, len(jobs))
+    finally:
+        results.close()
+        checkpoint(writer.close())
+        manifest.close()
+        errors.close()
+
+    return ndone, nfailed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m text_metrics.batch',
+        description='Compute NILC-Metrix metrics for a corpus.')
+    parser.add_argument('input',
+                        help='a directory, a glob pattern or a JSONL file')
+    parser.add_argument('-o', '--output', required=True,
+                        help='output file; results are appended to it')
+    parser.add_argument('-m', '--metrics', default='nilc_metrics',
+                        help='metrics set defined in text_metrics '
+                             '(default: nilc_metrics)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+                        help='per-text timeout, in seconds')
+    parser.add_argument('-f', '--format', default='jsonl', choices=FORMATS,
+                        help='output format; arrow and parquet write a '
+                             'directory of part files (require pyarrow)')
+    parser.add_argument('--row-group-size', type=int, default=200,
+                        help='arrow and parquet output: texts written at a '
+                             'time; parquet starts a new file each time '
+                             '(default: 200)')
+    parser.add_argument('--encoding', default='utf-8',
+                        help='encoding of the input files')
+    parser.add_argument('--max-texts-per-worker', type=int, default=None,
+                        help='restart each worker after this many texts')
+    parser.add_argument('--prewarm-lexicon', action='store_true',
+                        help='load the whole DELAF table into each worker '
+                             'at startup')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s')
+
+    ndone, nfailed = run(args.input, args.output, args.metrics, args.workers,
+                         args.timeout, args.encoding, args.format,
+                         args.max_texts_per_worker, args.prewarm_lexicon,
+                         args.row_group_size)
+    print('%d texts done, %d failed.' % (ndone, nfailed), file=sys.stderr)
+    return 1 if nfailed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -230,6 +230,20 @@ class Helper(object):
         """
         return self._session.query(DelafNoun).filter_by(word=noun).first()
 
+    @timed("db.get_delaf_nouns")
+    def get_delaf_nouns(self, nouns):
+        """Get the DELAF entries of several nouns in a single query.
+
+        :nouns: list of nouns to query
+        :returns: list of DelafNoun objects, for every entry of every noun
+            found
+        """
+        if not nouns:
+            return []
+        return self._session.query(DelafNoun).filter(
+            DelafNoun.word.in_(list(set(nouns)))
+        ).all()
+
     @timed("db.get_delaf_word")
     def get_delaf_word(self, word, pos=None):
         """@todo: Docstring for get_word.
@@ -248,6 +262,28 @@ class Helper(object):
 
         return result
 
+    @timed("db.get_delaf_words")
+    def get_delaf_words(self, words):
+        """Get the DELAF entries of several words in a single query.
+
+        :words: list of words to query
+        :returns: list of DelafWord objects, for every PoS of every word found
+        """
+        if not words:
+            return []
+        return self._session.query(DelafWord).filter(
+            DelafWord.word.in_(list(set(words)))
+        ).all()
+
+    @timed("db.get_all_delaf_words")
+    def get_all_delaf_words(self):
+        """Get the whole DELAF table.
+
+        :returns: list of (word, pos, lemma) rows
+        """
+        return self._session.query(DelafWord.word, DelafWord.pos,
+                                   DelafWord.lemma).all()
+
     @timed("db.get_tep_word")
     def get_tep_word(self, word, pos=None):
         """@todo: Docstring for get_tep_word.
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Integer-coded representation of a tagged text.
+
+EncodedText keeps the tokens of a text as three int32 arrays: an index into
+the text's vocabulary, an index into its tag list, and the offsets where
+each sentence starts. Tagset classes (noun, punctuation, ...) only depend on
+the tag, so the class bits of each distinct tag are looked up once and
+turned into a boolean mask over the tokens by indexing.
+
+The resource pool builds one EncodedText per text ('encoded_text') and
+derives the list-shaped resources (tagged_words, content_words,
+words_in_sents, ...) from it; metrics can also use the masks directly:
+
+    enc = rp.encoded_text(t)
+    nouns_per_sentence = enc.counts(enc.mask('noun'))
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import numpy as np
+
+
+class EncodedText(object):
+    """The tagged sentences of a text as integer arrays.
+
+    :vocab: the distinct tokens of the text, in order of appearance.
+    :tags: the distinct tags of the text, in order of appearance.
+    :token_ids: for each token, its index in vocab.
+    :tag_ids: for each token, the index of its tag in tags.
+    :offsets: where each sentence starts in token_ids, followed by the
+        number of tokens.
+    """
+
+    def __init__(self, tagged_sents, tagset):
+        """Encode a text.
+
+        :tagged_sents: a list of lists of pairs (token, tag).
+        :tagset: the TagSet of the tags.
+        """
+        vocab = {}
+        tags = {}
+        token_ids = []
+        tag_ids = []
+        offsets = [0]
+        for sentence in tagged_sents:
+            for word, tag in sentence:
+                token_ids.append(vocab.setdefault(word, len(vocab)))
+                tag_ids.append(tags.setdefault(tag, len(tags)))
+            offsets.append(len(token_ids))
+
+        self.tagset = tagset
+        self.vocab = list(vocab)
+        self.tags = list(tags)
+        self.token_ids = np.array(token_ids, dtype=np.int32)
+        self.tag_ids = np.array(tag_ids, dtype=np.int32)
+        self.offsets = np.array(offsets, dtype=np.int32)
+        self._masks = {}
+        self._tag_bits = None
+        self._sentence_ids = None
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    @property
+    def num_sentences(self):
+        return len(self.offsets) - 1
+
+    @property
+    def sentence_ids(self):
+        """The index of the sentence of each token."""
+        if self._sentence_ids is None:
+            self._sentence_ids = np.repeat(
+                np.arange(self.num_sentences, dtype=np.int32),
+                np.diff(self.offsets))
+        return self._sentence_ids
+
+    def mask(self, *classes):
+        """Return a boolean array telling which tokens belong to any of the
+        given tagset classes.
+
+        :classes: tagset class names, e.g. 'noun', 'content_word',
+            'punctuation' (see TagSet.bits).
+        """
+        if classes not in self._masks:
+            if self._tag_bits is None:
+                self._tag_bits = np.array(
+                    [self.tagset.tag_bits(tag) for tag in self.tags],
+                    dtype=np.int64)
+            table = (self._tag_bits & self.tagset.bits(*classes)) != 0
+            self._masks[classes] = table[self.tag_ids]
+        return self._masks[classes]
+
+    @property
+    def words_mask(self):
+        """The non-punctuation tokens."""
+        return ~self.mask('punctuation')
+
+    def counts(self, mask):
+        """Return how many tokens of each sentence are in a mask."""
+        return np.bincount(self.sentence_ids[mask],
+                           minlength=self.num_sentences)
+
+    def tokens(self, mask=None):
+        """Return the tokens (in a mask, if given) as a list of strings."""
+        ids = self.token_ids if mask is None else self.token_ids[mask]
+        vocab = self.vocab
+        return [vocab[i] for i in ids.tolist()]
+
+    def tagged(self, mask=None):
+        """Return the tokens (in a mask, if given) as a list of pairs
+        (token, tag)."""
+        if mask is None:
+            token_ids, tag_ids = self.token_ids, self.tag_ids
+        else:
+            token_ids, tag_ids = self.token_ids[mask], self.tag_ids[mask]
+        vocab, tags = self.vocab, self.tags
+        return [(vocab[i], tags[j]) for i, j in
+                zip(token_ids.tolist(), tag_ids.tolist(), strict=True)]
+
+    def per_sentence(self, items, mask=None):
+        """Split a list with one item per token (in a mask, if given) into
+        one list per sentence."""
+        if mask is None:
+            bounds = self.offsets.tolist()
+        else:
+            bounds = np.searchsorted(np.flatnonzero(mask),
+                                     self.offsets).tolist()
+        return [items[start:end]
+                for start, end in zip(bounds, bounds[1:], strict=False)]
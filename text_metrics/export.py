@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""Streaming columnar output (Parquet / Arrow IPC) for metric results.
+
+Rows are buffered column-wise and written as one row group (Parquet) or
+record batch (Arrow) every `row_group_size` texts, so memory on the
+producing side is bounded by a single row group whatever the corpus size.
+Each row holds the text id, its metadata (`Text.meta`, JSON-encoded) and one
+float64 column per metric.
+
+Requires pyarrow, which is only imported when a writer is created.
+
+`write` and `close` return the ids that became durable with that call, so a
+caller keeping a checkpoint (see text_metrics.batch) only records texts that
+are actually on disk:
+
+- ArrowStreamWriter uses the IPC *stream* format, which stays readable up to
+  the last complete batch even if the process dies; ids are durable once
+  their batch is flushed.
+- ParquetWriter writes to PATH.tmp and renames it on close, because a
+  Parquet file without its footer is unreadable; ids are durable on close.
+  With `rows_per_file` it closes a file every that many rows and goes on in
+  a new one (PATH-00000.parquet, PATH-00001.parquet...), so the ids of the
+  closed files are durable while it runs.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import json
+import os
+
+import numpy as np
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError('Parquet/Arrow output requires pyarrow '
+                          '(pip install pyarrow).') from e
+    return pyarrow
+
+
+class ColumnarWriter(object):
+
+    """Buffers rows and hands them to `_write_batch` one row group at a
+    time. Subclasses implement `_open`, `_write_batch` and `_close`."""
+
+    def __init__(self, path, columns=None, row_group_size=1000):
+        """Form a writer.
+
+        Required arguments:
+        :path: the output file.
+
+        Optional arguments:
+        :columns: the metric column names. If None, the metrics of the first
+            row written are used. (default None)
+        :row_group_size: number of rows buffered before a row group is
+            written. (default 1000)
+        """
+        self._pa = _import_pyarrow()
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.row_group_size = row_group_size
+        self._schema = None
+        self._reset()
+
+    def _reset(self):
+        self._ids = []
+        self._meta = []
+        self._values = [[] for _ in self.columns] if self.columns else None
+
+    def _make_schema(self):
+        pa = self._pa
+        fields = [pa.field('id', pa.string()), pa.field('meta', pa.string())]
+        fields.extend(pa.field(c, pa.float64()) for c in self.columns)
+        self._schema = pa.schema(fields)
+        self._open()
+
+    def write(self, text_id, metrics, meta=None):
+        """Buffer the metrics of one text.
+
+        :metrics: a mapping of column name -> value.
+        :returns: the ids that became durable with this call.
+        """
+        if self.columns is None:
+            self.columns = list(metrics.keys())
+            self._reset()
+        if self._schema is None:
+            self._make_schema()
+
+        self._ids.append(str(text_id))
+        self._meta.append(json.dumps(meta or {}, ensure_ascii=False,
+                                     default=str))
+        for column, values in zip(self.columns, self._values, strict=True):
+            values.append(metrics.get(column))
+
+        if len(self._ids) >= self.row_group_size:
+            return self.flush()
+        return []
+
+    def write_matrix(self, matrix, ids=None, metas=None):
+        """Write a whole ResultMatrix as one row group. The values are
+        transposed once, so that each column reaches pyarrow as a contiguous
+        array it uses without copying.
+
+        :returns: the ids that became durable with this call.
+        """
+        pa = self._pa
+        committed = self.flush() if self._ids else []
+        if self.columns is None:
+            self.columns = list(matrix.columns)
+            self._reset()
+        if list(matrix.columns) != self.columns:
+            raise ValueError('Matrix columns do not match the writer columns.')
+        if self._schema is None:
+            self._make_schema()
+
+        ids = [str(i) for i in (ids if ids is not None else range(len(matrix)))]
+        metas = metas if metas is not None else [{}] * len(matrix)
+        arrays = [pa.array(ids, pa.string()),
+                  pa.array([json.dumps(m, ensure_ascii=False, default=str)
+                            for m in metas], pa.string())]
+        arrays.extend(pa.array(column)
+                      for column in np.ascontiguousarray(matrix.values.T))
+        self._write_batch(pa.RecordBatch.from_arrays(arrays,
+                                                     schema=self._schema))
+        return committed + self._committed(ids)
+
+    def flush(self):
+        """Write the buffered rows as a row group.
+
+        :returns: the ids that became durable with this call.
+        """
+        if not self._ids:
+            return []
+        pa = self._pa
+        arrays = [pa.array(self._ids, pa.string()),
+                  pa.array(self._meta, pa.string())]
+        arrays.extend(pa.array(values, pa.float64())
+                      for values in self._values)
+        ids = self._ids
+        self._write_batch(pa.RecordBatch.from_arrays(arrays,
+                                                     schema=self._schema))
+        self._reset()
+        return self._committed(ids)
+
+    def close(self):
+        """Flush the remaining rows and close the file.
+
+        :returns: the ids that became durable with this call.
+        """
+        committed = self.flush()
+        if self._schema is not None:
+            committed += self._close()
+        return committed
+
+    def _committed(self, ids):
+        return ids
+
+    def _open(self):
+        raise NotImplementedError('Subclasses should implement this method!')
+
+    def _write_batch(self, batch):
+        raise NotImplementedError('Subclasses should implement this method!')
+
+    def _close(self):
+        raise NotImplementedError('Subclasses should implement this method!')
+
+
+class ArrowStreamWriter(ColumnarWriter):
+
+    """Writes an Arrow IPC stream (read it with pyarrow.ipc.open_stream)."""
+
+    def _open(self):
+        self._sink = self._pa.OSFile(self.path, 'wb')
+        self._writer = self._pa.ipc.new_stream(self._sink, self._schema)
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+        self._sink.flush()
+
+    def _close(self):
+        self._writer.close()
+        self._sink.close()
+        return []
+
+
+class ParquetWriter(ColumnarWriter):
+
+    """Writes a Parquet file, one row group per flush, or a series of files
+    of `rows_per_file` rows each."""
+
+    def __init__(self, path, columns=None, row_group_size=1000,
+                 compression='zstd', rows_per_file=None):
+        self.compression = compression
+        self.rows_per_file = rows_per_file
+        self._pending = []
+        self._writer = None
+        self._file = None
+        self._files = 0
+        self._rows = 0
+        super(ParquetWriter, self).__init__(path, columns, row_group_size)
+
+    def _open(self):
+        import pyarrow.parquet as pq
+        if self.rows_per_file:
+            root, ext = os.path.splitext(self.path)
+            self._file = '%s-%05d%s' % (root, self._files, ext)
+        else:
+            self._file = self.path
+        self._writer = pq.ParquetWriter(self._file + '.tmp', self._schema,
+                                        compression=self.compression)
+        self._rows = 0
+
+    def _write_batch(self, batch):
+        if self._writer is None:
+            self._open()
+        self._writer.write_table(self._pa.Table.from_batches([batch]))
+        self._rows += batch.num_rows
+
+    def _committed(self, ids):
+        # Nothing is readable before the footer is written on close.
+        self._pending.extend(ids)
+        if self.rows_per_file and self._rows >= self.rows_per_file:
+            return self._close()
+        return []
+
+    def _close(self):
+        if self._writer is None:
+            return []
+        self._writer.close()
+        self._writer = None
+        os.replace(self._file + '.tmp', self._file)
+        self._files += 1
+        committed, self._pending = self._pending, []
+        return committed
+
+
+WRITERS = {
+    'arrow': ArrowStreamWriter,
+    'parquet': ParquetWriter,
+}
@@ -74,7 +74,8 @@ class SimpleWords(base.Metric):
         sw = rp.simple_words()
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
         content_words = list(map(lambda t: t[0], content_tokens))
-        word_lemmas = [rp.stemmer().get_lemma(word.lower()) for word in content_words]
+        lemmas = rp.lemmas(t)
+        word_lemmas = [lemmas.get(word) for word in content_words]
         count = sum(1 for word in word_lemmas if word in sw)
         return count / len(content_words)
 
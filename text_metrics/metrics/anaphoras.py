@@ -21,6 +21,23 @@ from text_metrics import base
 from text_metrics.resource_pool import rp as default_rp
 
 
+def compile_referents(referents):
+    """Compile a dict of referent regexes into a single alternation.
+
+    :referents: a dict of regex -> gender/number category.
+    :returns: a pair (pattern, categories): pattern matches a lowercased word
+        against the regexes in order, and categories maps the name of the
+        group that matched (match.lastgroup) to its category.
+    """
+    groups = []
+    categories = {}
+    for i, (regex, category) in enumerate(referents.items()):
+        name = 'r%d' % i
+        groups.append('(?P<%s>%s)' % (name, regex))
+        categories[name] = category
+    return re.compile('|'.join(groups)), categories
+
+
 class AnaphoricReferencesBase(base.Metric):
     """Docstring for AnaphoricReferencesBase. """
 
@@ -63,46 +80,24 @@ class AnaphoricReferencesBase(base.Metric):
 
         self.nsentences = nsentences
 
-        self.compiled_referents = {}
-        for regex, category in self.referents.items():
-            self.compiled_referents[regex] = re.compile(regex)
+        self.referent_pattern, self.referent_categories = \
+            compile_referents(self.referents)
+
+    def referent_category(self, word):
+        """Return the category of a word if it is an anaphoric pronoun, or
+        None."""
+        match = self.referent_pattern.match(word.lower())
+        return self.referent_categories[match.lastgroup] if match else None
 
-    def find_candidates(self, sentences, indices, category, rp):
+    def find_candidates(self, candidates, indices, category):
         """Find nouns of a certain gender/number in a list of sentences.
 
-        :sentences: the tagged sentences.
+        :candidates: the 'anaphora_candidates' resource of the text.
         :indices: the indices of the sentences to be searched.
         :category: the category of nouns to look for (ms, mp, fs, fp, as, ap).
-        :rp: the resource pool to use.
         :returns: a list of nouns matching the category.
         """
-
-        candidates = []
-        for i in indices:
-            if (i, category) not in self.computed_categories:
-                sentence = sentences[i]
-                curr_candidates = []
-
-                for token in sentence:
-                    if rp.pos_tagger().tagset.is_noun(token):
-                        attrs = rp.db_helper().get_delaf_noun(token[0].lower())
-                        if not attrs:
-                            continue
-                        if category == 'ap':
-                            if attrs.morf in ('mp', 'fp'):
-                                curr_candidates.append(token[0])
-                        elif category == 'as':
-                            if attrs.morf in ('ms', 'fs'):
-                                curr_candidates.append(token[0])
-                        else:
-                            if attrs.morf == category:
-                                curr_candidates.append(token[0])
-
-                self.computed_categories[(i, category)] = curr_candidates
-
-            candidates.extend(self.computed_categories[(i, category)])
-
-        return candidates
+        return [noun for i in indices for noun in candidates[i][category]]
 
     def value_for_text(self, t, rp=default_rp):
         tokens = rp.tagged_sentences(t)
@@ -110,20 +105,18 @@ class AnaphoricReferencesBase(base.Metric):
         if len(tokens) <= 1:
             return 0.0
 
+        candidates = rp.anaphora_candidates(t)
         ncandidates = 0
         npronouns = 0
-        self.computed_categories = {}
         for isent in range(1, len(tokens)):
             iprev_sents = range(max(isent - self.nsentences, 0), isent)
 
             for token in tokens[isent]:
-                for ref, category in self.referents.items():
-                    if self.compiled_referents[ref].match(token[0].lower()):
-                        candidates = self.find_candidates(tokens, iprev_sents,
-                                                          category, rp)
-                        ncandidates += len(candidates)
-                        npronouns += 1
-                        break  # each token is at most one pronoun
+                category = self.referent_category(token[0])
+                if category is not None:
+                    ncandidates += len(self.find_candidates(
+                        candidates, iprev_sents, category))
+                    npronouns += 1
         return ncandidates / npronouns if npronouns else 0.0
 
 
@@ -169,9 +162,14 @@ class AnaphoricReferencesBaseList(base.Metric):
 
         self.nsentences = nsentences
 
-        self.compiled_referents = {}
-        for regex, category in self.referents.items():
-            self.compiled_referents[regex] = re.compile(regex)
+        self.referent_pattern, self.referent_categories = \
+            compile_referents(self.referents)
+
+    def referent_category(self, word):
+        """Return the category of a word if it is an anaphoric pronoun, or
+        None."""
+        match = self.referent_pattern.match(word.lower())
+        return self.referent_categories[match.lastgroup] if match else None
 
     def value_for_text(self, t, rp=default_rp):
         tokens = rp.tagged_sentences(t)
@@ -181,33 +179,31 @@ class AnaphoricReferencesBaseList(base.Metric):
 
         candidates = []
 
-        self.computed_categories = {}
         iterator = iter(range(len(tokens)))
         for i in iterator:
             iterator2 = iter(range(len(tokens[i])))
             for j in iterator2:
-                for ref, category in self.referents.items():
-                    if self.compiled_referents[ref].match(tokens[i][j][0].lower()):
-                        if j - 1 >= 0:
-                            prefix = tokens[i][j - 1][0]
+                if self.referent_category(tokens[i][j][0]) is not None:
+                    if j - 1 >= 0:
+                        prefix = tokens[i][j - 1][0]
 
-                        if j + 1 < len(tokens[i]):
-                            sufix = ' ' + tokens[i][j + 1][0]
+                    if j + 1 < len(tokens[i]):
+                        sufix = ' ' + tokens[i][j + 1][0]
 
-                        for point in points:
-                            if point in sufix:
-                                if len(sufix.strip()) == 1:
-                                    sufix = sufix.strip() + ' '
-                                else:
-                                    sufix = sufix + ' '
-                                break
+                    for point in points:
+                        if point in sufix:
+                            if len(sufix.strip()) == 1:
+                                sufix = sufix.strip() + ' '
+                            else:
+                                sufix = sufix + ' '
+                            break
 
-                        value = prefix + ' ' + tokens[i][j][0] + sufix
+                    value = prefix + ' ' + tokens[i][j][0] + sufix
 
-                        candidates.append(value)
+                    candidates.append(value)
 
-                        prefix = ''
-                        sufix = ''
+                    prefix = ''
+                    sufix = ''
 
         return candidates
 
@@ -20,7 +20,6 @@ from text_metrics import base
 from text_metrics.utils import ilen
 from text_metrics.tools import syllable_separator, pos_tagger
 from text_metrics.resource_pool import rp as default_rp
-from itertools import chain
 
 
 class Flesch(base.Metric):
@@ -66,9 +65,8 @@ class Flesch(base.Metric):
     def value_for_text(self, t, rp=default_rp):
         mean_words_per_sentence = WordsPerSentence().value_for_text(t)
 
-        syllables = chain.from_iterable(
-            map(syllable_separator.separate, rp.all_words(t)))
-        mean_syllables_per_word = ilen(syllables) / ilen(rp.all_words(t))
+        syllables = sum(map(syllable_separator.count, rp.all_words(t)))
+        mean_syllables_per_word = syllables / ilen(rp.all_words(t))
 
         flesch = 248.835 - 1.015 * mean_words_per_sentence\
             - 84.6 * mean_syllables_per_word
@@ -366,13 +364,11 @@ class SyllablesPerContentWord(base.Metric):
                                 rp.tagged_words(t))
         content_words = map(lambda t: t[0], content_tokens)
 
-        syllables = map(syllable_separator.separate, content_words)
-
         nwords = 0
         nsyllables = 0
-        for w in syllables:
+        for w in content_words:
             nwords += 1
-            nsyllables += len(w)
+            nsyllables += syllable_separator.count(w)
 
         return nsyllables / nwords
 
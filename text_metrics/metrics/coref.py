@@ -24,88 +24,42 @@ from text_metrics.resource_pool import rp as default_rp
 
 
 class CoreferenceBase(base.Metric):
-    """Docstring for CoreferenceBase. """
-
-    def get_sentences(self, text, rp):
-        """TODO: Docstring for get_sentences.
-
-        :text: TODO
-        :rp: TODO
-        :returns: TODO
-
-        """
-        raise NotImplementedError('Subclasses must override this method.')
-
-    @staticmethod
-    def word_pairs(s1, s2):
-        """TODO: Docstring for generate_word_pairs.
-
-        :s1: TODO
-        :s2: TODO
-        :returns: TODO
-
-        """
-        for w1 in s1:
-            for w2 in s2:
-                yield w1.lower(), w2.lower()
-
-    def sentence_pairs(self, text, rp):
-        """TODO: Docstring for is_match.
+    """Mean word overlap between pairs of sentences. The overlaps of every
+    kind of pair are computed together by the 'sentence_overlaps' resource
+    (see utils.overlap_ratios), so the adjacent and all-pairs metrics on the
+    same words share one pass over the text.
+    """
 
-        :src: TODO
-        :dst: TODO
-        :returns: TODO
+    # The resource holding the words of each sentence.
+    words = None
 
-        """
-        raise NotImplementedError('Subclasses must override this method.')
+    # Index of the pair kind in the 'sentence_overlaps' result: 0 for
+    # adjacent sentences, 1 for all pairs of sentences.
+    pair_kind = None
 
     def value_for_text(self, t, rp=default_rp):
         if len(rp.sentences(t)) <= 1:
             return 0
 
-        matches = 0
-        pairs = 0
-        for s1, s2 in self.sentence_pairs(t, rp):
-            for w1, w2 in self.word_pairs(s1, s2):
-                if w1 == w2:
-                    matches += 1
-            pairs += 1
-
-        return matches / pairs if pairs else 0
+        return rp.sentence_overlaps(t, self.words)[self.pair_kind]
 
 
 class AdjacentOverlapBase(CoreferenceBase):
-    """Docstring for AdjacentOverlapBase. """
-
-    def sentence_pairs(self, text, rp):
-        sentences = self.get_sentences(text, rp)
+    """Overlap between adjacent sentences."""
 
-        for i in range(1, len(sentences)):
-            yield sentences[i], sentences[i - 1]
+    pair_kind = 0
 
 
 class OverlapBase(CoreferenceBase):
-    """Docstring for OverlapBase. """
+    """Overlap between all pairs of sentences."""
 
-    def sentence_pairs(self, text, rp):
-        sentences = self.get_sentences(text, rp)
-
-        for i in range(len(sentences)):
-            for j in range(i + 1, len(sentences)):
-                yield sentences[i], sentences[j]
+    pair_kind = 1
 
 
 class ArgumentBase(CoreferenceBase):
+    """Overlap of arguments (nouns and pronouns)."""
 
-    def get_sentences(self, text, rp):
-        sentences = []
-        tagset = rp.pos_tagger().tagset
-        for sentence in rp.tagged_sentences(text):
-            sentences.append([token[0] for token in sentence
-                              if tagset.is_noun(token)
-                              or tagset.is_pronoun(token)])
-
-        return sentences
+    words = 'argument_words'
 
 
 # --- Metric classes ---
@@ -261,9 +215,7 @@ class AdjacentStemOverlap(AdjacentOverlapBase):
 
     name = 'Ratio of adjacent stem overlap'
     column_name = 'adj_stem_ovl'
-
-    def get_sentences(self, text, rp):
-        return rp.stemmed_content_words(text)
+    words = 'stemmed_content_words'
 
 
 class StemOverlap(OverlapBase):
@@ -317,9 +269,7 @@ class StemOverlap(OverlapBase):
 
     name = 'Ratio of stem overlap to all sentence pairs'
     column_name = 'stem_ovl'
-
-    def get_sentences(self, text, rp):
-        return rp.stemmed_content_words(text)
+    words = 'stemmed_content_words'
 
 
 class AdjacentContentWordOverlap(AdjacentOverlapBase):
@@ -370,9 +320,7 @@ class AdjacentContentWordOverlap(AdjacentOverlapBase):
 
     name = 'Ratio of adjacent content word overlap'
     column_name = 'adj_cw_ovl'
-
-    def get_sentences(self, text, rp):
-        return rp.content_words(text)
+    words = 'content_words'
 
 
 class Coreference(base.Category):
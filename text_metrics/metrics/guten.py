@@ -26,7 +26,6 @@ from text_metrics.tools import syllable_separator, pos_tagger
 from text_metrics.metrics.anaphoras import AnaphoricReferencesBase
 from text_metrics.metrics.ambiguity import get_meanings_count
 
-from itertools import filterfalse
 from itertools import chain
 import re
 
@@ -80,7 +79,8 @@ class ConcretudeMean(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -130,7 +130,8 @@ class ConcretudeStd(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -207,7 +208,8 @@ class Concretude_1_25(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -289,7 +291,8 @@ class Concretude_25_4(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -426,7 +429,8 @@ class Concretude_4_55(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -509,7 +513,8 @@ class Concretude_55_7(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -614,7 +619,8 @@ class ImageabilidadeMean(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -663,7 +669,8 @@ class ImageabilidadeStd(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -752,7 +759,8 @@ class Imageabilidade_1_25(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -844,7 +852,8 @@ class Imageabilidade_25_4(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -984,7 +993,8 @@ class Imageabilidade_4_55(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -1073,7 +1083,8 @@ class Imageabilidade_55_7(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -1177,7 +1188,8 @@ class FamiliaridadeMean(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -1225,7 +1237,8 @@ class FamiliaridadeStd(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -1301,7 +1314,8 @@ class Familiaridade_1_25(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -1380,7 +1394,8 @@ class Familiaridade_25_4(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -1513,7 +1528,8 @@ class Familiaridade_4_55(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -1594,7 +1610,8 @@ class Familiaridade_55_7(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -1700,7 +1717,8 @@ class IdadeAquisicaoMean(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -1750,7 +1768,8 @@ class IdadeAquisicaoStd(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         values = []
         for word in words:
@@ -1828,7 +1847,8 @@ class IdadeAquisicao_1_25(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -1911,7 +1931,8 @@ class IdadeAquisicao_25_4(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -2046,7 +2067,8 @@ regional (6,24),
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -2126,7 +2148,8 @@ class IdadeAquisicao_55_7(base.Metric):
 
     def value_for_text(self, t, rp=default_rp):
         content_tokens = filter(pos_tagger.tagset.is_content_word, rp.tagged_words(t))
-        words = [rp.stemmer().get_lemma(word, pos) for word, pos in content_tokens]
+        lemmas = rp.lemmas(t)
+        words = [lemmas.get(word, pos) for word, pos in content_tokens]
         words = [i for i in words if i]
         total = 0
         count = 0
@@ -3569,10 +3592,11 @@ class ContentWordsAmbiguity(base.Metric):
     def value_for_text(self, t, rp=default_rp):
         adjectives = get_meanings_count(rp, t, 'A', 'Adjetivo',
                                          rp.pos_tagger().tagset.is_adjective)
-        # Bare is_adverb here, not _counts_as_adverb: this counts dictionary
-        # word-senses per POS class, and PDEN denotative words ("também", "só")
-        # have no entry in that ambiguity lexicon — they belong only to the
-        # adverb-frequency metrics, not to this meaning count.
+        # Bare is_adverb here, not the adverbs of pos_sentence_matrix: this
+        # counts dictionary word-senses per POS class, and PDEN denotative
+        # words ("também", "só") have no entry in that ambiguity lexicon —
+        # they belong only to the adverb-frequency metrics, not to this
+        # meaning count.
         adverbs = get_meanings_count(rp, t, 'ADV', 'Advérbio',
                                       rp.pos_tagger().tagset.is_adverb)
         nouns = get_meanings_count(rp, t, 'N', 'Substantivo',
@@ -3762,13 +3786,9 @@ class FunctionWordDiversity(base.Metric):
     column_name = 'function_word_diversity'
 
     def value_for_text(self, t, rp=default_rp):
-        function_words = filter(pos_tagger.tagset.is_function_word,
-                                rp.tagged_words(t))
-        function_words = [i[0].lower() for i in function_words]
-        # unique = len(set(function_words))
+        words = rp.pos_sentence_matrix(t).words['function_words']
         try:
-            return rp.mattr(function_words)
-            # return unique / len(function_words)
+            return rp.mattr(words)
         except ZeroDivisionError:
             return 0
 
@@ -3824,10 +3844,8 @@ class ContentWordsMin(base.Metric):
     column_name = 'content_word_min'
 
     def value_for_text(self, t, rp=default_rp):
-        cw = [len(i) for i in rp.content_words(t)]
-        words = [len(i) for i in rp.tagged_sentences(t)]
-        result = [cw[i] / words[i] for i in range(len(cw))]
-        return np.array(result).min()
+        return rp.pos_sentence_matrix(t).ratios('content_words',
+                                                per='tokens').min()
 
 
 class ContentWordsMax(base.Metric):
@@ -3880,10 +3898,8 @@ class ContentWordsMax(base.Metric):
     column_name = 'content_word_max'
 
     def value_for_text(self, t, rp=default_rp):
-        cw = [len(i) for i in rp.content_words(t)]
-        words = [len(i) for i in rp.tagged_sentences(t)]
-        result = [cw[i] / words[i] for i in range(len(cw))]
-        return np.array(result).max()
+        return rp.pos_sentence_matrix(t).ratios('content_words',
+                                                per='tokens').max()
 
 
 class ContentWordsStandardDeviation(base.Metric):
@@ -3937,10 +3953,8 @@ class ContentWordsStandardDeviation(base.Metric):
     column_name = 'content_word_standard_deviation'
 
     def value_for_text(self, t, rp=default_rp):
-        cw = [len(i) for i in rp.content_words(t)]
-        words = [len(i) for i in rp.tagged_sentences(t)]
-        result = [cw[i] / words[i] for i in range(len(cw))]
-        return np.array(result).std()
+        return rp.pos_sentence_matrix(t).ratios('content_words',
+                                                per='tokens').std()
 
 
 class ContentWordDiversity(base.Metric):
@@ -3989,13 +4003,9 @@ class ContentWordDiversity(base.Metric):
     column_name = 'content_word_diversity'
 
     def value_for_text(self, t, rp=default_rp):
-        content_words = filter(pos_tagger.tagset.is_content_word,
-                               rp.tagged_words(t))
-        content_words = [i[0].lower() for i in content_words]
-        # unique = len(set(content_words))
+        words = rp.pos_sentence_matrix(t).words['content_words']
         try:
-            return rp.mattr(content_words)
-            # return unique / len(content_words)
+            return rp.mattr(words)
         except ZeroDivisionError:
             return 0
 
@@ -4043,14 +4053,7 @@ class PronounsMin(base.Metric):
     column_name = 'pronouns_min'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        pronouns = [filter(pos_tagger.tagset.is_pronoun, i) for i in sents]
-        pronouns = [len(list(i)) for i in pronouns]
-
-        result = [pronouns[i] / sents_count[i] for i in range(len(pronouns))]
-        return np.array(result).min()
+        return rp.pos_sentence_matrix(t).ratios('pronouns').min()
 
 
 class PronounsMax(base.Metric):
@@ -4096,14 +4099,7 @@ class PronounsMax(base.Metric):
     column_name = 'pronouns_max'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        pronouns = [filter(pos_tagger.tagset.is_pronoun, i) for i in sents]
-        pronouns = [len(list(i)) for i in pronouns]
-
-        result = [pronouns[i] / sents_count[i] for i in range(len(pronouns))]
-        return np.array(result).max()
+        return rp.pos_sentence_matrix(t).ratios('pronouns').max()
 
 
 class PronounsStandardDeviation(base.Metric):
@@ -4149,14 +4145,7 @@ class PronounsStandardDeviation(base.Metric):
     column_name = 'pronouns_standard_deviation'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        pronouns = [filter(pos_tagger.tagset.is_pronoun, i) for i in sents]
-        pronouns = [len(list(i)) for i in pronouns]
-
-        result = [pronouns[i] / sents_count[i] for i in range(len(pronouns))]
-        return np.array(result).std()
+        return rp.pos_sentence_matrix(t).ratios('pronouns').std()
 
 
 class PronounDiversity(base.Metric):
@@ -4204,27 +4193,13 @@ class PronounDiversity(base.Metric):
     column_name = 'pronoun_diversity'
 
     def value_for_text(self, t, rp=default_rp):
-        pronouns = filter(pos_tagger.tagset.is_pronoun, rp.tagged_words(t))
-        pronouns = [i[0].lower() for i in pronouns]
-        # unique = len(set(pronouns))
+        words = rp.pos_sentence_matrix(t).words['pronouns']
         try:
-            return rp.mattr(pronouns)
-            # return unique / len(pronouns)
+            return rp.mattr(words)
         except ZeroDivisionError:
             return 0
 
 
-def _counts_as_adverb(token):
-    """Whether a tagged token counts as an adverb for the adverbs_* metrics.
-
-    One definition shared by adverbs, adverbs_diversity_ratio, adverbs_min,
-    adverbs_max and adverbs_standard_deviation: an ADV/PREP+ADV tag, or a PDEN
-    denotative word (só, também, ainda, ...).
-    """
-    return (pos_tagger.tagset.is_adverb(token)
-            or pos_tagger.tagset.is_denotative_word(token))
-
-
 class AdverbsMin(base.Metric):
     """
         **Nome da Métrica**: adverbs min
@@ -4268,14 +4243,7 @@ class AdverbsMin(base.Metric):
     column_name = 'adverbs_min'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        adverbs = [sum(1 for tok in i if _counts_as_adverb(tok))
-                   for i in sents]
-
-        result = [adverbs[i] / sents_count[i] for i in range(len(adverbs))]
-        return np.array(result).min()
+        return rp.pos_sentence_matrix(t).ratios('adverbs').min()
 
 
 class AdverbsMax(base.Metric):
@@ -4321,14 +4289,7 @@ class AdverbsMax(base.Metric):
     column_name = 'adverbs_max'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        adverbs = [sum(1 for tok in i if _counts_as_adverb(tok))
-                   for i in sents]
-
-        result = [adverbs[i] / sents_count[i] for i in range(len(adverbs))]
-        return np.array(result).max()
+        return rp.pos_sentence_matrix(t).ratios('adverbs').max()
 
 
 class AdverbsStandardDeviation(base.Metric):
@@ -4374,14 +4335,7 @@ class AdverbsStandardDeviation(base.Metric):
     column_name = 'adverbs_standard_deviation'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        adverbs = [sum(1 for tok in i if _counts_as_adverb(tok))
-                   for i in sents]
-
-        result = [adverbs[i] / sents_count[i] for i in range(len(adverbs))]
-        return np.array(result).std()
+        return rp.pos_sentence_matrix(t).ratios('adverbs').std()
 
 
 class AdverbDiversity(base.Metric):
@@ -4426,12 +4380,9 @@ class AdverbDiversity(base.Metric):
     column_name = 'adverbs_diversity_ratio'
 
     def value_for_text(self, t, rp=default_rp):
-        adverbs = [i[0].lower() for i in rp.tagged_words(t)
-                   if _counts_as_adverb(i)]
-        # unique = len(set(adverbs))
+        words = rp.pos_sentence_matrix(t).words['adverbs']
         try:
-            return rp.mattr(adverbs)
-            # return unique / len(adverbs)
+            return rp.mattr(words)
         except ZeroDivisionError:
             return 0
 
@@ -4480,14 +4431,7 @@ class AdjectivesMin(base.Metric):
     column_name = 'adjectives_min'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        adjectives = [filter(pos_tagger.tagset.is_adjective, i) for i in sents]
-        adjectives = [len(list(i)) for i in adjectives]
-
-        result = [adjectives[i] / sents_count[i] for i in range(len(adjectives))]
-        return np.array(result).min()
+        return rp.pos_sentence_matrix(t).ratios('adjectives').min()
 
 
 class AdjectivesMax(base.Metric):
@@ -4534,14 +4478,7 @@ class AdjectivesMax(base.Metric):
     column_name = 'adjectives_max'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        adjectives = [filter(pos_tagger.tagset.is_adjective, i) for i in sents]
-        adjectives = [len(list(i)) for i in adjectives]
-
-        result = [adjectives[i] / sents_count[i] for i in range(len(adjectives))]
-        return np.array(result).max()
+        return rp.pos_sentence_matrix(t).ratios('adjectives').max()
 
 
 class AdjectivesStandardDeviation(base.Metric):
@@ -4588,14 +4525,7 @@ class AdjectivesStandardDeviation(base.Metric):
     column_name = 'adjectives_standard_deviation'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        adjectives = [filter(pos_tagger.tagset.is_adjective, i) for i in sents]
-        adjectives = [len(list(i)) for i in adjectives]
-
-        result = [adjectives[i] / sents_count[i] for i in range(len(adjectives))]
-        return np.array(result).std()
+        return rp.pos_sentence_matrix(t).ratios('adjectives').std()
 
 
 class AdjectiveDiversity(base.Metric):
@@ -4640,12 +4570,9 @@ class AdjectiveDiversity(base.Metric):
     column_name = 'adjective_diversity_ratio'
 
     def value_for_text(self, t, rp=default_rp):
-        adjectives = filter(pos_tagger.tagset.is_adjective, rp.tagged_words(t))
-        adjectives = [i[0].lower() for i in adjectives]
-        # unique = len(set(adjectives))
+        words = rp.pos_sentence_matrix(t).words['adjectives']
         try:
-            return rp.mattr(adjectives)
-            # return unique / len(adjectives)
+            return rp.mattr(words)
         except ZeroDivisionError:
             return 0
 
@@ -4697,14 +4624,7 @@ class NounsMin(base.Metric):
     column_name = 'nouns_min'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        nouns = [filter(pos_tagger.tagset.is_noun, i) for i in sents]
-        nouns = [len(list(i)) for i in nouns]
-
-        result = [nouns[i] / sents_count[i] for i in range(len(nouns))]
-        return np.array(result).min()
+        return rp.pos_sentence_matrix(t).ratios('nouns').min()
 
 
 class NounsMax(base.Metric):
@@ -4754,14 +4674,7 @@ class NounsMax(base.Metric):
     column_name = 'nouns_max'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        nouns = [filter(pos_tagger.tagset.is_noun, i) for i in sents]
-        nouns = [len(list(i)) for i in nouns]
-
-        result = [nouns[i] / sents_count[i] for i in range(len(nouns))]
-        return np.array(result).max()
+        return rp.pos_sentence_matrix(t).ratios('nouns').max()
 
 
 class NounsStandardDeviation(base.Metric):
@@ -4811,14 +4724,7 @@ class NounsStandardDeviation(base.Metric):
     column_name = 'nouns_standard_deviation'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        nouns = [filter(pos_tagger.tagset.is_noun, i) for i in sents]
-        nouns = [len(list(i)) for i in nouns]
-
-        result = [nouns[i] / sents_count[i] for i in range(len(nouns))]
-        return np.array(result).std()
+        return rp.pos_sentence_matrix(t).ratios('nouns').std()
 
 
 class NounDiversity(base.Metric):
@@ -4864,12 +4770,9 @@ class NounDiversity(base.Metric):
     column_name = 'noun_diversity'
 
     def value_for_text(self, t, rp=default_rp):
-        nouns = filter(pos_tagger.tagset.is_noun, rp.tagged_words(t))
-        nouns = [i[0].lower() for i in nouns]
-        # unique = len(set(nouns))
+        words = rp.pos_sentence_matrix(t).words['nouns']
         try:
-            return rp.mattr(nouns)
-            # return unique / len(nouns)
+            return rp.mattr(words)
         except ZeroDivisionError:
             return 0
 
@@ -4917,14 +4820,7 @@ class VerbsMin(base.Metric):
     column_name = 'verbs_min'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        verbs = [filter(pos_tagger.tagset.is_verb, i) for i in sents]
-        verbs = [len(list(i)) for i in verbs]
-
-        result = [verbs[i] / sents_count[i] for i in range(len(verbs))]
-        return np.array(result).min()
+        return rp.pos_sentence_matrix(t).ratios('verbs').min()
 
 
 class VerbsMax(base.Metric):
@@ -4970,14 +4866,7 @@ class VerbsMax(base.Metric):
     column_name = 'verbs_max'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        verbs = [filter(pos_tagger.tagset.is_verb, i) for i in sents]
-        verbs = [len(list(i)) for i in verbs]
-
-        result = [verbs[i] / sents_count[i] for i in range(len(verbs))]
-        return np.array(result).max()
+        return rp.pos_sentence_matrix(t).ratios('verbs').max()
 
 
 class VerbsStandardDeviation(base.Metric):
@@ -5022,14 +4911,7 @@ class VerbsStandardDeviation(base.Metric):
     column_name = 'verbs_standard_deviation'
 
     def value_for_text(self, t, rp=default_rp):
-        sents = [list(filterfalse(pos_tagger.tagset.is_punctuation,
-                                  i)) for i in rp.tagged_sentences(t)]
-        sents_count = [len(i) for i in sents]
-        verbs = [filter(pos_tagger.tagset.is_verb, i) for i in sents]
-        verbs = [len(list(i)) for i in verbs]
-
-        result = [verbs[i] / sents_count[i] for i in range(len(verbs))]
-        return np.array(result).std()
+        return rp.pos_sentence_matrix(t).ratios('verbs').std()
 
 
 class VerbDiversity(base.Metric):
@@ -5071,14 +4953,9 @@ class VerbDiversity(base.Metric):
     column_name = 'verb_diversity'
 
     def value_for_text(self, t, rp=default_rp):
-        verbs = [i[0].lower() for i in rp.tagged_words(t)
-                 if pos_tagger.tagset.is_verb(i) or
-                 pos_tagger.tagset.is_auxiliary_verb(i) or
-                 pos_tagger.tagset.is_participle(i)]
-        # unique = len(set(verbs))
+        words = rp.pos_sentence_matrix(t).words['all_verbs']
         try:
-            return rp.mattr(verbs)
-            # return unique / len(verbs)
+            return rp.mattr(words)
         except ZeroDivisionError:
             return 0
 
@@ -5139,7 +5016,8 @@ class DaleChall(base.Metric):
     def value_for_text(self, t, rp=default_rp):
         sw = rp.simple_words()
         words = rp.lower_words(t)
-        word_lemmas = [rp.stemmer().get_lemma(word) for word in words]
+        lemmas = rp.lemmas(t)
+        word_lemmas = [lemmas.get(word) for word in words]
         count = sum(1 for word in word_lemmas if word not in sw)
         unfamiliar_words = count / len(words) * 100
         sentences = rp.sentences(t)
@@ -5193,8 +5071,8 @@ class GunningFog(base.Metric):
     def value_for_text(self, t, rp=default_rp):
         words = rp.tagged_words(t)
         sentences = rp.sentences(t)
-        syllables = list(map(syllable_separator.separate, rp.all_words(t)))
-        complex_words = [i for i in syllables if len(i) >= 3]
+        syllables = map(syllable_separator.count, rp.all_words(t))
+        complex_words = [n for n in syllables if n >= 3]
         average_words = len(words) / ilen(sentences)
         percentage_complex = 100 * len(complex_words) / len(words)
         return 0.4 * (average_words + percentage_complex)
@@ -5468,8 +5346,8 @@ class MeanNounPhrase(base.Metric):
     column_name = 'mean_noun_phrase'
 
     def value_for_text(self, t, rp=default_rp):
-        all_leaves = rp.leaves_in_toplevel_nps(t)
-        mean_sizes = [np.mean([len(toplevel) for toplevel in sent] if sent else 0) for sent in all_leaves]
+        mean_sizes = [np.mean(stats.np_sizes) if len(stats.np_sizes) else 0
+                      for stats in rp.tree_stats(t)]
         return np.mean(mean_sizes)
 
 
@@ -5516,9 +5394,8 @@ class MaxNounPhrase(base.Metric):
     column_name = 'max_noun_phrase'
 
     def value_for_text(self, t, rp=default_rp):
-        np_sizes = [len(toplevel)
-                    for leaves in rp.leaves_in_toplevel_nps(t)
-                    for toplevel in leaves]
+        np_sizes = [size for stats in rp.tree_stats(t)
+                    for size in stats.np_sizes.tolist()]
         ret = 0
         if len(np_sizes) > 0:
             ret = max(np_sizes)
@@ -5568,9 +5445,8 @@ class MinNounPhrase(base.Metric):
     column_name = 'min_noun_phrase'
 
     def value_for_text(self, t, rp=default_rp):
-        np_sizes = [len(toplevel)
-                    for leaves in rp.leaves_in_toplevel_nps(t)
-                    for toplevel in leaves]
+        np_sizes = [size for stats in rp.tree_stats(t)
+                    for size in stats.np_sizes.tolist()]
         ret = 0
         if len(np_sizes) > 0:
             ret = min(np_sizes)
@@ -5645,9 +5521,8 @@ class StdNounPhrase(base.Metric):
     column_name = 'std_noun_phrase'
 
     def value_for_text(self, t, rp=default_rp):
-        np_sizes = [len(toplevel)
-                    for leaves in rp.leaves_in_toplevel_nps(t)
-                    for toplevel in leaves]
+        np_sizes = [size for stats in rp.tree_stats(t)
+                    for size in stats.np_sizes.tolist()]
         retorno = 0.0
         if len(np_sizes) > 0:
             retorno = np.std(np_sizes)
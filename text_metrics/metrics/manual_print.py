@@ -522,7 +522,8 @@ class ContentWordsAmbiguity(base.Metric):
         words = [word.lower() for (word, tag) in rp.tagged_words(t)
                  if checker((word, tag))]
 
-        word_stems = [rp.stemmer().get_lemma(word, delaf_tag) for word in words]
+        lemmas = rp.lemmas(t)
+        word_stems = [lemmas.get(word, delaf_tag) for word in words]
         # word_stems = [word for word in word_stems if word is not None]
 
         meanings_count = [rp.db_helper().get_tep_words_count(stem, tep_tag)
@@ -17,11 +17,8 @@
 
 from __future__ import division, print_function, unicode_literals
 
-from nltk.util import trigrams
-
 from text_metrics import base
 from text_metrics.resource_pool import rp as default_rp
-from text_metrics.utils import reverse_tree
 
 
 class YngveComplexity(base.Metric):
@@ -79,21 +76,8 @@ class YngveComplexity(base.Metric):
     column_name = 'yngve'
 
     def value_for_text(self, t, rp=default_rp):
-        syntax_trees = rp.parse_trees(t)
-
-        sentence_indices = []
-        for tree in syntax_trees:
-            reverse_tree(tree)
-
-            leaves = tree.leaves()
-
-            word_indices = []
-            for i in range(len(leaves)):
-                word_indices.append(sum(tree.leaf_treeposition(i)))
-
-            reverse_tree(tree)
-
-            sentence_indices.append((sum(word_indices) / len(word_indices)))
+        sentence_indices = [stats.yngve_index()
+                            for stats in rp.tree_stats(t)]
 
         return sum(sentence_indices) / len(sentence_indices) \
                 if sentence_indices else 0
@@ -151,41 +135,8 @@ class FrazierComplexity(base.Metric):
     column_name = 'frazier'
 
     def value_for_text(self, t, rp=default_rp):
-        syntax_trees = rp.parse_trees(t)
-
-        sentence_indices = []
-        for tree in syntax_trees:
-            if tree.label() == 'ROOT':
-                tree = tree[0]
-
-            leaves = tree.leaves()
-
-            word_indices = [0] * len(leaves)
-            for i in range(len(leaves)):
-                ref_vector = tree.leaf_treeposition(i)
-
-                j = -2
-                while j >= -len(ref_vector) and ref_vector[j] == 0:
-                    parent_index = len(ref_vector) + j
-                    parent_node = tree[ref_vector[:parent_index]]
-
-                    if rp.parser().tagset.is_sentence_node(parent_node):
-                        word_indices[i] += 1.5
-                    else:
-                        word_indices[i] += 1
-
-                    j -= 1
-
-            if len(leaves) < 3:
-                sentence_index = sum(word_indices)
-            else:
-                max_trigrams = 0
-                for trigram in trigrams(word_indices):
-                    if sum(trigram) > max_trigrams:
-                        max_trigrams = sum(trigram)
-                sentence_index = max_trigrams
-
-            sentence_indices.append(sentence_index)
+        sentence_indices = [stats.frazier_index()
+                            for stats in rp.tree_stats(t)]
 
         return sum(sentence_indices) / len(sentence_indices) \
                 if sentence_indices else 0
@@ -16,23 +16,233 @@ Usage:
 
     profiler.start_text("book.txt")
     ...
-    profiler.end_text("book.txt")
+    profiler.end_text("book.txt", text=t, rp=rp)
 
     profiler.report()  # at process exit; prints to stderr
+
+Besides the aggregated stderr report, every start_text/end_text pair yields
+a per-text record: the timing buckets touched while the text was processed,
+cache hit/miss counters (see `cache_event`), the size of the text and the
+growth of the process' peak RSS. The last record is available in-process
+through `profiler.last_text_profile()`; if NILC_PROFILE_OUT names a file
+(or `profiler.set_output(path)` is called), each record is also appended to
+it as one JSON line. MetricsSet.values_for_text opens a record by itself
+when none is open, and NILC_PROFILE_OUT alone turns on this recording
+without the stderr report, which is how the web service collects
+per-category timings.
+
+Setting NILC_PROFILE_SAMPLE to an interval in milliseconds (e.g. 5) also
+turns on a stack sampler: a background thread that periodically captures
+the Python stack of every thread inside a timed bucket and files the sample
+under the active bucket stack (e.g. metric.yngve;rp.parse_trees). At exit
+the samples are written as collapsed stacks, the input format of
+flamegraph.pl, speedscope and similar tools, to the NILC_PROFILE_STACKS
+directory (default: nilc_profile_stacks): all.folded with every sample and
+one <bucket>.folded per outermost bucket (metric or resource).
+
+Setting NILC_PROFILE_MEMORY to a number of frames (e.g. 1) traces memory
+with tracemalloc. For every bucket the report lists the peak memory
+allocated above what was live when it started and the memory still
+retained when it ended (for a resource, roughly the size of what the pool
+caches). For rp.* buckets, which only run on cache misses, a snapshot diff
+also lists the source lines that allocated the retained memory. Tracing
+slows the run down several times, so timings taken with it are not
+representative.
 """
 
 from __future__ import unicode_literals, print_function, division
 
 import os
 import sys
+import json
 import time
 import atexit
-from collections import defaultdict
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
 from contextlib import contextmanager
 from functools import wraps
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+SAMPLE_MS = float(os.environ.get("NILC_PROFILE_SAMPLE") or 0)
+STACKS_DIR = os.environ.get("NILC_PROFILE_STACKS") or "nilc_profile_stacks"
+MEMORY_FRAMES = int(os.environ.get("NILC_PROFILE_MEMORY") or 0)
+OUTPUT = os.environ.get("NILC_PROFILE_OUT") or None
+# REPORT: print the stderr report; ENABLED: collect anything at all.
+REPORT = os.environ.get("NILC_PROFILE", "").lower() not in ("", "0", "false", "no") \
+    or SAMPLE_MS > 0 or MEMORY_FRAMES > 0
+ENABLED = REPORT or OUTPUT is not None
+
+# Buckets are tracked (for the sampler and the memory tracker) only when
+# needed, as rp.get is on the hot path.
+TRACK_BUCKETS = SAMPLE_MS > 0 or MEMORY_FRAMES > 0
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _text_size(text, rp):
+    """Size of a text, using only resources the pool already holds so that
+    describing the text never triggers more processing."""
+    size = {"chars": len(text.raw_content)}
+    if rp is None or not hasattr(rp, "peek"):
+        return size
+    sentences = rp.peek("sentences", text)
+    if sentences is not None:
+        size["sentences"] = len(sentences)
+    tokens = rp.peek("all_tokens", text)
+    if tokens is not None:
+        size["tokens"] = len(tokens)
+    return size
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def _short_path(filename):
+    """Path relative to the repository, or the file name for other files."""
+    if filename.startswith(_ROOT):
+        return filename[len(_ROOT):]
+    return os.path.basename(filename)
+
+
+def _frame_label(code, lineno):
+    return ("%s (%s:%d)" % (code.co_name, _short_path(code.co_filename),
+                            lineno)).replace(";", ":")
+
+
+class _Sampler(object):
+
+    """Samples the stacks of the threads inside a timed bucket."""
+
+    def __init__(self, active, interval):
+        """:active: the profiler's {thread id: [bucket, ...]} dict.
+        :interval: seconds between samples."""
+        self._active = active
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run,
+                                        name="nilc-profile-sampler")
+        self._thread.daemon = True
 
-ENABLED = os.environ.get("NILC_PROFILE", "").lower() not in ("", "0", "false", "no")
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        own = __file__.rstrip("co")
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, buckets in list(self._active.items()):
+                frame = frames.get(ident)
+                if not buckets or frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    # Skip the timed/timed_block wrappers.
+                    if code.co_filename.rstrip("co") != own:
+                        stack.append(_frame_label(code, frame.f_lineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.counts[";".join(buckets + stack)] += 1
+            del frames
+
+    def write(self, directory):
+        """Write the collapsed stacks; returns the number of samples."""
+        if not self.counts:
+            return 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        per_bucket = defaultdict(list)
+        for stack, count in self.counts.items():
+            per_bucket[stack.split(";", 1)[0]].append((stack, count))
+        with open(os.path.join(directory, "all.folded"), "w") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write("%s %d\n" % (stack, count))
+        for bucket, rows in per_bucket.items():
+            name = "".join(c if c.isalnum() or c in "._-" else "_"
+                           for c in bucket)
+            with open(os.path.join(directory, name + ".folded"), "w") as f:
+                for stack, count in sorted(rows):
+                    f.write("%s %d\n" % (stack, count))
+        return sum(self.counts.values())
+
+
+class _MemoryTracker(object):
+
+    """Per-bucket memory accounting on top of tracemalloc.
+
+    Buckets nest, and tracemalloc keeps a single peak, so the peak is reset
+    on entering a bucket and folded back into the enclosing bucket's peak
+    on leaving it.
+    """
+
+    def __init__(self, nframes=1, sites_prefix="rp.", top_sites=10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(nframes)
+        self.sites_prefix = sites_prefix
+        self.top_sites = top_sites
+        # [bucket, current at entry, peak so far, snapshot or None]
+        self._stack = []
+        # bucket -> [calls, max peak, total retained]
+        self.buckets = defaultdict(lambda: [0, 0, 0])
+        # bucket -> {allocation site: retained bytes}
+        self.sites = defaultdict(Counter)
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def enter(self, bucket):
+        snapshot = None
+        if bucket.startswith(self.sites_prefix):
+            # Snapshots are not traced, so they do not skew the numbers.
+            snapshot = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+        tracemalloc.reset_peak()
+        self._stack.append([bucket, current, current, snapshot])
+
+    def leave(self):
+        """:returns: (bucket, peak bytes, retained bytes)."""
+        current, peak = tracemalloc.get_traced_memory()
+        bucket, start, max_peak, snapshot = self._stack.pop()
+        peak = max(peak, max_peak)
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+
+        stats = self.buckets[bucket]
+        stats[0] += 1
+        stats[1] = max(stats[1], peak - start)
+        stats[2] += current - start
+
+        if snapshot is not None:
+            diff = self._snapshot().compare_to(snapshot, "lineno")
+            for stat in diff[:self.top_sites]:
+                if stat.size_diff > 0:
+                    frame = stat.traceback[0]
+                    site = "%s:%d" % (_short_path(frame.filename),
+                                      frame.lineno)
+                    self.sites[bucket][site] += stat.size_diff
+        return bucket, peak - start, current - start
 
 
 class _Profiler(object):
@@ -41,24 +251,138 @@ class _Profiler(object):
         self._buckets = defaultdict(lambda: [0, 0.0])
         # (label, elapsed_s)
         self._texts = []
+        # cache name -> [hits, misses]
+        self._caches = defaultdict(lambda: [0, 0])
         self._cur_text_label = None
         self._cur_text_start = None
+        self._cur_text_rss = None
+        self._cur_buckets = None
+        self._cur_caches = None
+        self._last = None
         self._run_start = time.perf_counter()
+        self.output = OUTPUT
+        self.verbose = REPORT
+        # thread id -> stack of the buckets it is in (see TRACK_BUCKETS)
+        self._active = {}
+        self._sampler = None
+        self._memory = None
+        self._cur_memory = None
+
+    def enter(self, bucket):
+        self._active.setdefault(threading.get_ident(), []).append(bucket)
+        if self._memory is not None:
+            self._memory.enter(bucket)
+
+    def leave(self):
+        self._active[threading.get_ident()].pop()
+        if self._memory is not None:
+            bucket, peak, retained = self._memory.leave()
+            if self._cur_memory is not None:
+                m = self._cur_memory[bucket]
+                m[0] = max(m[0], peak)
+                m[1] += retained
+
+    def start_memory_tracing(self, nframes=1):
+        """Trace memory per bucket with tracemalloc (see module docs)."""
+        self._memory = _MemoryTracker(nframes)
+
+    def start_sampling(self, interval):
+        """Start the stack sampler, sampling every `interval` seconds."""
+        self._sampler = _Sampler(self._active, interval)
+        self._sampler.start()
+
+    def write_stacks(self, directory=STACKS_DIR):
+        """Stop the sampler and write its collapsed stacks to `directory`."""
+        if self._sampler is None:
+            return
+        self._sampler.stop()
+        nsamples = self._sampler.write(directory)
+        print("[profile] %d stack samples written to %s/" %
+              (nsamples, directory), file=sys.stderr)
+
+    def set_output(self, path):
+        """Append per-text records to `path` (JSONL), or stop if None."""
+        self.output = path
 
     def record(self, bucket, elapsed):
         b = self._buckets[bucket]
         b[0] += 1
         b[1] += elapsed
+        if self._cur_buckets is not None:
+            b = self._cur_buckets[bucket]
+            b[0] += 1
+            b[1] += elapsed
+
+    def cache_event(self, name, hit):
+        """Count a hit (or a miss) of the cache `name`."""
+        i = 0 if hit else 1
+        self._caches[name][i] += 1
+        if self._cur_caches is not None:
+            self._cur_caches[name][i] += 1
 
     def start_text(self, label):
         self._cur_text_label = label
+        self._cur_text_rss = _peak_rss_kb()
+        self._cur_buckets = defaultdict(lambda: [0, 0.0])
+        self._cur_caches = defaultdict(lambda: [0, 0])
+        if self._memory is not None:
+            self._cur_memory = defaultdict(lambda: [0, 0])
         self._cur_text_start = time.perf_counter()
 
-    def end_text(self, label):
+    def end_text(self, label, text=None, rp=None):
+        """Close the record opened by `start_text`.
+
+        Optional arguments:
+        :text: the Text just processed; its size is added to the record.
+        :rp: the resource pool used, from which the number of sentences and
+            tokens is read if they are already cached.
+        """
         elapsed = time.perf_counter() - self._cur_text_start
         self._texts.append((label, elapsed))
         # live per-book line to stderr
-        print("[profile] %s  %.2fs" % (label, elapsed), file=sys.stderr)
+        if self.verbose:
+            print("[profile] %s  %.2fs" % (label, elapsed), file=sys.stderr)
+
+        rss = _peak_rss_kb()
+        profile = {
+            "label": label,
+            "seconds": round(elapsed, 6),
+            "size": _text_size(text, rp) if text is not None else {},
+            "peak_rss_delta_kb": (rss - self._cur_text_rss
+                                  if rss is not None else None),
+            "buckets": dict((k, {"calls": v[0], "seconds": round(v[1], 6)})
+                            for k, v in self._cur_buckets.items()),
+            "caches": dict((k, {"hits": v[0], "misses": v[1]})
+                           for k, v in self._cur_caches.items()),
+        }
+        if self._cur_memory is not None:
+            profile["memory"] = dict(
+                (k, {"peak_kb": v[0] // 1024, "retained_kb": v[1] // 1024})
+                for k, v in self._cur_memory.items())
+        self._cur_buckets = self._cur_caches = self._cur_memory = None
+        self._last = profile
+
+        if self.output:
+            with open(self.output, "a") as f:
+                f.write(json.dumps(profile, ensure_ascii=False,
+                                   default=str) + "\n")
+
+    @contextmanager
+    def text_scope(self, label, text=None, rp=None):
+        """Record the enclosed work as one text, unless a record opened by
+        the caller (e.g. the batch runner) is already in progress."""
+        if self._cur_buckets is not None:
+            yield
+            return
+        self.start_text(label)
+        try:
+            yield
+        finally:
+            self.end_text(label, text=text, rp=rp)
+
+    def last_text_profile(self):
+        """The record of the last text finished, as a dict, or None."""
+        return self._last
 
     def report(self):
         out = sys.stderr
@@ -97,20 +421,91 @@ class _Profiler(object):
         dump_section("db", "db.")
         dump_section("jvm", "jvm.", with_per_call=False)
         dump_section("rp", "rp.")
+        dump_section("category", "category.")
         dump_section("metric (top 20)", "metric.", top=20)
 
+        if self._caches:
+            print("\n[cache]", file=out)
+            print("  %-44s %10s %10s %10s" %
+                  ("cache", "hits", "misses", "hit_rate"), file=out)
+            for name, (hits, misses) in sorted(self._caches.items()):
+                print("  %-44s %10d %10d %9.1f%%" %
+                      (name, hits, misses, 100.0 * hits / (hits + misses)),
+                      file=out)
+
+        if self._memory is not None:
+            self._report_memory(out)
+
+    def _report_memory(self, out, top=20, top_sites=5):
+        rows = sorted(self._memory.buckets.items(), key=lambda i: -i[1][1])
+        print("\n[memory (top %d by peak)]" % top, file=out)
+        print("  %-44s %10s %12s %12s" %
+              ("bucket", "calls", "peak_kb", "retained_kb"), file=out)
+        for name, (calls, peak, retained) in rows[:top]:
+            print("  %-44s %10d %12d %12d" %
+                  (name, calls, peak // 1024, retained // 1024), file=out)
+
+        if self._memory.sites:
+            print("\n[allocation sites of retained memory, per resource]",
+                  file=out)
+            for name, _ in rows:
+                sites = self._memory.sites.get(name)
+                if not sites:
+                    continue
+                print("  %s" % name, file=out)
+                for site, size in sites.most_common(top_sites):
+                    if size < 1024:
+                        break
+                    print("    %-54s %12d KB" % (site, size // 1024),
+                          file=out)
+
 
 class _NullProfiler(object):
+    output = None
+    def set_output(self, path): pass
     def record(self, bucket, elapsed): pass
+    def cache_event(self, name, hit): pass
     def start_text(self, label): pass
-    def end_text(self, label): pass
+    def end_text(self, label, text=None, rp=None): pass
+    def last_text_profile(self): return None
+    @contextmanager
+    def text_scope(self, label, text=None, rp=None): yield
     def report(self): pass
+    def enter(self, bucket): pass
+    def leave(self): pass
+    def start_sampling(self, interval): pass
+    def start_memory_tracing(self, nframes=1): pass
+    def write_stacks(self, directory=STACKS_DIR): pass
 
 
 profiler = _Profiler() if ENABLED else _NullProfiler()
 
 
-if ENABLED:
+if TRACK_BUCKETS:
+    @contextmanager
+    def timed_block(bucket):
+        profiler.enter(bucket)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profiler.record(bucket, time.perf_counter() - start)
+            profiler.leave()
+
+    def timed(bucket):
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                profiler.enter(bucket)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    profiler.record(bucket, time.perf_counter() - start)
+                    profiler.leave()
+            return wrapper
+        return deco
+elif ENABLED:
     @contextmanager
     def timed_block(bucket):
         start = time.perf_counter()
@@ -131,7 +526,6 @@ if ENABLED:
             return wrapper
         return deco
 
-    atexit.register(profiler.report)
 else:
     @contextmanager
     def timed_block(bucket):
@@ -141,3 +535,11 @@ else:
         def deco(fn):
             return fn
         return deco
+
+if REPORT:
+    atexit.register(profiler.report)
+if MEMORY_FRAMES > 0:
+    profiler.start_memory_tracing(MEMORY_FRAMES)
+if SAMPLE_MS > 0:
+    profiler.start_sampling(SAMPLE_MS / 1000.0)
+    atexit.register(profiler.write_stacks)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""The protocol between the Go server and the run_*.py scripts.
+
+Called with --stdin, a run script reads one request frame from stdin and
+writes response frames to stdout. A frame is a 4-byte big-endian length
+followed by that many bytes of UTF-8 JSON, so texts of any size and content
+move without escaping.
+
+Request:
+
+    {"text": "...", "stream": true}
+
+Responses, in order:
+
+    {"type": "category", "category": "Basic Counts", "metrics": [["words", 42.0], ...]}
+    {"type": "result", "metrics": [["words", 42.0], ...]}
+
+with one "category" frame per finished category if "stream" was set, or a
+single {"type": "error", "message": "..."} frame if the computation failed.
+Metric values are numbers, or null when not a finite number. A script whose
+output for the plain API format is not the "++ name:value,... ++" summary
+the server builds sends that output in the "plain" field of the result.
+Anything else the process prints (including the output of subprocesses)
+goes to stderr.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import json
+import logging
+import math
+import os
+import struct
+import sys
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct('>I')
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def write_frame(stream, obj):
+    """Write one frame to a binary stream and flush it."""
+    data = json.dumps(obj, ensure_ascii=False, allow_nan=False)
+    data = data.encode('utf-8')
+    stream.write(_LENGTH.pack(len(data)) + data)
+    stream.flush()
+
+
+def _read_exactly(stream, size):
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise ProtocolError('Unexpected end of stream (%d of %d bytes).'
+                                % (len(data), size))
+        data += chunk
+    return data
+
+
+def read_frame(stream):
+    """Read one frame from a binary stream and return its JSON value."""
+    size, = _LENGTH.unpack(_read_exactly(stream, _LENGTH.size))
+    return json.loads(_read_exactly(stream, size).decode('utf-8'))
+
+
+def number(value, ndigits=None):
+    """A metric value as a float, or None if it is not a finite number."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value):
+        return None
+    return value if ndigits is None else round(value, ndigits)
+
+
+def metric_pairs(values, columns=None, ndigits=None):
+    """[column name, value] pairs of a flat dict of results.
+
+    :values: a dict of column name -> value.
+    :columns: the column names to keep, in order; they are sent with spaces
+        replaced by underscores. Raises KeyError if one of them is not in
+        values. (default: all of them, as they are)
+    :ndigits: round the values to this many digits. (default None)
+    """
+    if columns is None:
+        return [[column, number(value, ndigits)]
+                for column, value in values.items()]
+    return [[column.replace(' ', '_'), number(values[column], ndigits)]
+            for column in columns]
+
+
+def category_writer(stream, columns=None, ndigits=None):
+    """Return a MetricsSet.values_for_text callback writing a "category"
+    frame for each finished category."""
+    def callback(category, values):
+        flat = dict((metric.column_name, value)
+                    for metric, value in values.items())
+        keep = None if columns is None else \
+            [column for column in columns if column in flat]
+        write_frame(stream, {'type': 'category', 'category': category.name,
+                             'metrics': metric_pairs(flat, keep, ndigits)})
+    return callback
+
+
+def _claim_stdout():
+    """Return a binary stream on the real stdout and point file descriptor 1
+    (prints, logging to stdout, subprocesses) to stderr."""
+    sys.stdout.flush()
+    out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    return out
+
+
+def serve(metrics_set, columns=None, ndigits=None, plain=None, stdin=None,
+          stdout=None):
+    """Answer one request from stdin with the values of a MetricsSet.
+
+    :metrics_set: the MetricsSet to calculate.
+    :columns: the column names to send, in order. (default: all of them)
+    :ndigits: round the values to this many digits. (default None)
+    :plain: a function of the text and the flat dict of values returning
+        the output for the plain API format. (default: the server's summary)
+    :stdin: binary stream to read the request from. (default sys.stdin)
+    :stdout: binary stream to write the frames to. (default: the real
+        stdout, with everything else written to it sent to stderr)
+    :returns: the exit status.
+    """
+    from text_metrics.base import Text
+
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or _claim_stdout()
+    try:
+        request = read_frame(stdin)
+        text = Text(request['text'])
+        callback = category_writer(stdout, columns, ndigits) \
+            if request.get('stream') else None
+        values = metrics_set.values_for_text(text, callback=callback)
+        values = values.as_flat_dict()
+        result = {'type': 'result',
+                  'metrics': metric_pairs(values, columns, ndigits)}
+        if plain is not None:
+            result['plain'] = plain(request['text'], values)
+        write_frame(stdout, result)
+    except Exception as e:
+        logger.exception('Computing the metrics failed.')
+        write_frame(stdout, {'type': 'error',
+                             'message': '%s: %s' % (type(e).__name__, e)})
+        return 1
+    return 0
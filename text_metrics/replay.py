@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""Replay recorded outputs of the external tools.
+
+Almost every metric needs a Java parser, the Palavras web service or the
+cohmetrix database. ReplayResourcePool swaps those for adapters that serve
+outputs recorded from a real run, so the metrics can be computed, profiled
+and benchmarked on a machine that has none of them.
+
+Recording (with the real tools available):
+
+    NILC_REPLAY_RECORD=1 python tests/benchmark.py --scales 1 \\
+        --pool text_metrics.replay:ReplayResourcePool
+
+Replaying (offline):
+
+    python tests/benchmark.py --pool text_metrics.replay:ReplayResourcePool
+
+Outputs are stored as one JSON file per tool in the fixtures directory
+(config['REPLAY_FIXTURES'], or NILC_REPLAY_DIR), keyed by a hash of the
+tool's input. Taggers and parsers are keyed per sentence, so a text made of
+recorded sentences replays even if it was never seen as a whole; Palavras
+is keyed per text, DELAF lookups per word and other database queries per
+method and arguments. A miss
+raises FixtureMissing in replay mode and calls the real tool in record mode.
+
+NILC_REPLAY_LATENCY adds an artificial delay to every replayed call, either
+for all tools ("0.5") or per tool ("parser=2,dep_parser=1.5,*=0.1"), to
+mimic the cost of the real backends.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import atexit
+import codecs
+import hashlib
+import json
+import logging
+import os
+import time
+
+from nltk.parse import DependencyGraph
+from nltk.tree import Tree
+
+from text_metrics.conf import config
+from text_metrics.resource_pool import DefaultResourcePool
+from text_metrics.tools import pos_tagger, univ_pos_tagger, parser, dep_parser
+from text_metrics.tools.dependency.api import DependencyParser
+from text_metrics.tools.parse.api import Parser
+from text_metrics.tools.parse.flat import FlatTree
+from text_metrics.tools.stemmers import DelafStemmer
+from text_metrics.tools.tag.api import Tagger
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureMissing(KeyError):
+    pass
+
+
+def parse_latency(spec):
+    """Parse a latency spec ("0.5" or "parser=2,*=0.1") into a dict of
+    tool -> seconds, where '*' is the default."""
+    if not spec:
+        return {}
+    if isinstance(spec, (int, float)):
+        return {'*': float(spec)}
+    latency = {}
+    for item in spec.split(','):
+        tool, _, seconds = item.rpartition('=')
+        latency[tool.strip() or '*'] = float(seconds)
+    return latency
+
+
+class FixtureStore(object):
+
+    """Recorded tool outputs, one JSON file per tool, keyed by input hash."""
+
+    def __init__(self, directory, record=False, latency=None):
+        """Form a fixture store.
+
+        Required arguments:
+        :directory: the directory holding the <tool>.json files.
+
+        Optional arguments:
+        :record: if True, misses are computed and saved; otherwise they raise
+            FixtureMissing. (default False)
+        :latency: seconds slept on every replayed call, as a number, a spec
+            string or a dict (see parse_latency). (default None)
+        """
+        self.directory = directory
+        self.record = record
+        self.latency = latency if isinstance(latency, dict) \
+            else parse_latency(latency)
+        self._tables = {}
+        self._dirty = set()
+        if record:
+            atexit.register(self.save)
+
+    @staticmethod
+    def key(value):
+        """Content hash of a JSON-serializable value."""
+        data = json.dumps(value, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def _path(self, tool):
+        return os.path.join(self.directory, tool + '.json')
+
+    def _table(self, tool):
+        table = self._tables.get(tool)
+        if table is None:
+            path = self._path(tool)
+            if os.path.isfile(path):
+                with codecs.open(path, encoding='utf-8') as f:
+                    table = json.load(f)
+            else:
+                table = {}
+            self._tables[tool] = table
+        return table
+
+    def sleep(self, tool):
+        seconds = self.latency.get(tool, self.latency.get('*', 0.0))
+        if seconds:
+            time.sleep(seconds)
+
+    def get_many(self, tool, inputs, compute):
+        """Return the recorded outputs for a list of inputs.
+
+        :tool: the tool name.
+        :inputs: a list of JSON-serializable inputs.
+        :compute: a function that receives the inputs with no recording and
+            returns their outputs, in order (record mode only).
+        :returns: the list of (serialized) outputs. If compute returns fewer
+            outputs than it was given inputs (MaltParser drops a trailing
+            empty graph), they cannot be matched to their inputs: what
+            compute returns for the whole list is recorded and replayed for
+            that list only.
+        """
+        table = self._table(tool)
+        keys = [self.key(value) for value in inputs]
+        missing = [i for i, key in enumerate(keys) if key not in table]
+        if not missing:
+            self.sleep(tool)
+            return [table[key] for key in keys]
+
+        whole = self.key(['whole', inputs])
+        if whole in table:
+            self.sleep(tool)
+            return list(table[whole])
+        if not self.record:
+            raise FixtureMissing('%s: %d of %d inputs not recorded in %s.'
+                                 % (tool, len(missing), len(keys),
+                                    self._path(tool)))
+
+        outputs = compute([inputs[i] for i in missing])
+        self._dirty.add(tool)
+        if len(outputs) != len(missing):
+            if len(missing) != len(inputs):
+                outputs = compute(list(inputs))
+            table[whole] = list(outputs)
+            return list(outputs)
+        for i, output in zip(missing, outputs, strict=True):
+            table[keys[i]] = output
+        return [table[key] for key in keys]
+
+    def get(self, tool, value, compute):
+        """Return the recorded output for a single input."""
+        return self.get_many(tool, [value],
+                             lambda values: [compute(values[0])])[0]
+
+    def save(self):
+        """Write the tables changed since the last save."""
+        if not self._dirty:
+            return
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        for tool in sorted(self._dirty):
+            path = self._path(tool)
+            with codecs.open(path + '.tmp', mode='w', encoding='utf-8') as f:
+                json.dump(self._tables[tool], f, ensure_ascii=False,
+                          sort_keys=True)
+            os.replace(path + '.tmp', path)
+        self._dirty = set()
+
+
+class ReplayTagger(Tagger):
+
+    """Replays a part-of-speech tagger (NLPNetTagger, OpenNLPTagger...)."""
+
+    def __init__(self, store, tool, tagger):
+        self._store = store
+        self._tool = tool
+        self._tagger = tagger
+        self.tagset = tagger.tagset
+
+    def _compute(self, sentences):
+        return [[list(pair) for pair in sent]
+                for sent in self._tagger.tag_sents(sentences)]
+
+    def tag_sents(self, sentences):
+        sentences = [list(sent) for sent in sentences]
+        tagged = self._store.get_many(self._tool, sentences, self._compute)
+        return [[tuple(pair) for pair in sent] for sent in tagged]
+
+
+class ReplayParser(Parser):
+
+    """Replays a constituency parser (LxParser). Trees are stored in
+    bracketed form and rebuilt with Tree.fromstring (or FlatTree.fromstring,
+    by parse_sents_flat)."""
+
+    def __init__(self, store, parser, tool='parser'):
+        self._store = store
+        self._tool = tool
+        self._parser = parser
+        self.tagset = parser.tagset
+
+    def _compute(self, sents):
+        return [tree.pformat(margin=float('inf'))
+                for tree in self._parser.parse_sents(sents)]
+
+    def _trees(self, sents):
+        return self._store.get_many(self._tool, list(sents), self._compute)
+
+    def parse_sents(self, sents):
+        return [Tree.fromstring(tree) for tree in self._trees(sents)]
+
+    def parse_sents_flat(self, sents):
+        return [FlatTree.fromstring(tree) for tree in self._trees(sents)]
+
+
+class ReplayDependencyParser(DependencyParser):
+
+    """Replays a dependency parser (MaltParser). Graphs are stored in CoNLL
+    format."""
+
+    def __init__(self, store, parser, tool='dep_parser'):
+        self._store = store
+        self._tool = tool
+        self._parser = parser
+
+    def _compute(self, sents):
+        return [graph.to_conll(10) for graph in self._parser.parse_sents(sents)]
+
+    def parse_sents(self, sents):
+        sents = [list(sent) for sent in sents]
+        return [DependencyGraph(graph, top_relation_label='null') for graph in
+                self._store.get_many(self._tool, sents, self._compute)]
+
+
+class ReplayRow(object):
+
+    """Stands for a database row (DelafWord, TepWord, Frequency...)."""
+
+    def __init__(self, table, **columns):
+        self.__dict__.update(columns)
+        self._table = table
+
+    def __repr__(self):
+        return '<%s (replayed): %s>' % (self._table, ', '.join(
+            '%s=%s' % item for item in sorted(self.__dict__.items())
+            if not item[0].startswith('_')))
+
+
+def _dump_db(value):
+    """Serialize a database.Helper return value."""
+    if isinstance(value, list):
+        return [_dump_db(v) for v in value]
+    if isinstance(value, dict):
+        return {'__map__': [[k, _dump_db(v)] for k, v in value.items()]}
+    if hasattr(value, '__table__'):
+        columns = dict((c.name, getattr(value, c.name))
+                       for c in value.__table__.columns)
+        return {'__row__': type(value).__name__, 'columns': columns}
+    return value
+
+
+def _load_db(value):
+    if isinstance(value, list):
+        return [_load_db(v) for v in value]
+    if isinstance(value, dict):
+        if '__map__' in value:
+            return dict((k, _load_db(v)) for k, v in value['__map__'])
+        return ReplayRow(value['__row__'], **value['columns'])
+    return value
+
+
+class ReplayHelper(object):
+
+    """Replays database.Helper: every query method is keyed by its name and
+    arguments, except get_delaf_words, which is keyed per word."""
+
+    def __init__(self, store, helper=None, tool='db'):
+        """:helper: a function returning the real Helper, called once on the
+        first miss (record mode)."""
+        self._store = store
+        self._tool = tool
+        self._helper_factory = helper
+        self._helper = None
+
+    def _real_helper(self):
+        if self._helper is None:
+            self._helper = self._helper_factory()
+        return self._helper
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def query(*args):
+            def compute(_):
+                return _dump_db(getattr(self._real_helper(), name)(*args))
+            return _load_db(self._store.get(self._tool, [name, list(args)],
+                                            compute))
+        query.__name__ = name
+        return query
+
+    def get_delaf_words(self, words):
+        # The words a DelafStemmer asks for are those it has not fetched
+        # before, which depends on the texts that came first; keyed per word,
+        # the recording replays for any texts in any order.
+        def compute(words):
+            found = dict((word, []) for word in words)
+            for row in self._real_helper().get_delaf_words(words):
+                found.setdefault(row.word, []).append(_dump_db(row))
+            return [found[word] for word in words]
+        entries = self._store.get_many(self._tool + '.delaf_words',
+                                       sorted(set(words)), compute)
+        return [_load_db(row) for rows in entries for row in rows]
+
+
+class ReplayResourcePool(DefaultResourcePool):
+
+    """A DefaultResourcePool whose external tools (taggers, LX-Parser,
+    MaltParser, Palavras and the database) are replayed from fixtures.
+    Everything else, including the word lists and models read from disk,
+    works as in the default pool."""
+
+    def __init__(self, directory=None, record=None, latency=None):
+        """Form a replay pool. Arguments left as None are read from the
+        environment (NILC_REPLAY_DIR, NILC_REPLAY_RECORD and
+        NILC_REPLAY_LATENCY) or, for the directory, from
+        config['REPLAY_FIXTURES'].
+        """
+        if directory is None:
+            directory = os.environ.get('NILC_REPLAY_DIR') or \
+                config.get('REPLAY_FIXTURES')
+        if record is None:
+            record = os.environ.get('NILC_REPLAY_RECORD', '').lower() \
+                not in ('', '0', 'false', 'no')
+        if latency is None:
+            latency = os.environ.get('NILC_REPLAY_LATENCY')
+        self.store = FixtureStore(directory, record, latency)
+
+        super(ReplayResourcePool, self).__init__()
+
+        store = self.store
+        real_helper = super(ReplayResourcePool, self)._db_helper
+        tools = {
+            'pos_tagger': ReplayTagger(store, 'pos_tagger', pos_tagger),
+            'univ_pos_tagger': ReplayTagger(store, 'univ_pos_tagger',
+                                            univ_pos_tagger),
+            'parser': ReplayParser(store, parser),
+            'dep_parser': ReplayDependencyParser(store, dep_parser),
+            'db_helper': ReplayHelper(store, real_helper),
+            'stemmer': DelafStemmer(helper=lambda: self.get('db_helper')),
+        }
+        for suffix, tool in tools.items():
+            self._hooks[suffix] = lambda tool=tool: tool
+
+    def _palavras_flat(self, text):
+        default = super(ReplayResourcePool, self)._palavras_flat
+        return self.store.get('palavras_flat', text.raw_content,
+                              lambda _: default(text))
+
+    def save(self):
+        """Write the outputs recorded so far (also done at exit)."""
+        self.store.save()
@@ -17,8 +17,6 @@
 
 from __future__ import unicode_literals, print_function, division
 
-import nltk
-
 from text_metrics.tools import senter, word_tokenize,\
     pos_tagger, stemmer, parser, dep_parser, univ_pos_tagger, palavras_flat,\
     positive_words, negative_words, simple_words, discourse_markers,\
@@ -27,24 +25,61 @@ from text_metrics.tools import senter, word_tokenize,\
     translate, concreteness, load_psicolinguistico
 from text_metrics.tools.lsa import LsaSpace
 from text_metrics.tools.lm import KenLmLanguageModel
-from text_metrics.utils import is_valid_id, ilen
+from text_metrics.encoded import EncodedText
+from text_metrics.tree_stats import TreeStats
+from text_metrics.utils import is_valid_id, overlap_ratios, mattr, \
+    mattr_relative
 from text_metrics.database import create_engine, create_session, Helper
 from text_metrics.conf import config
 from text_metrics.tools.freq_corpora import brwac_frequencies, brasileiro_frequencies
-from text_metrics.profiling import timed_block
+from text_metrics.profiling import timed_block, profiler
 
 import re
 import logging
+from collections import defaultdict
 from itertools import chain
 from os.path import basename, isfile, join
-from numpy import mean
+import numpy as np
 from functools import reduce
-from itertools import filterfalse
 
 
 logger = logging.getLogger(__name__)
 
 
+class PosSentenceMatrix(object):
+    """Per-sentence counts of coarse part-of-speech classes, built in one
+    pass over the tagged sentences of a text.
+
+    :counts: an int array with one row per sentence and one column per class
+        in CLASSES. 'tokens' counts every token and 'words' every
+        non-punctuation token.
+    :words: for each class other than 'tokens', the lowercased words of that
+        class in text order.
+    """
+
+    CLASSES = ('tokens', 'words', 'content_words', 'function_words', 'nouns',
+               'verbs', 'all_verbs', 'adjectives', 'adverbs', 'pronouns')
+
+    def __init__(self, counts, words):
+        self.counts = counts
+        self.words = words
+
+    def column(self, pos):
+        """Return the counts of a class, one per sentence."""
+        return self.counts[:, self.CLASSES.index(pos)]
+
+    def ratios(self, pos, per='words'):
+        """Return the count of a class in each sentence divided by the number
+        of words (or tokens) in the sentence.
+
+        Raises ZeroDivisionError if a sentence has no words.
+        """
+        total = self.column(per)
+        if (total == 0).any():
+            raise ZeroDivisionError('Sentence with no %s.' % per)
+        return self.column(pos) / total
+
+
 class ResourcePool(object):
     """A resource pool is a repository of methods for producing application
     resources. It centralizes tasks like PoS-tagging and sentence splitting,
@@ -123,6 +158,7 @@ class ResourcePool(object):
 
         if suffix in self._pinned:
             index = self._get_index(self._pinned_cache, suffix, args)
+            profiler.cache_event("rp." + suffix, index is not None)
             if index is None:
                 with timed_block("rp." + suffix):
                     value = self._hooks[suffix](*args)
@@ -132,6 +168,7 @@ class ResourcePool(object):
             return self._pinned_cache[index][2]
         else:
             index = self._get_index(self._unpinned_cache, suffix, args)
+            profiler.cache_event("rp." + suffix, index is not None)
             if index is None:
                 with timed_block("rp." + suffix):
                     value = self._hooks[suffix](*args)
@@ -144,6 +181,17 @@ class ResourcePool(object):
 
             return value
 
+    def peek(self, suffix, *args):
+        """Return a resource if it is already in the cache, without
+        computing it.
+
+        :returns: The resource data, or None if it is not cached.
+        """
+        cache = self._pinned_cache if suffix in self._pinned \
+            else self._unpinned_cache
+        index = self._get_index(cache, suffix, args)
+        return cache[index][2] if index is not None else None
+
 
 class DefaultResourcePool(ResourcePool):
     """A resource pool that uses the standard tools.
@@ -177,15 +225,21 @@ class DefaultResourcePool(ResourcePool):
         self.register('mattr', self._mattr)
         self.register('mattr_relative', self._mattr_relative)
         self.register('tagged_sentences', self._tagged_sentences)
+        self.register('encoded_text', self._encoded_text)
         self.register('tagged_tokens', self._tagged_tokens)
         self.register('tagged_words', self._tagged_words)
         self.register('tagged_words_in_sents', self._tagged_words_in_sents)
 
         # Derived text info.
         self.register('content_words', self._content_words)
+        self.register('lemmas', self._lemmas)
         self.register('stemmed_content_words', self._stemmed_content_words)
         self.register('content_words_with_tags', self._content_words_with_tags)
         self.register('words_with_tags_in_sents', self._words_with_tags_in_sents)
+        self.register('argument_words', self._argument_words)
+        self.register('anaphora_candidates', self._anaphora_candidates)
+        self.register('sentence_overlaps', self._sentence_overlaps)
+        self.register('pos_sentence_matrix', self._pos_sentence_matrix)
         self.register('cw_freq', self._cw_freq)
         self.register('cw_freq_brwac', self._cw_freq_brwac)
         self.register('freq_brwac', self._freq_brwac)
@@ -195,7 +249,9 @@ class DefaultResourcePool(ResourcePool):
         self.register('translation', self._translate)
 
         # Parse structures.
+        self.register('flat_parse_trees', self._flat_parse_trees)
         self.register('parse_trees', self._parse_trees)
+        self.register('tree_stats', self._tree_stats)
         self.register('dep_trees', self._dep_trees)
         self.register('palavras_flat', self._palavras_flat)
 
@@ -287,8 +343,8 @@ class DefaultResourcePool(ResourcePool):
     def _sentence_lengths(self, text):
         """Return a list with the lengths, in words, of each sentence of the text.
         """
-        sentences = self.get('tagged_sentences', text)
-        return [ilen(filterfalse(self.get("pos_tagger").tagset.is_punctuation, s)) for s in sentences]
+        encoded = self.get('encoded_text', text)
+        return encoded.counts(encoded.words_mask).tolist()
 
     def _num_clauses(self, text):
         """
@@ -313,14 +369,9 @@ class DefaultResourcePool(ResourcePool):
         """Return a list of lists of strings, where each list of strings
             corresponds to a sentence, and each string in the list is a word.
         """
-        tagged_sents = self.get('tagged_sentences', text)
-        tagset = self.get('pos_tagger').tagset
-        words = list(tagged_sents)
-        for i in range(len(tagged_sents)):
-            words[i] = [word for (word, tag) in tagged_sents[i]
-                        if not tagset.is_punctuation((word, tag))]
-        return words
-
+        encoded = self.get('encoded_text', text)
+        mask = encoded.words_mask
+        return encoded.per_sentence(encoded.tokens(mask), mask)
 
     def _all_tokens(self, text):
         """Return all tokens of the text in a single list.
@@ -331,8 +382,8 @@ class DefaultResourcePool(ResourcePool):
     def _all_words(self, text):
         """Return all non-punctuation tokens of the text in a single list.
         """
-        tagged_words = self.get('tagged_words', text)
-        return [word[0] for word in tagged_words]
+        encoded = self.get('encoded_text', text)
+        return encoded.tokens(encoded.words_mask)
 
     def _lower_words(self, text):
         """
@@ -347,43 +398,35 @@ class DefaultResourcePool(ResourcePool):
             the sentences with tagged tokens.
         """
         tokens = self.get('tokens', text)
-        return pos_tagger.tag_sents(tokens)
+        return self.get('pos_tagger').tag_sents(tokens)
+
+    def _encoded_text(self, text):
+        """Return the tagged sentences of the text as an EncodedText.
+        """
+        return EncodedText(self.get('tagged_sentences', text),
+                           self.get('pos_tagger').tagset)
 
     def _tagged_tokens(self, text):
         """Return a list of pair (string, string), representing the tokens
             not separated in sentences.
         """
-        tagged_sentences = self.get('tagged_sentences', text)
-        return list(chain.from_iterable(tagged_sentences))
+        return self.get('encoded_text', text).tagged()
 
     def _tagged_words(self, text):
         """Return a list of pairs (string, string), representing the
             non-punctuation tokens not separated in sentences.
         """
-        tagged_tokens = self.get('tagged_tokens', text)
-        tagset = self.get('pos_tagger').tagset
-        tagged_words = [token for token in tagged_tokens
-                        if not tagset.is_punctuation(token)]
-        return tagged_words
+        encoded = self.get('encoded_text', text)
+        return encoded.tagged(encoded.words_mask)
 
     def _tagged_words_in_sents(self, text):
         """Return a list of lists of pairs (string, string),
             representing the non-punctuation tokens separated
             in sentences.
         """
-
-        tagged_tokens = self.get('tagged_tokens', text)
-        tagset = self.get('pos_tagger').tagset
-        tagged_words = [token for token in tagged_tokens
-                        if not tagset.is_punctuation(token)]
-
-
-        tagged_sents = self.get('tagged_sentences', text)
-        tagset = self.get('pos_tagger').tagset
-        tagged_words = [[token for token in tagged_sent
-                         if not tagset.is_punctuation(token)]
-                        for tagged_sent in tagged_sents]
-        return tagged_words
+        encoded = self.get('encoded_text', text)
+        mask = encoded.words_mask
+        return encoded.per_sentence(encoded.tagged(mask), mask)
 
     def _content_words(self, text):
         """Return the content words of the text, separated in sentences.
@@ -392,13 +435,15 @@ class DefaultResourcePool(ResourcePool):
         :returns: @todo
 
         """
-        tagged_sents = self.get('tagged_sentences', text)
-        content_words = list(tagged_sents)
-        for i in range(len(tagged_sents)):
-            content_words[i] = [word for (word, tag) in tagged_sents[i]
-                                if pos_tagger.tagset.is_content_word(
-                                    (word, tag))]
-        return content_words
+        encoded = self.get('encoded_text', text)
+        mask = encoded.mask('content_word')
+        return encoded.per_sentence(encoded.tokens(mask), mask)
+
+    def _lemmas(self, text):
+        """Return the lemmas of every token of the text, looked up in a
+            single query (see stemmers.Lemmas).
+        """
+        return self.get('stemmer').lemmas(self.get('encoded_text', text).vocab)
 
     def _stemmed_content_words(self, text):
         """Return the stem of each content word in the text, separated in
@@ -411,15 +456,15 @@ class DefaultResourcePool(ResourcePool):
         tagged_sents = self.get('tagged_sentences', text)
         tagset = self.get('pos_tagger').tagset
         stemmed_content_words = []
-        stemmer = self.get('stemmer')
+        lemmas = self.get('lemmas', text)
         for sentence in tagged_sents:
 
             curr_sentence = []
             for token in sentence:
                 if tagset.is_content_word(token):
-                    # TODO: add 'tag' to stemmer.get_lemma call after
+                    # TODO: add 'tag' to the lemmas.get call after
                     #   tag normalization.
-                    lemma = stemmer.get_lemma(token[0])
+                    lemma = lemmas.get(token[0])
                     lemma = lemma if lemma else token[0]
                     curr_sentence.append(lemma)
 
@@ -430,33 +475,112 @@ class DefaultResourcePool(ResourcePool):
             #                             (word, tag))]
         return stemmed_content_words
 
+    def _argument_words(self, text):
+        """Return the arguments (nouns and pronouns) of the text, separated
+        in sentences.
+        """
+        encoded = self.get('encoded_text', text)
+        mask = encoded.mask('noun', 'pronoun')
+        return encoded.per_sentence(encoded.tokens(mask), mask)
+
+    # The gender/number categories an anaphoric pronoun can ask for, by the
+    # DELAF morf of the noun ('as'/'ap' are singular/plural of any gender).
+    _morf_categories = {
+        'ms': ('ms', 'as'),
+        'fs': ('fs', 'as'),
+        'mp': ('mp', 'ap'),
+        'fp': ('fp', 'ap'),
+    }
+
+    def _anaphora_candidates(self, text):
+        """Return the nouns of each sentence of the text that may be the
+            referent of an anaphoric pronoun, as a list with one dict per
+            sentence mapping a category (ms, mp, fs, fp, as, ap) to the
+            nouns of that category, in text order. The DELAF morf of the
+            nouns is looked up in a single query.
+        """
+        encoded = self.get('encoded_text', text)
+        mask = encoded.mask('noun')
+        nouns = encoded.tokens(mask)
+
+        morfs = {}
+        rows = self.get('db_helper').get_delaf_nouns(
+            sorted(set(noun.lower() for noun in nouns)))
+        for row in rows:
+            morfs.setdefault(row.word, row.morf)
+
+        candidates = []
+        for sentence in encoded.per_sentence(nouns, mask):
+            categories = defaultdict(list)
+            for noun in sentence:
+                # Only nouns of a definite gender and number are candidates.
+                for category in self._morf_categories.get(
+                        morfs.get(noun.lower()), ()):
+                    categories[category].append(noun)
+            candidates.append(categories)
+        return candidates
+
+    def _sentence_overlaps(self, text, words):
+        """Return the word overlap between the sentences of the text, as
+        computed by utils.overlap_ratios.
+
+        :words: the resource holding the words of each sentence, e.g.
+            'argument_words', 'stemmed_content_words' or 'content_words'.
+        :returns: a pair (adjacent, all_pairs) of mean overlaps.
+        """
+        return overlap_ratios(self.get(words, text))
+
+    def _pos_sentence_matrix(self, text):
+        """Return a PosSentenceMatrix of the text."""
+        encoded = self.get('encoded_text', text)
+        words_mask = encoded.words_mask
+        masks = [
+            np.ones(len(encoded), dtype=bool),
+            words_mask,
+            encoded.mask('content_word'),
+            encoded.mask('function_word'),
+            encoded.mask('noun'),
+            encoded.mask('verb'),
+            encoded.mask('verb', 'auxiliary_verb', 'participle'),
+            encoded.mask('adjective'),
+            # One definition for adverbs_min/max/standard_deviation and
+            # adverbs_diversity_ratio: an ADV/PREP+ADV tag, or a PDEN
+            # denotative word (só, também, ainda, ...).
+            encoded.mask('adverb', 'denotative_word'),
+            encoded.mask('pronoun'),
+        ]
+        # Every class but 'tokens' only counts non-punctuation tokens.
+        counts = np.zeros((encoded.num_sentences, len(masks)), dtype=int)
+        for i, mask in enumerate(masks):
+            counts[:, i] = encoded.counts(mask & words_mask if i else mask)
+
+        lower = [word.lower() for word in encoded.vocab]
+        words = {}
+        for pos, mask in zip(PosSentenceMatrix.CLASSES[1:], masks[1:],
+                             strict=True):
+            ids = encoded.token_ids[mask & words_mask].tolist()
+            words[pos] = [lower[i] for i in ids]
+        return PosSentenceMatrix(counts, words)
+
     def _words_with_tags_in_sents(self, text):
         """Return the content words of the text, separated in sentences, but with _tag.
         :text: @todo
         :returns: @todo
         """
-        tagged_sents = self.get('tagged_sentences', text)
-        tagset = self.get('pos_tagger').tagset
-        words = list(tagged_sents)
-        for i in range(len(tagged_sents)):
-            words[i] = ['%s_%s'%(word,tag) for (word, tag) in tagged_sents[i]
-                        if not tagset.is_punctuation((word,tag))]
-        return words
-
+        encoded = self.get('encoded_text', text)
+        mask = encoded.words_mask
+        return encoded.per_sentence(
+            ['%s_%s' % token for token in encoded.tagged(mask)], mask)
 
     def _content_words_with_tags(self, text):
         """Return the content words of the text, separated in sentences, but with _tag.
         :text: @todo
         :returns: @todo
         """
-        tagged_sents = self.get('tagged_sentences', text)
-        content_words = list(tagged_sents)
-        for i in range(len(tagged_sents)):
-            content_words[i] = ['%s_%s'%(word,tag) for (word, tag) in tagged_sents[i]
-                                if pos_tagger.tagset.is_content_word(
-                                    (word, tag))]
-        return content_words
-
+        encoded = self.get('encoded_text', text)
+        mask = encoded.mask('content_word')
+        return encoded.per_sentence(
+            ['%s_%s' % token for token in encoded.tagged(mask)], mask)
 
     def _cw_freq(self, text):
         """Return the frequency of each content word in the text, separated
@@ -567,92 +691,34 @@ class DefaultResourcePool(ResourcePool):
     def _mattr(self, tokens, w=100):
         """Return the Moving Average Type-Token Ratio of a list of tokens.
 
-        :text: TODO
-        :returns: TODO
-
+        See utils.mattr; w may also be a sequence of window sizes.
         """
-
-        p = 0
-        n = len(tokens)
-        wft = dict()
-        ttr = []
-
-        if w > n:
-            w = n
-
-        for i in range(p, w):
-            if tokens[i] in wft:
-                wft[tokens[i]] += 1
-            else:
-                wft[tokens[i]] = 1
-        ttr.append(len(wft.keys()) / sum(wft.values()))
-
-        while n - w > p:
-            p += 1
-            if wft[tokens[p - 1]] == 1:
-                wft.pop(tokens[p - 1])
-            else:
-                wft[tokens[p - 1]] -= 1
-            if tokens[p + w - 1] in wft:
-                wft[tokens[p + w - 1]] += 1
-            else:
-                wft[tokens[p + w - 1]] = 1
-            ttr.append(len(wft.keys()) / sum(wft.values()))
-
-        return mean(ttr)
+        return mattr(tokens, w)
 
     def _mattr_relative(self, tokens, filtered, w=100):
         """Return the Moving Average Type-Token Ratio of a list of filtered
         tokens by a list of tokens.
 
-        :text: TODO
-        :returns: TODO
-
+        See utils.mattr_relative; w may also be a sequence of window sizes.
         """
+        return mattr_relative(tokens, filtered, w)
 
-        p = 0
-        n = len(tokens)
-        wft = dict()
-        ttr = []
-
-        if w > n:
-            w = n
-
-        for i in range(p, w):
-            if tokens[i] in filtered:
-                if tokens[i] in wft:
-                    wft[tokens[i]] += 1
-                else:
-                    wft[tokens[i]] = 1
-        ttr.append(sum(wft.values()) / w)
-
-        while n - w > p:
-            p += 1
-            if tokens[p - 1] in wft:
-                if wft[tokens[p - 1]] == 1:
-                    wft.pop(tokens[p - 1])
-                else:
-                    wft[tokens[p - 1]] -= 1
-
-            if tokens[p + w - 1] in filtered:
-                if tokens[p + w - 1] in wft:
-                    wft[tokens[p + w - 1]] += 1
-                else:
-                    wft[tokens[p + w - 1]] = 1
-            ttr.append(sum(wft.values()) / w)
-
-        return mean(ttr)
-
+    def _flat_parse_trees(self, text):
+        """Return the parse tree of each sentence in the text, as a
+            FlatTree.
+        """
+        tokens = self.get('tokens', text)
+        sentences = [' '.join(sent) for sent in tokens]
+        return self.get('parser').parse_sents_flat(sentences)
 
     def _parse_trees(self, text):
-        """Return the parse tree of each sentence in the text.
+        """Return the parse tree of each sentence in the text, as an
+            nltk.Tree built from its FlatTree.
 
         :text: TODO
         :returns: TODO
         """
-        tokens = self.get('tokens', text)
-        sentences = [' '.join(sent) for sent in tokens]
-        return parser.parse_sents(sentences)
+        return [tree.to_tree() for tree in self.get('flat_parse_trees', text)]
 
     def _dep_trees(self, text):
         """Return the dependency tree of each sentence in the text.
@@ -663,6 +729,14 @@ class DefaultResourcePool(ResourcePool):
         sents = self.get('tokens', text)
         return self.get('dep_parser').parse_sents(sents)
 
+    def _tree_stats(self, text):
+        """Return the TreeStats (Yngve and Frazier scores of the leaves,
+            top-level NPs) of the parse tree of each sentence in the text.
+        """
+        labels = self.get('parser').tagset.sentence_node_labels
+        return [TreeStats(tree, labels)
+                for tree in self.get('flat_parse_trees', text)]
+
     def _toplevel_nps_per_sentence(self, text):
         """
         Returns the NPs that are not contained in any other NP
@@ -672,19 +746,7 @@ class DefaultResourcePool(ResourcePool):
         
         :rtype: List[List[nltk.Tree]].
         """
-        def toplevel_nps(tree):
-            """
-            Generator over the NPs that are not contained in any
-            other NP in the parse tree.
-            """
-            if tree.label() == 'NP':
-                yield tree
-            else:
-                for child in tree:
-                    if isinstance(child, nltk.Tree):
-                        yield from toplevel_nps(child)
-        parse_trees = self.get('parse_trees', text)
-        return [list(toplevel_nps(tree)) for tree in parse_trees]
+        return [stats.nps for stats in self.get('tree_stats', text)]
 
     def _leaves_in_toplevel_nps(self, text):
         """
@@ -693,13 +755,7 @@ class DefaultResourcePool(ResourcePool):
 
         :rtype: List[List[List[str]]].
         """
-        def extract_leaves(toplevel):
-            """Given a toplevel NP, extract the leaves that are not punctuation"""
-            leaves = toplevel.subtrees(lambda t: t.label() != 'PNT' and t.height() == 2)
-            return [l[0] for l in leaves]
-        return [[extract_leaves(toplevel) for toplevel in toplevels_in_sentence]
-                for toplevels_in_sentence in self.get('toplevel_nps_per_sentence', text)]
-                
+        return [stats.np_leaves for stats in self.get('tree_stats', text)]
 
     def _lsa_space(self):
         """Return the default LSA space.
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Build the syllable-count lexicon from the brWaC frequency list.
+
+Usage:
+    python -m text_metrics.scripts.build_syllable_lexicon [OUTPUT]
+
+Reads config['FREQUENCIES_BRWAC'] (word, frequency, tag per line), counts
+the syllables of each distinct lowercased word with the CECI separator and
+writes one "word<TAB>count" line per word, sorted. OUTPUT defaults to
+config['SYLLABLE_LEXICON'].
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import codecs
+from sys import argv
+
+from text_metrics.conf import config
+from text_metrics.tools.syllable.ceci import CECISyllableSeparator
+
+
+def build_lexicon(vocabulary_path, output_path):
+    separator = CECISyllableSeparator()
+
+    words = set()
+    with codecs.open(vocabulary_path, encoding='utf-8') as f:
+        for line in f:
+            word = line.split('\t')[0].strip().lower()
+            if word and any(c.isalpha() for c in word):
+                words.add(word)
+
+    nwords = 0
+    with codecs.open(output_path, mode='w', encoding='utf-8') as out:
+        for word in sorted(words):
+            try:
+                count = len(separator.separate(word))
+            except Exception:
+                continue
+            out.write('%s\t%d\n' % (word, count))
+            nwords += 1
+
+    return nwords
+
+
+if __name__ == '__main__':
+    output_path = argv[1] if len(argv) > 1 else config['SYLLABLE_LEXICON']
+    nwords = build_lexicon(config['FREQUENCIES_BRWAC'], output_path)
+    print('wrote %s (%d words)' % (output_path, nwords))
@@ -21,11 +21,13 @@ from text_metrics.tools.tag import *
 from text_metrics.tools.parse import *
 from text_metrics.tools.dependency import *
 from text_metrics.tools.lsa import *
+from text_metrics.tools.parse import CachedParser, LxParser
+from text_metrics.tools.dependency import CachedDependencyParser, MaltParser
 
 pos_tagger = NLPNetTagger()
 univ_pos_tagger = OpenNLPUniversalTagger()
-parser = LxParser()
-dep_parser = MaltParser(tagger=univ_pos_tagger)
+parser = CachedParser(LxParser())
+dep_parser = CachedDependencyParser(MaltParser(tagger=univ_pos_tagger))
 
 from text_metrics.tools.tokenizers import senter, word_tokenize
 from text_metrics.tools.syllable import *
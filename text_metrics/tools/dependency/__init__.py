@@ -19,3 +19,6 @@ from __future__ import unicode_literals, print_function, division
 
 from text_metrics.tools.dependency.api import DependencyParser
 from text_metrics.tools.dependency.maltparser import MaltParser
+from text_metrics.tools.dependency.cache import CachedDependencyParser
+
+__all__ = ['DependencyParser', 'MaltParser', 'CachedDependencyParser']
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Sentence-level caching of dependency parses (see tools.parse.cache)."""
+
+from __future__ import unicode_literals, print_function, division
+
+from nltk.parse import DependencyGraph
+
+from text_metrics.tools.dependency.api import DependencyParser
+from text_metrics.tools.parse.cache import SentenceCache
+
+
+class CachedDependencyParser(DependencyParser):
+
+    """Parses through a SentenceCache, so that only sentences not parsed
+    before reach the underlying parser. Graphs are kept in CoNLL format."""
+
+    def __init__(self, parser, cache=None):
+        """Form a cached dependency parser.
+
+        :parser: the DependencyParser to be cached.
+        :cache: the SentenceCache to use. If None, one is formed from the
+            configuration. (default None)
+        """
+        self._parser = parser
+        self.tagger = getattr(parser, 'tagger', None)
+        self.cache = cache if cache is not None \
+            else SentenceCache('dep_parser')
+
+    def _compute(self, sents):
+        return [graph.to_conll(10) for graph in self._parser.parse_sents(sents)]
+
+    def parse_sents(self, sents):
+        sents = [list(sent) for sent in sents]
+        return [DependencyGraph(graph, top_relation_label='null')
+                for graph in self.cache.get_many(sents, self._compute)]
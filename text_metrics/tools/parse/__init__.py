@@ -18,4 +18,9 @@
 from __future__ import unicode_literals, print_function, division
 
 from text_metrics.tools.parse.api import Parser, TagSet
+from text_metrics.tools.parse.flat import FlatTree
+from text_metrics.tools.parse.cache import CachedParser, SentenceCache
 from text_metrics.tools.parse.lxparser import LxParser
+
+__all__ = ['Parser', 'TagSet', 'FlatTree', 'CachedParser', 'SentenceCache',
+           'LxParser']
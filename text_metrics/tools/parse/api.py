@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License along with
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from text_metrics.tools.parse.flat import FlatTree
+
 
 class Parser(object):
 
@@ -38,6 +40,24 @@ class Parser(object):
         """
         raise NotImplementedError()
 
+    def parse_sents_bracketed(self, sents):
+        """Parse a list of strings into trees in bracketed form.
+
+        :sents: a list of strings to parse.
+        :returns: a list of strings, one for each sentence in sents, that
+            Tree.fromstring and FlatTree.fromstring can read.
+        """
+        return [tree.pformat(margin=float('inf'))
+                for tree in self.parse_sents(sents)]
+
+    def parse_sents_flat(self, sents):
+        """Parse a list of strings into compact trees.
+
+        :sents: a list of strings to parse.
+        :returns: a list of FlatTree objects, one for each sentence in sents.
+        """
+        return [FlatTree.from_tree(tree) for tree in self.parse_sents(sents)]
+
 
 class TagSet(object):
 
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Sentence-level caching of parser outputs.
+
+The resource pool parses each text as a whole and keeps the trees only for
+that Text, but corpora repeat sentences across texts (reprinted news,
+templates, dialogue formulas, original/simplified pairs). The parser
+adapters here keep the serialized parse of every sentence in a bounded
+in-memory LRU cache, keyed by a content hash of the sentence, and
+optionally in a SQLite file shared by processes and runs; only the
+sentences found in neither go to the JVM.
+
+The cache is configured by config['PARSE_CACHE_SIZE'] (sentences kept in
+memory per parser, default 10000) and config['PARSE_CACHE'] or the
+NILC_PARSE_CACHE environment variable (path of the SQLite file, default
+none). The file must be removed when a parser model changes.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import sqlite3
+
+from nltk.tree import Tree
+
+from text_metrics.conf import config
+from text_metrics.profiling import profiler, timed_block
+from text_metrics.tools.parse.api import Parser
+from text_metrics.tools.parse.flat import FlatTree
+
+
+class SentenceCache(object):
+
+    """Serialized parser outputs, keyed by a content hash of the input."""
+
+    def __init__(self, tool, maxsize=None, path=None):
+        """Form a sentence cache.
+
+        Required arguments:
+        :tool: the tool name, used to name the table in the persistent store
+            and the cache events of the profiler.
+
+        Optional arguments:
+        :maxsize: the number of outputs kept in memory. If None, read from
+            config['PARSE_CACHE_SIZE']. (default None)
+        :path: the SQLite file where outputs are also kept. If None, read
+            from the NILC_PARSE_CACHE environment variable or
+            config['PARSE_CACHE']; if empty, there is no persistent store.
+            (default None)
+        """
+        if maxsize is None:
+            maxsize = config.get('PARSE_CACHE_SIZE', 10000)
+        if path is None:
+            path = os.environ.get('NILC_PARSE_CACHE') or \
+                config.get('PARSE_CACHE')
+        self.tool = tool
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._outputs = OrderedDict()
+        self._connection = None
+        self._pid = None
+
+    @staticmethod
+    def key(value):
+        """Content hash of a JSON-serializable value."""
+        data = json.dumps(value, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        # A connection cannot be shared with forked worker processes.
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS "%s" '
+                '(key TEXT PRIMARY KEY, output TEXT NOT NULL)' % self.tool)
+            self._pid = os.getpid()
+        return self._connection
+
+    def _load(self, keys):
+        """Return the outputs of the keys found in the persistent store."""
+        if not self.path or not keys:
+            return {}
+        connection = self._connect()
+        found = {}
+        with timed_block('parse_cache.load'):
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                found.update(connection.execute(
+                    'SELECT key, output FROM "%s" WHERE key IN (%s)'
+                    % (self.tool, ','.join('?' * len(chunk))), chunk))
+        return found
+
+    def _store(self, outputs):
+        """Write outputs (a dict of key -> output) to the persistent store."""
+        if not self.path or not outputs:
+            return
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO "%s" (key, output) VALUES (?, ?)'
+                % self.tool, outputs.items())
+
+    def _remember(self, key, output):
+        if self.maxsize <= 0:
+            return
+        self._outputs[key] = output
+        self._outputs.move_to_end(key)
+        if len(self._outputs) > self.maxsize:
+            self._outputs.popitem(last=False)
+
+    def get_many(self, inputs, compute):
+        """Return the outputs for a list of inputs.
+
+        :inputs: a list of JSON-serializable inputs.
+        :compute: a function that receives the distinct inputs found in no
+            cache and returns their outputs (strings), in order.
+        :returns: the list of outputs. If compute returns fewer outputs than
+            it was given inputs (MaltParser drops a trailing empty graph),
+            they cannot be matched to their inputs: nothing is cached and
+            the result is what compute returns for all the inputs.
+        """
+        keys = [self.key(value) for value in inputs]
+
+        outputs = {}
+        for key in keys:
+            if key in self._outputs:
+                self._outputs.move_to_end(key)
+                outputs[key] = self._outputs[key]
+        missing = [key for key in OrderedDict.fromkeys(keys)
+                   if key not in outputs]
+        stored = self._load(missing)
+        for key, output in stored.items():
+            outputs[key] = output
+            self._remember(key, output)
+
+        for key in keys:
+            hit = key in outputs
+            profiler.cache_event('parse_cache.' + self.tool, hit)
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        missing = [key for key in missing if key not in stored]
+        if missing:
+            by_key = dict(zip(keys, inputs))
+            computed = compute([by_key[key] for key in missing])
+            if len(computed) != len(missing):
+                if len(missing) == len(keys):
+                    return list(computed)
+                return list(compute(list(inputs)))
+            computed = dict(zip(missing, computed, strict=True))
+            self._store(computed)
+            for key, output in computed.items():
+                outputs[key] = output
+                self._remember(key, output)
+
+        return [outputs[key] for key in keys]
+
+    def cache_info(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._outputs), 'maxsize': self.maxsize}
+
+    def cache_clear(self):
+        """Empty the in-memory cache (the persistent store is kept)."""
+        self._outputs.clear()
+
+
+class CachedParser(Parser):
+
+    """Parses through a SentenceCache, so that only sentences not parsed
+    before reach the underlying parser. Trees are kept in bracketed form."""
+
+    def __init__(self, parser, cache=None):
+        """Form a cached parser.
+
+        :parser: the Parser to be cached.
+        :cache: the SentenceCache to use. If None, one is formed from the
+            configuration. (default None)
+        """
+        self._parser = parser
+        self.tagset = parser.tagset
+        self.cache = cache if cache is not None else SentenceCache('parser')
+
+    def parse_sents_bracketed(self, sents):
+        return self.cache.get_many(list(sents),
+                                   self._parser.parse_sents_bracketed)
+
+    def parse_sents(self, sents):
+        return [Tree.fromstring(tree)
+                for tree in self.parse_sents_bracketed(sents)]
+
+    def parse_sents_flat(self, sents):
+        return [FlatTree.fromstring(tree)
+                for tree in self.parse_sents_bracketed(sents)]
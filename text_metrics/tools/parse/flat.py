@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""A compact representation of parse trees.
+
+A FlatTree keeps the nodes of a tree (leaves included) in preorder, as a
+few int32 arrays: the parent of each node, the index of its label in the
+tree's label list (-1 for leaves) and the index after its subtree. It is
+read straight from the bracketed output of a parser, without building an
+nltk.Tree per node; to_tree() builds the nltk.Tree for code that needs it:
+
+    flat = FlatTree.fromstring('(ROOT (S (N Ele) (V dorme) (PNT .)))')
+    flat.leaves()     # ['Ele', 'dorme', '.']
+    flat.to_tree()    # Tree('ROOT', [Tree('S', [...])])
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import re
+
+from nltk.tree import Tree
+import numpy as np
+
+_token_re = re.compile(r'\(|\)|[^\s()]+')
+
+
+class FlatTree(object):
+    """A parse tree as flat arrays.
+
+    :labels: the distinct labels of the tree, in order of appearance.
+    :label_ids: for each node, the index of its label in labels, or -1 if
+        the node is a leaf.
+    :parent: for each node, the index of its parent, or -1 for the root.
+    :end: for each node, the index after the last node of its subtree.
+    :words: the leaves of the tree, in order.
+    :leaf_start: for each node, the number of leaves before it, followed by
+        len(words); the leaves of node i are words[leaf_start[i]:
+        leaf_start[end[i]]].
+    """
+
+    def __init__(self, labels, label_ids, parent, end, words):
+        self.labels = labels
+        self.label_ids = np.array(label_ids, dtype=np.int32)
+        self.parent = np.array(parent, dtype=np.int32)
+        self.end = np.array(end, dtype=np.int32)
+        self.words = words
+        self.leaf_start = np.concatenate(
+            ([0], np.cumsum(self.label_ids < 0))).astype(np.int32)
+
+    @classmethod
+    def fromstring(cls, s):
+        """Read a tree in bracketed form, as accepted by Tree.fromstring
+        (e.g., '(S (NP (N Ele)) (VP (V dorme)))').
+
+        Raises ValueError if the brackets are not balanced or the string
+        holds other than one tree.
+        """
+        labels = {}
+        label_ids = []
+        parent = []
+        end = []
+        words = []
+        stack = []
+        open_node = False   # whether the last token was an opening bracket
+        closed = False      # whether the root has been closed
+
+        for token in _token_re.findall(s):
+            if open_node:
+                open_node = False
+                if token != '(' and token != ')':
+                    label_ids[-1] = labels.setdefault(token, len(labels))
+                    continue
+                label_ids[-1] = labels.setdefault('', len(labels))
+
+            if token == '(':
+                if closed:
+                    raise ValueError('more than one tree in %r' % s)
+                parent.append(stack[-1] if stack else -1)
+                label_ids.append(-1)
+                end.append(0)
+                stack.append(len(parent) - 1)
+                open_node = True
+            elif token == ')':
+                if not stack:
+                    raise ValueError('unbalanced brackets in %r' % s)
+                end[stack.pop()] = len(parent)
+                closed = not stack
+            else:
+                if not stack:
+                    raise ValueError('leaf outside of a node in %r' % s)
+                parent.append(stack[-1])
+                label_ids.append(-1)
+                end.append(len(parent))
+                words.append(token)
+
+        if stack or not closed:
+            raise ValueError('unbalanced brackets in %r' % s)
+        return cls(list(labels), label_ids, parent, end, words)
+
+    @classmethod
+    def from_tree(cls, tree):
+        """Flatten an nltk.Tree."""
+        labels = {}
+        label_ids = []
+        parent = []
+        end = []
+        words = []
+        # Each entry is (node, index of its parent); a None node marks the
+        # end of the subtree of the node at the given index.
+        stack = [(tree, -1)]
+        while stack:
+            node, index = stack.pop()
+            if node is None:
+                end[index] = len(parent)
+                continue
+            parent.append(index)
+            if isinstance(node, Tree):
+                label_ids.append(labels.setdefault(node.label(), len(labels)))
+                end.append(0)
+                index = len(parent) - 1
+                stack.append((None, index))
+                stack.extend((child, index) for child in reversed(node))
+            else:
+                label_ids.append(-1)
+                end.append(len(parent))
+                words.append(node)
+        return cls(list(labels), label_ids, parent, end, words)
+
+    def __len__(self):
+        return len(self.parent)
+
+    def label(self, node=0):
+        """Return the label of a node, or None if it is a leaf."""
+        label_id = self.label_ids[node]
+        return self.labels[label_id] if label_id >= 0 else None
+
+    def leaves(self, node=0):
+        """Return the leaves of (the subtree of) a node."""
+        return self.words[self.leaf_start[node]:
+                          self.leaf_start[self.end[node]]]
+
+    def to_tree(self, node=0):
+        """Return (the subtree of) a node as an nltk.Tree (or a string, if
+        the node is a leaf)."""
+        stop = int(self.end[node])
+        labels, words = self.labels, self.words
+        label_ids = self.label_ids[node:stop].tolist()
+        parent = self.parent[node:stop].tolist()
+        leaf = int(self.leaf_start[node])
+
+        subtrees = {}
+        for i, (label_id, parent_index) in enumerate(zip(label_ids, parent),
+                                                     node):
+            if label_id < 0:
+                item = words[leaf]
+                leaf += 1
+            else:
+                item = subtrees[i] = Tree(labels[label_id], [])
+            if i != node:
+                subtrees[parent_index].append(item)
+        return subtrees[node] if node in subtrees else words[leaf - 1]
@@ -17,6 +17,7 @@
 
 from text_metrics.conf import config
 from text_metrics.tools.parse.api import Parser, TagSet
+from text_metrics.tools.parse.flat import FlatTree
 from nltk.tree import Tree
 import subprocess
 from text_metrics.profiling import timed_block
@@ -80,13 +81,33 @@ class LxParser(Parser):
         :returns: a list of nltk.tree.Tree objects, one for each tree generated
             by LXParser.
         """
+        return [Tree.fromstring(line)
+                for line in self.parse_sents_bracketed(sents)]
+
+    def parse_sents_flat(self, sents):
+        """Parse a list of strings into compact trees.
+
+        :sents: a list of strings to parse.
+        :returns: a list of FlatTree objects, one for each tree generated by
+            LXParser, read straight from its output.
+        """
+        return [FlatTree.fromstring(line)
+                for line in self.parse_sents_bracketed(sents)]
+
+    def parse_sents_bracketed(self, sents):
+        """Parse a list of strings into trees in bracketed form.
+
+        :sents: a list of strings to parse.
+        :returns: a list of strings, one for each tree generated by LXParser,
+            as output by it.
+        """
         fdesc, input_file_path = tempfile.mkstemp(text=True)
         os.close(fdesc)
 
         with codecs.open(input_file_path, mode='w', encoding='utf-8') as infile:
             infile.write('\n'.join(sents))
 
-        return_value = self.run(input_file_path)
+        return_value = self.run_lines(input_file_path)
         os.remove(input_file_path)
 
         return return_value
@@ -98,16 +119,22 @@ class LxParser(Parser):
         :returns: a list of nltk.tree.Tree objects, one for each tree generated
             by LXParser.
         """
+        return [Tree.fromstring(line) for line in self.run_lines(filename)]
+
+    def run_lines(self, filename):
+        """Runs the parser for a file.
+
+        :filename: the file containing the sentences to be analyzed.
+        :returns: a list of strings, one for each tree generated by LXParser,
+            in bracketed form.
+        """
 
         with timed_block("jvm.stanford"):
             p = subprocess.Popen(self._cmd(filename),
                                  stdout=subprocess.PIPE,
                                  stderr=subprocess.STDOUT)
             raw_lines = p.communicate()[0].decode('utf-8').split('\n')
-        tree_lines = [line for line in raw_lines if line.startswith('(')]
-        trees = [Tree.fromstring(line) for line in tree_lines]
-
-        return trees
+        return [line for line in raw_lines if line.startswith('(')]
 
 
 class LxTagSet(TagSet):
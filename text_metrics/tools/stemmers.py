@@ -16,37 +16,136 @@
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import unicode_literals, print_function, division
+import os
+import sys
+
 import text_metrics.resource_pool
+from text_metrics.conf import config
+from text_metrics.profiling import profiler, timed_block
+
+
+def _normalize_pos(pos):
+    return "A" if pos == "ADJ" else pos
+
+
+def _pick_lemma(entries, pos):
+    """Return the lemma of the entry with the given PoS, or of the first
+    entry if none has it (or pos is None)."""
+    for entry_pos, lemma in entries:
+        if entry_pos == pos:
+            return lemma
+    return entries[0][1] if entries else None
+
+
+class Lemmas(object):
+
+    """The lemmas of a set of words, looked up in advance.
+
+    Returned by DelafStemmer.lemmas (and the resource pool's 'lemmas'
+    resource); get(word, pos) answers from memory and never queries the
+    database.
+    """
+
+    def __init__(self, entries):
+        self._entries = entries
+
+    def get(self, word, pos=None):
+        """Return the lemma of a word, or None if it is not in DELAF. A word
+        that was not looked up in advance is returned as is.
+
+        :word: the word (any case).
+        :pos: the PoS tag; if no entry has it, the first entry of the word is
+            used.
+        """
+        entries = self._entries.get(word.lower())
+        if entries is None:
+            return word
+        return _pick_lemma(entries, _normalize_pos(pos))
 
 
 class DelafStemmer(object):
 
     """Stemmer backed by the `delaf_words` Postgres table.
 
-    Lemmas are deterministic given (word, pos), so results are memoized in a
-    process-wide dict to avoid redundant DB queries — every guten.py metric
-    re-stems the same content-word list, which on natural text drives many
-    tens of thousands of repeated lookups for the same handful of types.
+    The DELAF entries ((pos, lemma) pairs) of each word are kept in a
+    process-wide dict once fetched, so any (word, pos) is then answered
+    without a query. lemmas(words) fetches the entries of all the words it is
+    given in a single query; with prewarm, the first lookup loads the whole
+    table instead and no query is made afterwards.
     """
 
-    def __init__(self):
-        self._cache = {}
+    def __init__(self, helper=None, prewarm=None):
+        """Form a DelafStemmer.
 
-    def get_lemma(self, word, pos=None):
-        if pos == "ADJ":
-            pos = "A"
+        :helper: a function returning the database Helper to be queried. If
+            None, the Helper of the default resource pool is used.
+        :prewarm: load the whole table on the first lookup. If None, read
+            from the NILC_DELAF_PREWARM environment variable or
+            config['DELAF_PREWARM']. (default None)
+        """
+        if prewarm is None:
+            prewarm = os.environ.get('NILC_DELAF_PREWARM', '').lower() \
+                not in ('', '0', 'false', 'no') or \
+                bool(config.get('DELAF_PREWARM'))
+        self._entries = {}
+        self._complete = False
+        self._prewarm = prewarm
+        self._helper = helper
 
-        word = word.lower()
-        key = (word, pos)
+    def _get_helper(self):
+        if self._helper is not None:
+            return self._helper()
+        return text_metrics.resource_pool.rp.db_helper()
+
+    def prewarm(self):
+        """Load every entry of the table into memory."""
+        if self._complete:
+            return
+        with timed_block("stemmer.delaf_prewarm"):
+            entries = {}
+            for word, pos, lemma in self._get_helper().get_all_delaf_words():
+                entries.setdefault(sys.intern(word), []).append(
+                    (sys.intern(pos), sys.intern(lemma)))
+            self._entries = dict((word, tuple(pairs))
+                                 for word, pairs in entries.items())
+        self._complete = True
 
-        if key in self._cache:
-            return self._cache[key]
+    def _load(self, words):
+        """Make sure the entries of the (lowercase) words are in memory,
+        fetching the missing ones in one query."""
+        if self._prewarm and not self._complete:
+            self.prewarm()
+        missing = set()
+        for word in words:
+            hit = self._complete or word in self._entries
+            profiler.cache_event("stemmer.delaf", hit)
+            if not hit:
+                missing.add(word)
+        if not missing:
+            return
 
-        helper = text_metrics.resource_pool.rp.db_helper()
-        delaf_word = helper.get_delaf_word(word, pos)
-        if delaf_word is None:
-            delaf_word = helper.get_delaf_word(word)
+        found = {}
+        for row in self._get_helper().get_delaf_words(sorted(missing)):
+            found.setdefault(row.word, []).append((row.pos, row.lemma))
+        for word in missing:
+            self._entries[word] = tuple(found.get(word, ()))
 
-        lemma = delaf_word.lemma if delaf_word is not None else None
-        self._cache[key] = lemma
-        return lemma
+    def lemmas(self, words):
+        """Look up the lemmas of several words at once.
+
+        :words: the words (any case).
+        :returns: a Lemmas object answering get(word, pos) for these words.
+        """
+        words = set(word.lower() for word in words)
+        self._load(words)
+        return Lemmas(dict((word, self._entries.get(word, ()))
+                           for word in words))
+
+    def get_lemma(self, word, pos=None):
+        """Return the lemma of a word, or None if it is not in DELAF.
+
+        Prefer lemmas() (or the 'lemmas' resource) for more than one word.
+        """
+        word = word.lower()
+        self._load([word])
+        return _pick_lemma(self._entries.get(word, ()), _normalize_pos(pos))
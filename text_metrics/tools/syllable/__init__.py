@@ -19,5 +19,13 @@ from __future__ import unicode_literals, print_function, division
 
 from text_metrics.tools.syllable.silva2011 import Silva2011SyllableSeparator
 from text_metrics.tools.syllable.ceci import CECISyllableSeparator
+from text_metrics.tools.syllable.cache import CachedSyllableSeparator,\
+    SyllableLexicon
+from text_metrics.conf import config
 
-syllable_separator = CECISyllableSeparator()
+syllable_separator = CachedSyllableSeparator(
+    CECISyllableSeparator(),
+    lexicon_path=config.get('SYLLABLE_LEXICON'))
+
+__all__ = ['Silva2011SyllableSeparator', 'CECISyllableSeparator',
+           'CachedSyllableSeparator', 'SyllableLexicon', 'syllable_separator']
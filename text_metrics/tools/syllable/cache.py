@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Coh-Metrix-Dementia - Automatic text analysis and classification for dementia.
+# Copyright (C) 2014  Andre Luiz Verucci da Cunha
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+
+import codecs
+import logging
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from os.path import isfile
+
+from .api import SyllableSeparator
+
+logger = logging.getLogger(__name__)
+
+
+class SyllableLexicon(object):
+
+    """Precomputed syllable counts, keyed by lowercased word.
+
+    The lexicon file has one "word<TAB>count" pair per line (see
+    text_metrics/scripts/build_syllable_lexicon.py). Words are kept in a
+    sorted tuple and counts in a parallel byte array, which is a fraction of
+    the size of a dict over the full brWaC vocabulary.
+    """
+
+    def __init__(self, words, counts):
+        self._words = words
+        self._counts = counts
+
+    @classmethod
+    def load(cls, path, encoding='utf-8'):
+        pairs = []
+        with codecs.open(path, encoding=encoding) as f:
+            for line in f:
+                word, _, count = line.rstrip('\n').partition('\t')
+                if word and count:
+                    pairs.append((word, int(count)))
+        pairs.sort()
+        words = tuple(word for word, _ in pairs)
+        counts = array('B', (min(count, 255) for _, count in pairs))
+        return cls(words, counts)
+
+    def get(self, word, default=None):
+        i = bisect_left(self._words, word)
+        if i < len(self._words) and self._words[i] == word:
+            return self._counts[i]
+        return default
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __len__(self):
+        return len(self._words)
+
+
+class CachedSyllableSeparator(SyllableSeparator):
+
+    """Memoizes another separator behind a bounded LRU cache.
+
+    Syllabification is deterministic per word, and the readability metrics
+    (Flesch, Gunning Fog, syllables per content word) split the same frequent
+    words over and over, so the underlying state machine only runs once per
+    distinct word while it stays in the cache. When a syllable lexicon is
+    available, `count` answers from it before touching the separator.
+    """
+
+    def __init__(self, separator, maxsize=65536, lexicon_path=None):
+        self._separator = separator
+        self._lexicon_path = lexicon_path
+        self._lexicon = None
+        self._separate = lru_cache(maxsize=maxsize)(self._separate_uncached)
+        self._count = lru_cache(maxsize=maxsize)(self._count_uncached)
+
+    def _separate_uncached(self, word):
+        return tuple(self._separator.separate(word))
+
+    def _count_uncached(self, word):
+        lexicon = self.lexicon
+        if lexicon is not None:
+            count = lexicon.get(word.lower())
+            if count is not None:
+                return count
+        return len(self._separate(word))
+
+    @property
+    def lexicon(self):
+        """The syllable lexicon, loaded on first use, or None if unavailable."""
+        if self._lexicon is None and self._lexicon_path:
+            if isfile(self._lexicon_path):
+                self._lexicon = SyllableLexicon.load(self._lexicon_path)
+            else:
+                logger.info('Syllable lexicon %s not found; using the '
+                            'separator only.', self._lexicon_path)
+            self._lexicon_path = None
+        return self._lexicon
+
+    def separate(self, word):
+        return list(self._separate(word))
+
+    def count(self, word):
+        """Return the number of syllables of a word."""
+        return self._count(word)
+
+    def cache_info(self):
+        return self._separate.cache_info()
+
+    def cache_clear(self):
+        self._separate.cache_clear()
+        self._count.cache_clear()
@@ -18,6 +18,8 @@
 from __future__ import unicode_literals, print_function, division
 from functools import partial
 
+import numpy as np
+
 
 class Tagger(object):
     """Represents an interface for classes that perform part-of-speech tagging.
@@ -100,22 +102,69 @@ class TagSet(object):
             'functions_as_foo_tags', __init__ will generate a method called
             'functions_as_foo(tag)'; otherwise, if it's of the form 'foo_tags',
             it will generate a method called 'is_foo(tag)'.
+
+            Each list is compiled into a frozenset, and each class ('foo' or
+            'functions_as_foo') is given a bit in the integer returned by
+            tag_bits(tag), so that one AND tells whether a tag belongs to any
+            of several classes.
         """
         n = len('_tags')
 
         def is_in(lst, token):
             return token[1] in lst
 
+        self.classes = []
+        self._tag_bits = {}
         for attr in dir(self):
             if attr.endswith('_tags'):
                 if attr.startswith('functions_as'):
                     attr_name = attr[:-n]
+                    class_name = attr_name
                 else:
                     attr_name = 'is_' + attr[:-n]
+                    class_name = attr[:-n]
+
+                tags = frozenset(getattr(self, attr))
+
+                setattr(self, attr_name, partial(is_in, tags))
+
+                bit = 1 << len(self.classes)
+                self.classes.append(class_name)
+                for tag in tags:
+                    self._tag_bits[tag] = self._tag_bits.get(tag, 0) | bit
+
+    def bits(self, *classes):
+        """Return the bitmask of one or more classes.
 
-                lst = getattr(self, attr)
+        :classes: class names, such as 'noun', 'content_word' or
+            'functions_as_noun'.
+        :returns: an int with the bit of each class set.
+        """
+        mask = 0
+        for name in classes:
+            mask |= 1 << self.classes.index(name)
+        return mask
+
+    def tag_bits(self, tag):
+        """Return the bitmask of the classes a tag belongs to.
+
+        :tag: the tag.
+        :returns: an int; tag_bits(tag) & bits('noun') is nonzero if the tag
+            is a noun tag.
+        """
+        return self._tag_bits.get(tag, 0)
+
+    def classify(self, tags):
+        """Tell which classes each tag of a sequence belongs to.
 
-                setattr(self, attr_name, partial(is_in, lst))
+        :tags: a sequence of tags, e.g. the tags of a sentence.
+        :returns: a dict from each class name to a boolean numpy array with
+            one element per tag.
+        """
+        codes = np.array([self._tag_bits.get(tag, 0) for tag in tags],
+                         dtype=np.int64)
+        return dict((name, (codes & (1 << i)) != 0)
+                    for i, name in enumerate(self.classes))
 
     def get_coarse_tag(self, tag):
         """Get the coarse tag corresponding to a fine tag.
@@ -43,7 +43,7 @@ adverbs = [
 ]
 
 demostratives = [
-    'em(\s(o|a)(s)?)?', 'de', 'na(s)?', 'no(s)?', 'este(s)?', 'esta(s)?',
+    r'em(\s(o|a)(s)?)?', 'de', 'na(s)?', 'no(s)?', 'este(s)?', 'esta(s)?',
     'esse(s)?', 'essa(s)?', 'nesse(s)?', 'nessa(s)?', 'neste(s)?',
     'nesta(s)?', 'desse(s)?', 'dessa(s)?', 'deste(s)?', 'desta(s)?',
     'aquele(s)?', 'aquela(s)?', 'naquele(s)?', 'naquela(s)?', 'daquele(s)?',
@@ -70,7 +70,7 @@ frequency_exp = [
     'reiteradamente', 'rotineiramente', 'usualmente', 'ocasionalmente',
     'freq(u|ü)entemente', 'amiúde', 'todos os dias', 'todas as noites',
     'com freq(u|ü)ência', 'todas as manhãs', 'todas as tardes',
-    '(várias|muitas|algumas|às|por)\svezes'
+    r'(várias|muitas|algumas|às|por)\svezes'
 ]
 
 N = '|'.join(numbers)
@@ -86,6 +86,36 @@ FE = '|'.join(frequency_exp)
 S = 'á|é|í|ó|ú|ã|õ|â|ê|ô|à|ü'
 
 
+# Each rule is (category, compiled pattern, strip the match, rejected
+# prefixes). The patterns are compiled once, here, instead of on every call.
+# They are kept as separate passes: finditer reports non-overlapping matches
+# per pattern, and merging them into one alternation would drop matches that
+# overlap a match of another rule.
+RULES = tuple((category, re.compile(pattern), strip, reject)
+              for category, pattern, strip, reject in [
+    ('ABSOLUTO', r'(^|\s)(de|em|até|desde|para)\s\d{4}', False, ()),
+    ('ABSOLUTO', r'(^|\s)(em|até|desde)?(\s\d{1,2}\s(de))?\s(' + M + r')\s(de)\s\d{4}', True, ()),
+    ('DURACAO', r'(^|\s)((cerca|mais|menos)\s)?((de|há|durante|em|por)\s)?((((' + C + r')\se\s)?(' + N + r'))|(\d+))\s(' + T + r')(s|es)?(\se\s((((' + C + r')\se\s)?(' + N + r'))|(\d+))\s(' + T + r')(s|es))?', False, ()),
+    ('DURACAO', r'(^|\s)(' + DE + ')', False, ()),
+    ('ENUNCIADO', r'(^|\s)((' + D + r')(s)?(-feira(s)?)|sábado(s)?|domingo(s)?)', False, ()),
+    ('ENUNCIADO', r'(^|\s)(na\s(' + AT + r')\s)?(' + PP + r')\s(' + D + r')(s)?(-feira(s)?)?(\,?\s?\(?\d+\)?)?', False, ()),
+    ('ENUNCIADO', r'(^|\s)((até(\sa)?|(a\spartir\s)?de)\s)?(' + AT + ')', False, ()),
+    # TODO "\w" da seguinte exressão não identifica "próximo"
+    ('ENUNCIADO', r'(^|\s)(' + PP + r')\s((\w|' + S + r')+\s)?((' + T + r')|(' + AT + r'))(s|es)?', False, ()),
+    ('ENUNCIADO', r'(^|\s)(no\sdia|até|em|(a\spartir\s)?de|desde|(' + PP + r'))(\s\d{1,2}\s(de))?\s(' + M + r')(\s(de)\s\d{4})?', False, ('rio ',)),
+    ('HORA', r'(^|\s)(desde\sas|por\svolta\sdas|até|até\sàs|às|aos)\s((\d{1,2}(h|\shoras)(\d{1,2}(m(in)?)?)?)|(\d{1,2}(m(in)?|\sminutos)))', False, ()),
+    ('HORA', r'\s\d{1,2}:\d{1,2}(\s(AM|PM))?', True, ()),
+    ('INTERVALO', r'(^|\s)(de|entre|desde)\s(' + M + r')\s(a|e|até)\s(' + M + r')(\sde\s\d{4})?', False, ()),
+    ('INTERVALO', r'(^|\s)(de|entre|entre\sos\sdias|desde)\s(\d{1,2})\s(a|e|até)\s(\d{1,2})(\sde\s(' + M + '))', False, ()),
+    ('INTERVALO', r'(^|\s)(entre)\s(as)\s(\d{1,2}(h(\d{1,2}(m)?)?)?)\s(e)\s(as)\s(\d{1,2}(h(\d{1,2}(m)?)?)?)', False, ()),
+    ('INTERVALO', r'(^|\s)(entre\s)?\d{4}(-|\s(a|e)\s)\d{4}', False, ()),
+    ('REFERENCIAL', r'(^|\s)\d{1,2}(/|\.)\d{1,2}(/|\.)(\d{4}|\d{1,2})', False, ()),
+    ('REFERENCIAL', r'(^|\s)\d{4}-\d{1,2}-\d{1,2}', False, ()),
+    ('REFERENCIAL', r'(^|\s)(' + RE + ')', False, ()),
+    ('FREQUENCIA', r'(^|\s)(' + FE + ')', False, ()),
+])
+
+
 def filterTemporalExpressions(TEs):
     """
     Delete all the temporal expressions (TEs) that are included within
@@ -96,21 +126,18 @@ def filterTemporalExpressions(TEs):
 
     return: [('em 28 de fevereiro de 2002', 0, 26)]
 
+    Longer expressions are visited first, so an expression only has to be
+    checked against the ones already kept; those are joined in a single
+    string and searched in one go. Of several identical expressions, the
+    first one in the text is kept.
     """
-    i = 0
-    while i != len(TEs):
-        j = i + 1
-        while j != len(TEs):
-            a, b = TEs[i][0], TEs[j][0]
-            if a in b:
-                del TEs[i]
-                j -= 1
-            elif b in a:
-                del TEs[j]
-                j -= 1
-            j += 1
-        i += 1
-    return TEs
+    kept = []
+    joined = ''
+    for te in sorted(TEs, key=lambda tup: (-len(tup[0]), tup[1], tup[2])):
+        if te[0] not in joined:
+            kept.append(te)
+            joined += te[0] + '\x00'
+    return kept
 
 
 def removeWhiteSpaces(TEs):
@@ -145,37 +172,16 @@ def getTemporalExpressions(s):
 
     """
     s = s.lower()
-    # "ABSOLUTO" category
-    r1 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(de|em|até|desde|para)\s\d{4}', s)]
-    r2 = [(s[i.start():i.end()].strip(), i.start(), i.end()) for i in re.finditer('(^|\s)(em|até|desde)?(\s\d{1,2}\s(de))?\s(' + M + ')\s(de)\s\d{4}', s)]
-    # "DURACAO" category
-    r3 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)((cerca|mais|menos)\s)?((de|há|durante|em|por)\s)?((((' + C + ')\se\s)?(' + N + '))|(\d+))\s(' + T + ')(s|es)?(\se\s((((' + C + ')\se\s)?(' + N + '))|(\d+))\s(' + T + ')(s|es))?', s)]
-    r4 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(' + DE + ')', s)]
-    # "ENUNCIADO" category
-    r5 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)((' + D + ')(s)?(-feira(s)?)|sábado(s)?|domingo(s)?)', s)]
-    r6 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(na\s(' + AT + ')\s)?(' + PP + ')\s(' + D + ')(s)?(-feira(s)?)?(\,?\s?\(?\d+\)?)?', s)]
-    r7 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)((até(\sa)?|(a\spartir\s)?de)\s)?(' + AT + ')', s)]
-    # TODO "\w" da seguinte exressão não identifica "próximo"
-    r8 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(' + PP + ')\s((\w|' + S + ')+\s)?((' + T + ')|(' + AT + '))(s|es)?', s)]
-    r9 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(no\sdia|até|em|(a\spartir\s)?de|desde|('+ PP +'))(\s\d{1,2}\s(de))?\s(' + M + ')(\s(de)\s\d{4})?', s) if s[i.start() - 4:i.start()] not in ['rio ']]
-    # "HORA" category
-    r10 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(desde\sas|por\svolta\sdas|até|até\sàs|às|aos)\s((\d{1,2}(h|\shoras)(\d{1,2}(m(in)?)?)?)|(\d{1,2}(m(in)?|\sminutos)))', s)]
-    r11 = [(s[i.start():i.end()].strip(), i.start(), i.end()) for i in re.finditer('\s\d{1,2}:\d{1,2}(\s(AM|PM))?', s)]
-    # "INTERVALO" category
-    r12 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(de|entre|desde)\s(' + M + ')\s(a|e|até)\s(' + M + ')(\sde\s\d{4})?', s)]
-    r13 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(de|entre|entre\sos\sdias|desde)\s(\d{1,2})\s(a|e|até)\s(\d{1,2})(\sde\s(' + M + '))', s)]
-    r14 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(entre)\s(as)\s(\d{1,2}(h(\d{1,2}(m)?)?)?)\s(e)\s(as)\s(\d{1,2}(h(\d{1,2}(m)?)?)?)', s)]
-    r15 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(entre\s)?\d{4}(-|\s(a|e)\s)\d{4}', s)]
-    # "REFERENCIAL" category
-    r16 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)\d{1,2}(/|\.)\d{1,2}(/|\.)(\d{4}|\d{1,2})', s)]
-    r17 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)\d{4}-\d{1,2}-\d{1,2}', s)]
-    r18 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(' + RE + ')', s)]
-    # "FREQUENCIA" category
-    r19 = [(s[i.start():i.end()], i.start(), i.end()) for i in re.finditer('(^|\s)(' + FE + ')', s)]
-    # All temporal expressions (TEs)
-    TEs = list(set(r1 + r2 + r3 + r4 + r5 + r6 + r7 + r8 + r9 + r10 + r11 + r12 + r13 + r14 + r15 + r16 + r17 + r18 + r19))
+    TEs = set()
+    for _, pattern, strip, reject in RULES:
+        for i in pattern.finditer(s):
+            start, end = i.span()
+            if reject and s[start - 4:start] in reject:
+                continue
+            te = s[start:end]
+            TEs.add((te.strip() if strip else te, start, end))
     # Filter temporal expressions
-    TEs = filterTemporalExpressions(TEs)
+    TEs = filterTemporalExpressions(list(TEs))
     # Remove whitespaces
     TEs = removeWhiteSpaces(TEs)
-    return sorted(TEs, key=lambda tup: tup[1])
+    return sorted(TEs, key=lambda tup: (tup[1], tup[2]))
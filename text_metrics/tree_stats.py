@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""Per-leaf and per-NP statistics of a parse tree, from a single traversal.
+
+The syntax metrics used to walk each parse tree several times: Yngve
+reversed it in place and looked up every leaf position, Frazier climbed
+from every leaf to the root, and the noun-phrase resources searched it
+again for the top-level NPs. TreeStats visits every node of a tree once,
+top-down, carrying what each of those scores needs from the ancestors of a
+node:
+
+* the Yngve depth of a node is the depth of its parent plus the number of
+  siblings to its right;
+* the Frazier score of a leaf is the weight of the chain of leftmost
+  children ending at its preterminal (1.5 for each link whose parent is a
+  clause node, 1 otherwise), which is reset to 0 by any child that is not
+  the leftmost one;
+* a node labelled NP with no NP ancestor starts a top-level NP, and the
+  words of its non-punctuation preterminals make up the NP.
+
+The statistics are computed on the FlatTree of the parse (nltk.Tree objects
+are flattened first), whose nodes are already in preorder. The resource
+pool builds one TreeStats per sentence ('tree_stats'):
+
+    frazier = [stats.frazier_index() for stats in rp.tree_stats(t)]
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+from nltk.tree import Tree
+import numpy as np
+
+from text_metrics.tools.parse.flat import FlatTree
+
+
+class TreeStats(object):
+    """Statistics of a parse tree.
+
+    :tree: the FlatTree of the parse.
+    :yngve: for each leaf, the sum of the positions, counted from the right,
+        of the nodes in its path from the root.
+    :frazier: for each leaf below the Frazier root (the child of a 'ROOT'
+        node, or the root itself), its Frazier score.
+    :np_nodes: the nodes of the top-level NPs (the NPs not contained in any
+        other NP) in the FlatTree.
+    :np_words: the first word of each non-punctuation preterminal of the
+        top-level NPs, in order.
+    :np_offsets: where the words of each top-level NP start in np_words,
+        followed by len(np_words).
+    """
+
+    def __init__(self, tree, sentence_labels=('S',), np_label='NP',
+                 punctuation_label='PNT'):
+        """Compute the statistics of a tree.
+
+        :tree: a FlatTree or an nltk.Tree.
+        :sentence_labels: the labels of clause nodes (see
+            tools.parse.api.TagSet.sentence_node_labels).
+        :np_label: the label of noun phrases.
+        :punctuation_label: the label of punctuation preterminals, whose
+            words are not counted in the NPs.
+        """
+        if isinstance(tree, Tree):
+            tree = FlatTree.from_tree(tree)
+        labels = tree.labels
+        label_ids = tree.label_ids.tolist()
+        parent = tree.parent.tolist()
+        leaf_start = tree.leaf_start.tolist()
+        words = tree.words
+        size = len(parent)
+
+        nodes = tree.label_ids >= 0
+        children = np.bincount(tree.parent[1:], minlength=size).tolist()
+        subnodes = np.bincount(tree.parent[1:][nodes[1:]],
+                               minlength=size).tolist()
+        sentence_labels = frozenset(sentence_labels)
+        weights = [1.5 if label in sentence_labels else 1 for label in labels]
+        np_id = labels.index(np_label) if np_label in labels else -2
+        punctuation_id = labels.index(punctuation_label) \
+            if punctuation_label in labels else -2
+
+        yngve = []
+        frazier = []
+        np_nodes = []
+        np_words = []
+        np_offsets = []
+
+        # For each node: its Yngve depth, the Frazier chain ending at it,
+        # whether it is below the Frazier root, the index of its top-level
+        # NP (or -1) and how many of its children have been seen. The nodes
+        # come in preorder, so the parent of a node is always done before it.
+        depth = [0] * size
+        chain = [0] * size
+        counted = [True] * size
+        np_index = [-1] * size
+        seen = [0] * size
+
+        split_root = labels[label_ids[0]] == 'ROOT' and size > 1 \
+            and label_ids[1] >= 0
+        counted[0] = not split_root
+        for i, label_id in enumerate(label_ids):
+            p = parent[i]
+            if p >= 0:
+                position = seen[p]
+                seen[p] = position + 1
+                depth[i] = depth[p] + children[p] - 1 - position
+                if label_id < 0:
+                    yngve.append(depth[i])
+                    if counted[p]:
+                        frazier.append(chain[p])
+                    continue
+
+                if p == 0 and split_root:
+                    counted[i] = position == 0
+                else:
+                    counted[i] = counted[p]
+                    if position == 0:
+                        chain[i] = chain[p] + weights[label_ids[p]]
+                np_index[i] = np_index[p]
+
+            if np_index[i] < 0 and label_id == np_id:
+                np_index[i] = len(np_nodes)
+                np_nodes.append(i)
+                np_offsets.append(len(np_words))
+            if np_index[i] >= 0 and label_id != punctuation_id \
+                    and children[i] and not subnodes[i]:
+                np_words.append(words[leaf_start[i]])
+
+        np_offsets.append(len(np_words))
+
+        self.tree = tree
+        self.yngve = np.array(yngve, dtype=np.int32)
+        self.frazier = np.array(frazier, dtype=np.float64)
+        self.np_nodes = np.array(np_nodes, dtype=np.int32)
+        self.np_words = np_words
+        self.np_offsets = np.array(np_offsets, dtype=np.int32)
+
+    @property
+    def nps(self):
+        """The top-level NPs, as nltk.Tree objects."""
+        return [self.tree.to_tree(node) for node in self.np_nodes.tolist()]
+
+    @property
+    def np_sizes(self):
+        """The number of words of each top-level NP."""
+        return np.diff(self.np_offsets)
+
+    @property
+    def np_leaves(self):
+        """The words of each top-level NP, as a list of lists."""
+        bounds = self.np_offsets.tolist()
+        return [self.np_words[start:end]
+                for start, end in zip(bounds, bounds[1:], strict=False)]
+
+    def yngve_index(self):
+        """Return the mean Yngve depth of the leaves.
+
+        Raises ZeroDivisionError if the tree has no leaves.
+        """
+        return int(self.yngve.sum()) / len(self.yngve)
+
+    def frazier_index(self):
+        """Return the largest sum of the Frazier scores of three consecutive
+        leaves (or the sum of all scores, if there are less than three)."""
+        scores = self.frazier
+        if len(scores) < 3:
+            return sum(scores.tolist())
+        trigrams = scores[:-2] + scores[1:-1] + scores[2:]
+        return max(0, trigrams.max().item())
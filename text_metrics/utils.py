@@ -22,8 +22,13 @@ from sys import modules
 from nltk.tree import Tree
 import logging
 import codecs
+import sys
+from collections import Counter
 from itertools import chain
 
+import numpy as np
+from numpy import mean
+
 logger = logging.getLogger(__name__)
 base_path = abspath(dirname(modules[__name__].__file__))
 
@@ -50,6 +55,113 @@ def all_pairs(l):
             yield l[i], l[j]
 
 
+def overlap_ratios(sentences):
+    """Count the word overlap between the sentences of a text.
+
+    Two sentences overlap once for every pair of equal words (ignoring case)
+    taken one from each, i.e. the sum over their common words of the product
+    of the counts. Each sentence is lowercased and counted once, so the cost
+    is linear in the number of words instead of quadratic in the pairs.
+
+    :sentences: a list of sentences, each a list of words.
+    :returns: a pair (adjacent, all_pairs) with the mean overlap between
+        adjacent sentences and between all pairs of sentences (0 if there is
+        no pair).
+    """
+    counts = [Counter(sys.intern(word.lower()) for word in sentence)
+              for sentence in sentences]
+    n = len(counts)
+
+    adjacent = 0
+    for previous, current in adjacent_pairs(counts):
+        if len(previous) > len(current):
+            previous, current = current, previous
+        adjacent += sum(count * current[word]
+                        for word, count in previous.items()
+                        if word in current)
+
+    # Sum over pairs i < j of c_i . c_j = ((sum c_i)^2 - sum c_i^2) / 2.
+    total = Counter()
+    squares = 0
+    for sentence_counts in counts:
+        total.update(sentence_counts)
+        squares += sum(count * count for count in sentence_counts.values())
+    all_matches = (sum(count * count for count in total.values())
+                   - squares) // 2
+
+    adjacent_pairs_count = n - 1
+    all_pairs_count = n * (n - 1) // 2
+    return (adjacent / adjacent_pairs_count if adjacent_pairs_count > 0 else 0,
+            all_matches / all_pairs_count if all_pairs_count > 0 else 0)
+
+
+def _token_ids(tokens):
+    """Return tokens (a list, or an array of ids) as an array of small ints."""
+    if isinstance(tokens, np.ndarray):
+        return np.unique(tokens, return_inverse=True)[1].ravel()
+    ids = {}
+    return np.array([ids.setdefault(token, len(ids)) for token in tokens],
+                    dtype=np.int64)
+
+
+def _windows(n, w):
+    """Clamp one or more window sizes to the number of tokens."""
+    if n == 0:
+        raise ZeroDivisionError('No tokens.')
+    sizes = [w] if isinstance(w, int) else list(w)
+    return [min(size, n) for size in sizes]
+
+
+def mattr(tokens, w=100):
+    """Return the Moving Average Type-Token Ratio of a list of tokens.
+
+    The type-token ratio is taken in every window of w consecutive tokens
+    (the whole list, if shorter) and averaged. A token adds a type to the
+    windows that start after its previous occurrence and include it, so the
+    number of types in every window comes out of one cumulative sum, with no
+    work per window step.
+
+    :tokens: a list of tokens, or an integer array of token ids.
+    :w: the window size, or a sequence of window sizes.
+    :returns: the MATTR, or a list with the MATTR for each window size.
+    """
+    ids = _token_ids(tokens)
+    n = len(ids)
+    sizes = _windows(n, w)
+
+    order = np.argsort(ids, kind='stable')
+    previous = np.full(n, -1, dtype=np.int64)
+    repeated = ids[order[1:]] == ids[order[:-1]]
+    previous[order[1:][repeated]] = order[:-1][repeated]
+
+    positions = np.arange(n)
+    ends = np.bincount(positions + 1, minlength=n + 1)
+    values = []
+    for size in sizes:
+        starts = np.maximum(previous + 1, positions - size + 1)
+        types = np.cumsum(np.bincount(starts, minlength=n + 1) - ends)
+        values.append(mean(types[:n - size + 1] / size))
+    return values[0] if isinstance(w, int) else values
+
+
+def mattr_relative(tokens, filtered, w=100):
+    """Return the moving average of the proportion of tokens of a list that
+    are in filtered.
+
+    :tokens: a list of tokens.
+    :filtered: the tokens to count.
+    :w: the window size, or a sequence of window sizes.
+    :returns: the average, or a list with the average for each window size.
+    """
+    filtered = set(filtered)
+    n = len(tokens)
+    sizes = _windows(n, w)
+
+    counts = np.cumsum([0] + [token in filtered for token in tokens])
+    values = [mean((counts[size:] - counts[:-size]) / size) for size in sizes]
+    return values[0] if isinstance(w, int) else values
+
+
 class CorpusIterator(object):
 
     """An iterator that returns one document at a time. """